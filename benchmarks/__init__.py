@@ -0,0 +1,16 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+"""Helpers shared by the benchmark scripts."""
+from timeit import repeat
+
+
+def best(function, *args, number=20) -> float:
+    """Seconds per call of ``function(*args)``, best of five rounds of
+    ``number`` calls."""
+    return min(repeat(lambda: function(*args), number=number,
+                      repeat=5))/number
+
+
+def verse(v_order, couplet_index, verse_position, text):
+    return {'id': v_order, 'vOrder': v_order, 'coupletIndex': couplet_index,
+            'versePosition': verse_position, 'text': text}
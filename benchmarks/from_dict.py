@@ -0,0 +1,45 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+"""Compares renaming a poem's JSON keys with inflection.underscore on every
+key against the cached ganjoor.utils.attribute_name table.
+
+    $ python -m benchmarks.from_dict
+"""
+from inflection import underscore
+
+from ganjoor import Poem
+from ganjoor.utils import attribute_name
+
+from . import best
+from .payloads import poem
+
+VERSE_COUNT = 2000
+
+
+def rename_with_underscore(payload):
+    for verse in payload['verses']:
+        for key in verse:
+            "_"+underscore(key)
+
+
+def rename_with_table(payload):
+    for verse in payload['verses']:
+        for key in verse:
+            attribute_name(key)
+
+
+def main():
+    payload = poem(1, verse_count=VERSE_COUNT)
+    regex = best(rename_with_underscore, payload)
+    table = best(rename_with_table, payload)
+    print(f"rename {VERSE_COUNT} verses, inflection.underscore: "
+          f"{regex*1e3:.2f} ms")
+    print(f"rename {VERSE_COUNT} verses, attribute_name:        "
+          f"{table*1e3:.2f} ms ({regex/table:.0f}x)")
+    decode = best(lambda: Poem(payload).verses)
+    print(f"Poem(payload).verses with {VERSE_COUNT} verses:    "
+          f"{decode*1e3:.2f} ms")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,50 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+"""Compares json.loads with orjson.loads on large category and poem
+response bodies, the decoders Transport can use.
+
+    $ python -m benchmarks.json_decode
+"""
+import json
+
+from . import best
+from .payloads import category, poem, poet
+
+POEM_COUNT = 5000
+VERSE_COUNT = 2000
+
+
+def bodies():
+    """Raw bodies as the API sends them: a category listing every poem
+    with its poet, and a single long poem."""
+    category_body = {'poet': poet(2),
+                     'cat': category(24, poem_count=POEM_COUNT)}
+    return {
+        f"category with {POEM_COUNT} poems": json.dumps(
+            category_body, ensure_ascii=False).encode('utf-8'),
+        f"poem with {VERSE_COUNT} verses": json.dumps(
+            poem(1, verse_count=VERSE_COUNT),
+            ensure_ascii=False).encode('utf-8'),
+    }
+
+
+def main():
+    decoders = {'json': json.loads}
+    try:
+        import orjson
+    except ImportError:
+        print("orjson is not installed, only timing json.loads")
+    else:
+        decoders['orjson'] = orjson.loads
+    for name, body in bodies().items():
+        print(f"{name} ({len(body)/1024:.0f} KiB):")
+        baseline = None
+        for decoder_name, loads in decoders.items():
+            seconds = best(loads, body)
+            baseline = baseline or seconds
+            print(f"    {decoder_name:<8}{seconds*1e3:8.2f} ms"
+                  f" ({baseline/seconds:.1f}x)")
+
+
+if __name__ == '__main__':
+    main()
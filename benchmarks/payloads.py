@@ -0,0 +1,46 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+"""Synthetic API payloads shaped like ganjgah.ir responses."""
+from . import verse
+
+
+def poem(id, verse_count=20, poet_id=2, cat_id=24):
+    verses = [verse(i+1, i // 2, i % 2, f"بیت شماره {i} از شعر {id}")
+              for i in range(verse_count)]
+    return {
+        'id': id, 'title': f"غزل شماره {id}",
+        'fullTitle': f"حافظ » غزلیات » غزل شماره {id}",
+        'urlSlug': f"sh{id}", 'fullUrl': f"/hafez/ghazal/sh{id}",
+        'ganjoorMetre': {'id': 1, 'urlSlug': "mozare",
+                         'rhythm': "مفعول فاعلات مفاعیل فاعلن",
+                         'name': None, 'description': None, 'verseCount': 0},
+        'rhymeLetters': "ست",
+        'plainText': '\n'.join(verse['text'] for verse in verses),
+        'htmlText': ''.join(f"<p>{verse['text']}</p>" for verse in verses),
+        'sourceName': None, 'sourceUrlSlug': None, 'oldTag': None,
+        'oldTagPageUrl': None,
+        'category': {'poet': poet(poet_id), 'cat': category(cat_id, poet_id)},
+        'next': None, 'previous': None, 'verses': verses,
+        'recitations': [], 'images': [], 'songs': [], 'comments': []}
+
+
+def poet(id):
+    return {'id': id, 'name': f"شاعر {id}", 'description': "",
+            'fullUrl': f"/poet{id}", 'rootCatId': id*100,
+            'nickname': f"شاعر {id}", 'published': True,
+            'imageUrl': f"/api/ganjoor/poet/image/poet{id}.gif"}
+
+
+def category(id, poet_id=2, poem_count=0, child_ids=()):
+    return {'id': id, 'title': f"بخش {id}", 'urlSlug': f"cat{id}",
+            'fullUrl': f"/poet{poet_id}/cat{id}", 'next': None,
+            'previous': None,
+            'ancestors': [],
+            'children': [{'id': child_id, 'title': f"بخش {child_id}",
+                          'urlSlug': f"cat{child_id}",
+                          'fullUrl': f"/poet{poet_id}/cat{child_id}"}
+                         for child_id in child_ids],
+            'poems': [{'id': id*10000+i, 'title': f"شعر {i}",
+                       'urlSlug': f"sh{i}", 'excerpt': "بیت اول",
+                       'rhythm': None, 'rhymeLetters': None}
+                      for i in range(poem_count)]}
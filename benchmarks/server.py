@@ -0,0 +1,192 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+"""A local stand-in for ganjgah.ir serving synthetic or recorded payloads,
+with configurable latency and error injection, so clients can be timed
+without touching the network.
+
+    $ python -m benchmarks.server --port 8080 --latency 0.02 --error-rate 0.1
+"""
+from argparse import ArgumentParser
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from threading import Lock, Thread
+from typing import Any, Dict
+from urllib.parse import urlsplit
+import json
+import random
+import re
+import time
+
+from .payloads import category, poem, poet
+
+_ROUTES = [
+    (re.compile(r'/api/ganjoor/poem/(\d+)/(recitations|images|songs|'
+                r'comments)'), 'related'),
+    (re.compile(r'/api/ganjoor/poem/(\d+)'), 'poem'),
+    (re.compile(r'/api/ganjoor/cat/(\d+)'), 'category'),
+    (re.compile(r'/api/ganjoor/poet/(\d+)'), 'poet'),
+    (re.compile(r'/api/ganjoor/poets'), 'poets'),
+]
+
+
+class StandInServer:
+    """Serves the poem, category and poet endpoints on localhost.
+
+    Poems have ``poem_verses`` verses and categories list
+    ``category_poems`` poems, except for the ids in ``verse_counts`` and
+    ``poem_counts`` which give very large payloads on demand. ``recorded``
+    maps request paths to bodies served as they are. Every request sleeps
+    ``latency`` seconds first, then fails with ``error_status`` (and
+    ``Retry-After: 0``) with probability ``error_rate``. Encoded bodies are
+    kept, so the server's own work stays out of the measurements."""
+
+    def __init__(self, port: int = 0, latency: float = 0.0,
+                 error_rate: float = 0.0, error_status: int = 503,
+                 poem_verses: int = 20, category_poems: int = 50,
+                 verse_counts: Dict[int, int] = None,
+                 poem_counts: Dict[int, int] = None,
+                 recorded: Dict[str, Any] = None, seed: int = 0) -> None:
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.poem_verses = poem_verses
+        self.category_poems = category_poems
+        self.verse_counts = dict(verse_counts or {})
+        self.poem_counts = dict(poem_counts or {})
+        self.recorded = dict(recorded or {})
+        self.requests = 0
+        self.errors = 0
+        self._random = random.Random(seed)
+        self._bodies: Dict[str, bytes] = {}
+        self._lock = Lock()
+        self._server = ThreadingHTTPServer(('127.0.0.1', port),
+                                           self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> 'StandInServer':
+        self._thread = Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread is not None:
+            self._thread.join()
+
+    def __enter__(self) -> 'StandInServer':
+        return self.start()
+
+    def __exit__(self, *exc_info) -> None:
+        self.stop()
+
+    def payload(self, path: str):
+        """Body for ``path``, or None when nothing is served there."""
+        if path in self.recorded:
+            return self.recorded[path]
+        for pattern, kind in _ROUTES:
+            match = pattern.fullmatch(path)
+            if match is None:
+                continue
+            id = int(match.group(1)) if match.groups() else None
+            if kind == 'related':
+                return []
+            if kind == 'poem':
+                return poem(id, verse_count=self.verse_counts.get(
+                    id, self.poem_verses))
+            if kind == 'category':
+                return {'poet': poet(2), 'cat': category(
+                    id, poem_count=self.poem_counts.get(
+                        id, self.category_poems))}
+            if kind == 'poet':
+                return {'poet': poet(id), 'cat': category(id*100)}
+            return [poet(id) for id in range(1, 201)]
+        return None
+
+    def body(self, path: str):
+        body = self._bodies.get(path)
+        if body is None:
+            payload = self.payload(path)
+            if payload is None:
+                return None
+            body = self._bodies[path] = json.dumps(
+                payload, ensure_ascii=False).encode('utf-8')
+        return body
+
+    def _fail(self) -> bool:
+        with self._lock:
+            self.requests += 1
+            failed = self._random.random() < self.error_rate
+            self.errors += failed
+            return failed
+
+    def _handler(self):
+        server = self
+
+        class Handler(BaseHTTPRequestHandler):
+            protocol_version = 'HTTP/1.1'
+            # Headers and body go out as separate writes.
+            disable_nagle_algorithm = True
+
+            def do_GET(self):
+                if server.latency:
+                    time.sleep(server.latency)
+                if server._fail():
+                    self.send_response(server.error_status)
+                    self.send_header('Retry-After', '0')
+                    self.send_header('Content-Length', '0')
+                    self.end_headers()
+                    return
+                body = server.body(urlsplit(self.path).path)
+                if body is None:
+                    self.send_response(404)
+                    body = b'{}'
+                else:
+                    self.send_response(200)
+                self.send_header('Content-Type', 'application/json')
+                self.send_header('Content-Length', str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def log_message(self, format, *args):
+                pass
+
+        return Handler
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--port', type=int, default=8080)
+    parser.add_argument('--latency', type=float, default=0.0,
+                        help="seconds to wait before every answer")
+    parser.add_argument('--error-rate', type=float, default=0.0,
+                        help="share of requests answered with an error")
+    parser.add_argument('--error-status', type=int, default=503)
+    parser.add_argument('--poem-verses', type=int, default=20)
+    parser.add_argument('--category-poems', type=int, default=50)
+    parser.add_argument('--recorded', help="JSON file mapping request "
+                        "paths to the bodies to serve for them")
+    args = parser.parse_args()
+    recorded = None
+    if args.recorded:
+        with open(args.recorded, encoding='utf-8') as recorded_file:
+            recorded = json.load(recorded_file)
+    server = StandInServer(args.port, args.latency, args.error_rate,
+                           args.error_status, args.poem_verses,
+                           args.category_poems, recorded=recorded)
+    print(f"serving on {server.base_url}")
+    try:
+        server._server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server._server.server_close()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,62 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+"""Times ``import ganjoor``, importing the client and constructing it,
+each in fresh interpreters since imports are only paid once per process.
+
+    $ python -m benchmarks.startup
+"""
+from statistics import median
+from typing import List
+import json
+import os
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+SCRIPT = """
+import time
+started = time.perf_counter()
+import ganjoor
+imported = time.perf_counter()
+from ganjoor import Ganjoor
+client_imported = time.perf_counter()
+Ganjoor()
+constructed = time.perf_counter()
+print(imported-started, client_imported-imported,
+      constructed-client_imported)
+"""
+
+
+def startup_times(runs: int = 10) -> List[List[float]]:
+    """Seconds spent on each step, one row per fresh interpreter. Runs in
+    an empty directory, so files created as a side effect would show."""
+    times = []
+    with tempfile.TemporaryDirectory() as directory:
+        for _ in range(runs):
+            output = subprocess.run(
+                [sys.executable, '-c', SCRIPT], cwd=directory, check=True,
+                capture_output=True, text=True,
+                env={**os.environ, 'PYTHONPATH': ROOT}).stdout
+            times.append([float(value) for value in output.split()])
+        leftovers = os.listdir(directory)
+    if leftovers:
+        raise RuntimeError(f"Ganjoor() created {leftovers}")
+    return times
+
+
+def measure(runs: int = 10) -> List[dict]:
+    from .suite import result
+    import_ganjoor, import_client, construct = zip(*startup_times(runs))
+    return [result('import_ganjoor', median(import_ganjoor)*1e3, 'ms'),
+            result('import_client', median(import_client)*1e3, 'ms'),
+            result('construct_client', median(construct)*1e3, 'ms')]
+
+
+def main():
+    print(json.dumps(measure(), indent=2))
+
+
+if __name__ == '__main__':
+    main()
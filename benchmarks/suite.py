@@ -0,0 +1,215 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+"""Times the client end to end against a local StandInServer, fully
+offline, along with import and construction time (benchmarks.startup),
+and reports every measurement as JSON so runs can be compared.
+
+    $ python -m benchmarks.suite --output before.json
+    $ python -m benchmarks.suite --baseline before.json --tolerance 0.25
+
+With --baseline the run exits with status 1 when a measurement got worse
+than the baseline by more than the tolerance. --quick runs can only be
+compared with --quick baselines.
+"""
+from argparse import ArgumentParser
+from statistics import mean, median
+from typing import Dict, List
+import json
+import platform
+import sys
+import time
+import tracemalloc
+
+from ganjoor import (Category, Ganjoor, MemoryCache, Poem, RetryPolicy,
+                     Transport)
+from ganjoor.utils import default_json_loads
+
+from . import best, startup
+from .payloads import category, poem
+from .server import StandInServer
+
+LONG_POEM_ID = 1
+LARGE_CATEGORY_ID = 24
+LONG_POEM_VERSES = 2000
+LARGE_CATEGORY_POEMS = 5000
+
+
+def result(name: str, value: float, unit: str, better: str = 'lower',
+           **details) -> dict:
+    return {'name': name, 'value': round(value, 6), 'unit': unit,
+            'better': better, **details}
+
+
+def percentile(values: List[float], share: float) -> float:
+    values = sorted(values)
+    return values[min(len(values)-1, int(share*len(values)))]
+
+
+def per_call_latency(server: StandInServer, calls: int) -> List[dict]:
+    transport = Transport(base_url=server.base_url, retry=False)
+    Poem.find(2, transport=transport)  # opens the connection
+    latencies = []
+    for id in range(2, calls+2):
+        started = time.perf_counter()
+        Poem.find(id, transport=transport)
+        latencies.append((time.perf_counter()-started)*1e3)
+    transport.close()
+    return [result('find_poem_latency_mean', mean(latencies), 'ms'),
+            result('find_poem_latency_p50', median(latencies), 'ms'),
+            result('find_poem_latency_p95', percentile(latencies, 0.95),
+                   'ms')]
+
+
+def large_payloads(server: StandInServer) -> List[dict]:
+    """Whole calls, from request to models, for the long poem and the
+    large category."""
+    transport = Transport(base_url=server.base_url, retry=False)
+    results = [
+        result('find_long_poem', best(lambda: Poem.find(
+            LONG_POEM_ID, transport=transport).verses, number=5)*1e3, 'ms',
+            verses=server.verse_counts[LONG_POEM_ID]),
+        result('find_large_category', best(lambda: Category.find(
+            LARGE_CATEGORY_ID, transport=transport).poems, number=5)*1e3,
+            'ms', poems=server.poem_counts[LARGE_CATEGORY_ID])]
+    transport.close()
+    return results
+
+
+def bulk_throughput(name: str, server: StandInServer, count: int,
+                    workers: int, **client_options) -> dict:
+    client = Ganjoor(base_url=server.base_url, cache=False,
+                     pool_size=workers, **client_options)
+    started = time.perf_counter()
+    results = list(client.find_poems_by_ids(range(1, count+1)))
+    elapsed = time.perf_counter()-started
+    client.transport.close()
+    failed = sum(not bulk_result.ok for bulk_result in results)
+    return result(name, count/elapsed, 'poems/s', better='higher',
+                  failed=failed)
+
+
+def cache_hits(server: StandInServer, calls: int) -> dict:
+    transport = Transport(base_url=server.base_url, cache=MemoryCache())
+    Poem.find(2, transport=transport)
+    started = time.perf_counter()
+    for _ in range(calls):
+        Poem.find(2, transport=transport)
+    elapsed = time.perf_counter()-started
+    transport.close()
+    return result('find_poem_cache_hit', elapsed/calls*1e6, 'us')
+
+
+def construction(verse_count: int, poem_count: int) -> List[dict]:
+    poem_payload = poem(LONG_POEM_ID, verse_count=verse_count)
+    category_payload = category(LARGE_CATEGORY_ID, poem_count=poem_count)
+    return [
+        result('build_poem', best(lambda: Poem(poem_payload).verses,
+                                  number=5)*1e3, 'ms', verses=verse_count),
+        result('build_category',
+               best(lambda: Category(category_payload).poems,
+                    number=5)*1e3, 'ms', poems=poem_count)]
+
+
+def all_couplets(verse_count: int) -> dict:
+    payload = poem(LONG_POEM_ID, verse_count=verse_count)
+    return result('get_all_couplets',
+                  best(lambda: Poem(payload).get_all_couplets(),
+                       number=5)*1e3, 'ms', verses=verse_count)
+
+
+def memory_per_100k_verses(poem_count: int, verse_count: int) -> dict:
+    """Memory held by poems decoded from response bodies and built into
+    models with their verses, scaled to 100k verses."""
+    loads = default_json_loads()
+    bodies = [json.dumps(poem(id, verse_count=verse_count),
+                         ensure_ascii=False).encode('utf-8')
+              for id in range(1, poem_count+1)]
+    tracemalloc.start()
+    poems = [Poem(loads(body)) for body in bodies]
+    for built in poems:
+        built.verses
+    held, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    verses = poem_count*verse_count
+    return result('memory_per_100k_verses', held/verses*1e5/2**20, 'MiB',
+                  verses=verses)
+
+
+def run(quick: bool = False) -> Dict[str, object]:
+    scale = 10 if quick else 1
+    results = startup.measure(runs=5 if quick else 10)
+    with StandInServer(
+            verse_counts={LONG_POEM_ID: LONG_POEM_VERSES},
+            poem_counts={LARGE_CATEGORY_ID: LARGE_CATEGORY_POEMS}) as server:
+        results += per_call_latency(server, 200//scale)
+        results += large_payloads(server)
+        results.append(cache_hits(server, 2000//scale))
+        results.append(bulk_throughput('find_poems_throughput', server,
+                                       500//scale, workers=16))
+    with StandInServer(latency=0.005, error_rate=0.1) as server:
+        results.append(bulk_throughput(
+            'find_poems_throughput_with_errors', server, 200//scale,
+            workers=16, retry=RetryPolicy(total=5, jitter=False)))
+    results += construction(LONG_POEM_VERSES, LARGE_CATEGORY_POEMS//scale)
+    results.append(all_couplets(20000//scale))
+    results.append(memory_per_100k_verses(100//scale, 1000))
+    return {'python': platform.python_version(),
+            'platform': platform.platform(),
+            'json_loads': default_json_loads().__module__,
+            'created': time.time(), 'quick': quick, 'results': results}
+
+
+def regressions(report: dict, baseline: dict, tolerance: float) -> List[str]:
+    """Measurements of ``report`` worse than ``baseline`` by more than
+    ``tolerance`` (a share, 0.25 is 25%). Raises ValueError when one of
+    them ran the quick workloads and the other did not."""
+    if report.get('quick') != baseline.get('quick'):
+        raise ValueError("cannot compare a --quick run with a full one, "
+                         "both must use the same workloads")
+    previous = {entry['name']: entry for entry in baseline['results']}
+    found = []
+    for entry in report['results']:
+        before = previous.get(entry['name'])
+        if before is None or not before['value']:
+            continue
+        change = entry['value']/before['value']-1
+        if entry['better'] == 'higher':
+            change = -change
+        if change > tolerance:
+            found.append(f"{entry['name']}: {before['value']} -> "
+                         f"{entry['value']} {entry['unit']} "
+                         f"({change:+.0%} worse)")
+    return found
+
+
+def main():
+    parser = ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--output', help="write the JSON report here "
+                        "instead of printing it")
+    parser.add_argument('--baseline', help="JSON report to compare with")
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    parser.add_argument('--quick', action='store_true',
+                        help="run smaller workloads, for smoke tests")
+    args = parser.parse_args()
+    report = run(args.quick)
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, 'w') as output:
+            output.write(text+'\n')
+    else:
+        print(text)
+    if args.baseline:
+        with open(args.baseline) as baseline_file:
+            baseline = json.load(baseline_file)
+        try:
+            found = regressions(report, baseline, args.tolerance)
+        except ValueError as error:
+            parser.error(str(error))
+        for line in found:
+            print(f"regression: {line}", file=sys.stderr)
+        if found:
+            sys.exit(1)
+
+
+if __name__ == '__main__':
+    main()
@@ -1,6 +1,66 @@
 # Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
 # SPDX-License-Identifier: MIT
-from .models import (Poet, Poem, Category)
-from .ganjoor import Ganjoor
-from .config import GANJGAH_BASE_URL
-from .exceptions import GanjoorException
+from importlib import import_module
+from typing import TYPE_CHECKING
+
+# Public names and the submodules defining them. They are imported on first
+# access, so ``import ganjoor`` does not load requests, sqlite3 or asyncio
+# for a tool that only needs part of the package.
+_EXPORTS = {
+    'Poet': 'models', 'Poem': 'models', 'Category': 'models',
+    'Ganjoor': 'ganjoor',
+    'GANJGAH_BASE_URL': 'config',
+    'GanjoorException': 'exceptions',
+    'Transport': 'transport',
+    'AsyncGanjoor': 'async_ganjoor',
+    'BulkResult': 'bulk',
+    'DO_NOT_CACHE': 'cache', 'NEVER_EXPIRE': 'cache', 'FileCache': 'cache',
+    'MemoryCache': 'cache', 'SQLiteCache': 'cache',
+    'MirrorSink': 'mirror', 'SQLiteMirror': 'mirror',
+    'SearchIndex': 'search',
+    'SimilarIndex': 'similar',
+    'ColumnarExporter': 'export',
+    'CorpusFile': 'corpus',
+    'CircuitBreaker': 'retry', 'RetryPolicy': 'retry',
+    'CategoryTree': 'walk',
+    'PoetDirectory': 'directory',
+    'Instrumentation': 'instrumentation',
+    'MetricsCollector': 'instrumentation',
+}
+
+__all__ = list(_EXPORTS)
+
+
+def __getattr__(name):
+    module = _EXPORTS.get(name)
+    if module is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(import_module('.'+module, __name__), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(__all__))
+
+
+if TYPE_CHECKING:
+    from .models import (Poet, Poem, Category)  # noqa: F401
+    from .ganjoor import Ganjoor  # noqa: F401
+    from .config import GANJGAH_BASE_URL  # noqa: F401
+    from .exceptions import GanjoorException  # noqa: F401
+    from .transport import Transport  # noqa: F401
+    from .async_ganjoor import AsyncGanjoor  # noqa: F401
+    from .bulk import BulkResult  # noqa: F401
+    from .cache import (  # noqa: F401
+        DO_NOT_CACHE, NEVER_EXPIRE, FileCache, MemoryCache, SQLiteCache)
+    from .mirror import MirrorSink, SQLiteMirror  # noqa: F401
+    from .search import SearchIndex  # noqa: F401
+    from .similar import SimilarIndex  # noqa: F401
+    from .export import ColumnarExporter  # noqa: F401
+    from .corpus import CorpusFile  # noqa: F401
+    from .retry import CircuitBreaker, RetryPolicy  # noqa: F401
+    from .walk import CategoryTree  # noqa: F401
+    from .directory import PoetDirectory  # noqa: F401
+    from .instrumentation import (  # noqa: F401
+        Instrumentation, MetricsCollector)
@@ -0,0 +1,407 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Optional, Union
+from urllib.parse import urlsplit
+import asyncio
+import time
+from ganjoor.exceptions import GanjoorException, ResponseError, TransportError
+
+from .models import Category, Poet, Poem
+from .poem_utils import Comment, PoemImage, Recitation, Song
+from .config import GANJGAH_BASE_URL
+from .bulk import BulkResult
+from .cache import cache_key
+from .instrumentation import Instrumentation
+from .ratelimit import RateLimiter
+from .retry import NO_RETRY, CircuitBreaker, RetryPolicy
+from .singleflight import AsyncSingleFlight
+from .utils import default_json_loads
+from .transport import (DEFAULT_HEADERS, DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT,
+                        RANDOM_ENDPOINTS, response_error)
+
+
+def _encode_params(params):
+    """Drops None values and stringifies the rest the way requests does,
+    since aiohttp refuses booleans and None in query strings."""
+    if not params:
+        return None
+    return {key: str(value) for key, value in params.items()
+            if value is not None}
+
+
+class AsyncTransport:
+    """asyncio counterpart of :class:`ganjoor.transport.Transport` built on
+    a single pooled ``aiohttp.ClientSession``, with the same retry, rate
+    limit, circuit breaker, coalescing, JSON decoder and instrumentation
+    options."""
+
+    def __init__(self, base_url: str = GANJGAH_BASE_URL,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 headers: Optional[Dict[str, str]] = None,
+                 session=None, retry: RetryPolicy = None,
+                 rate_limit: Union[float, RateLimiter] = None,
+                 circuit_breaker: CircuitBreaker = None,
+                 coalesce: bool = True,
+                 json_loads: Callable[[bytes], Any] = None,
+                 instrumentation: Instrumentation = None) -> None:
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.headers = dict(DEFAULT_HEADERS)
+        if headers:
+            self.headers.update(headers)
+        self._session = session
+        if retry is None:
+            retry = RetryPolicy()
+        elif retry is False:
+            retry = NO_RETRY
+        self.retry = retry
+        if rate_limit is not None and not isinstance(rate_limit,
+                                                     RateLimiter):
+            rate_limit = RateLimiter(rate_limit)
+        self.rate_limiter = rate_limit
+        self.circuit_breaker = circuit_breaker
+        self.coalesce = coalesce
+        self._json_loads = json_loads
+        if instrumentation is None:
+            instrumentation = Instrumentation()
+        self.instrumentation = instrumentation
+        self._in_flight = AsyncSingleFlight()
+
+    @property
+    def session(self):
+        if self._session is None:
+            try:
+                import aiohttp
+            except ImportError as error:
+                raise GanjoorException(
+                    "AsyncGanjoor requires aiohttp, install it with "
+                    "'pip install aiohttp'") from error
+            self._session = aiohttp.ClientSession(
+                connector=aiohttp.TCPConnector(limit=self.pool_size),
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                headers=self.headers)
+        return self._session
+
+    @property
+    def json_loads(self) -> Callable[[bytes], Any]:
+        if self._json_loads is None:
+            self._json_loads = default_json_loads()
+        return self._json_loads
+
+    @json_loads.setter
+    def json_loads(self, json_loads: Callable[[bytes], Any]) -> None:
+        self._json_loads = json_loads
+
+    def url(self, endpoint: str, **path_params) -> str:
+        return self.base_url+endpoint.format(**path_params)
+
+    async def _throttle(self, url: str) -> None:
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_call()
+        if self.rate_limiter is not None:
+            bucket = self.rate_limiter.bucket(urlsplit(url).netloc)
+            while True:
+                wait = bucket.try_acquire()
+                if not wait:
+                    break
+                await asyncio.sleep(wait)
+
+    def _record(self, failed: bool) -> None:
+        if self.circuit_breaker is not None:
+            if failed:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+
+    def _release(self) -> None:
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.release()
+
+    async def get_json(self, endpoint: str, params=None, **path_params):
+        url = self.url(endpoint, **path_params)
+        if self.coalesce and endpoint not in RANDOM_ENDPOINTS:
+            content = await self._in_flight.do(
+                cache_key(url, params),
+                lambda: self._fetch(endpoint, url, params))
+        else:
+            content = await self._fetch(endpoint, url, params)
+        started = time.perf_counter()
+        body = self.json_loads(content)
+        self.instrumentation.on_decode(endpoint, time.perf_counter()-started)
+        return body
+
+    def build(self, endpoint: str, factory, body):
+        """Returns ``factory(body, None)``, reporting the time it took as
+        model construction for ``endpoint``. Models built here get no
+        (synchronous) transport of their own."""
+        started = time.perf_counter()
+        result = factory(body, None)
+        self.instrumentation.on_construct(endpoint,
+                                          time.perf_counter()-started)
+        return result
+
+    async def _fetch(self, endpoint: str, url: str, params) -> bytes:
+        import aiohttp
+        instrumentation = self.instrumentation
+        attempt = 0
+        while True:
+            attempt += 1
+            await self._throttle(url)
+            started = time.perf_counter()
+            try:
+                async with self.session.get(
+                        url, params=_encode_params(params)) as response:
+                    content = await response.read()
+            except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+                self._record(True)
+                instrumentation.on_request(
+                    endpoint, None, time.perf_counter()-started, 0)
+                wait = self.retry.wait(attempt)
+                if wait is None:
+                    raise TransportError(
+                        f"Request to {url} failed: {error}") from error
+            except asyncio.CancelledError:
+                # The caller gave up, which says nothing about the API.
+                self._release()
+                raise
+            except BaseException:
+                # Anything else would leave a half-open circuit waiting
+                # for its trial call forever.
+                self._record(True)
+                raise
+            else:
+                self._record(response.status >= 500)
+                instrumentation.on_request(
+                    endpoint, response.status, time.perf_counter()-started,
+                    len(content))
+                if response.status == 200:
+                    return content
+                wait = None
+                if response.status in self.retry.statuses:
+                    wait = self.retry.wait(attempt, response.headers)
+                if wait is None:
+                    raise response_error(
+                        response.status, response.reason,
+                        response.headers.get('Retry-After'))
+            instrumentation.on_retry(endpoint, attempt, wait)
+            await asyncio.sleep(wait)
+
+    async def post_json(self, endpoint: str, json=None, **path_params):
+        """Sends a POST request, not retried, and returns the decoded
+        body. Raises ResponseError for any answer but 200."""
+        import aiohttp
+        url = self.url(endpoint, **path_params)
+        await self._throttle(url)
+        try:
+            async with self.session.post(url, json=json) as response:
+                content = await response.read()
+        except (aiohttp.ClientError, asyncio.TimeoutError) as error:
+            self._record(True)
+            raise TransportError(
+                f"Request to {url} failed: {error}") from error
+        except asyncio.CancelledError:
+            self._release()
+            raise
+        except BaseException:
+            self._record(True)
+            raise
+        self._record(response.status >= 500)
+        if response.status != 200:
+            raise response_error(response.status, response.reason,
+                                 response.headers.get('Retry-After'))
+        return self.json_loads(content)
+
+    async def close(self) -> None:
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    async def __aenter__(self) -> AsyncTransport:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+
+class AsyncGanjoor:
+    """asyncio version of :class:`ganjoor.Ganjoor`, every method is a
+    coroutine returning the same model objects. Use it as an async
+    context manager (or call :meth:`close`) to release the pool."""
+
+    def __init__(self, token=None, language="string", app_name="pythonclient",
+                 base_url=GANJGAH_BASE_URL,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 headers: Dict[str, str] = None,
+                 retry: RetryPolicy = None,
+                 rate_limit: Union[float, RateLimiter] = None,
+                 circuit_breaker: CircuitBreaker = None,
+                 coalesce: bool = True, json_loads=None,
+                 instrumentation: Instrumentation = None):
+        self.token = token
+        self.language = language
+        self.base_url = base_url
+        self.app_name = app_name
+        self.transport = AsyncTransport(base_url=base_url,
+                                        pool_size=pool_size,
+                                        timeout=timeout, headers=headers,
+                                        retry=retry, rate_limit=rate_limit,
+                                        circuit_breaker=circuit_breaker,
+                                        coalesce=coalesce,
+                                        json_loads=json_loads,
+                                        instrumentation=instrumentation)
+
+    async def close(self) -> None:
+        await self.transport.close()
+
+    async def __aenter__(self) -> AsyncGanjoor:
+        return self
+
+    async def __aexit__(self, *exc_info) -> None:
+        await self.close()
+
+    async def log_in(self, username, password):
+        self.username = username
+        self.password = password
+        try:
+            body = await self.transport.post_json(
+                "/api/users/login", json={"username": self.username,
+                                          "password": self.password,
+                                          "clientAppName": self.app_name,
+                                          "language": self.language})
+        except ResponseError as error:
+            raise GanjoorException(
+                f"""Authentication Failed with Code: {error.status_code},
+                 Message: {error.reason}""") from error
+        self.auth_token = body['token']
+
+    async def get_all_poets(self) -> List[Poet]:
+        body = await self.transport.get_json(Poet._urls['all'])
+        return self.transport.build(
+            Poet._urls['all'], Poet._list_from_response, body)
+
+    async def find_poet_by_id(self, id: int) -> Poet:
+        body = await self.transport.get_json(Poet._urls['find'], id=id)
+        return self.transport.build(
+            Poet._urls['find'], Poet._from_response, body)
+
+    async def find_poet_by_url(self, url: str) -> Poet:
+        body = await self.transport.get_json(Poet._urls['find_by_url'],
+                                             params={'url': url})
+        return self.transport.build(
+            Poet._urls['find_by_url'], Poet._from_response, body)
+
+    async def find_category_by_id(self, id: int, with_poems=True) -> Category:
+        body = await self.transport.get_json(Category._urls['find'],
+                                             params={'poems': with_poems},
+                                             id=id)
+        return self.transport.build(
+            Category._urls['find'], Category._from_response, body)
+
+    async def find_category_by_url(self, url: str,
+                                   with_poems=True) -> Category:
+        body = await self.transport.get_json(Category._urls['find_by_url'],
+                                             params={'poems': with_poems,
+                                                     'url': url})
+        return self.transport.build(
+            Category._urls['find_by_url'], Category._from_response, body)
+
+    async def find_poem_by_id(self, id: int, complete=False,
+                              category_info=False, category_poems=False,
+                              rhymes=False, recitations=False, images=False,
+                              songs=False, comments=False,
+                              verse_details=False, navigation=False) -> Poem:
+        params = dict.copy(locals())
+        for key in ('self', 'id'):
+            params.pop(key)
+        if complete:
+            params = {}
+        body = await self.transport.get_json(Poem._urls['find'],
+                                             params=params, id=id)
+        return self.transport.build(
+            Poem._urls['find'], Poem._from_response, body)
+
+    async def find_poem_by_url(self, url: str, complete=False,
+                               category_info=False, category_poems=False,
+                               rhymes=False, recitations=False, images=False,
+                               songs=False, comments=False,
+                               verse_details=False, navigation=False) -> Poem:
+        params = dict.copy(locals())
+        params.pop('self')
+        if complete:
+            params = {'url': url}
+        body = await self.transport.get_json(Poem._urls['find_by_url'],
+                                             params=params)
+        return self.transport.build(
+            Poem._urls['find_by_url'], Poem._from_response, body)
+
+    async def random_poem(self, poet_id=None) -> Poem:
+        body = await self.transport.get_json(Poem._urls['random'],
+                                             params={'poetId': poet_id})
+        return self.transport.build(
+            Poem._urls['random'], Poem._from_response, body)
+
+    async def find_similar_poems(self, page_size: int = 5,
+                                 page_number: int = 1, metre: str = None,
+                                 rhyme: str = None,
+                                 poet_id=0) -> List[Poem]:
+        body = await self.transport.get_json(Poem._urls['similar'], params={
+            'pageNumber': page_number, 'rhyme': rhyme, 'metre': metre,
+            'pageSize': page_size, 'poetId': poet_id})
+        return self.transport.build(
+            Poem._urls['similar'], Poem._list_from_response, body)
+
+    async def search_poems(self, term: str, page_size: int = 5,
+                           page_number: int = 1, cat_id: int = 0,
+                           poet_id=0) -> List[Poem]:
+        body = await self.transport.get_json(Poem._urls['search'], params={
+            'pageNumber': page_number, 'term': term, 'cat_id': cat_id,
+            'pageSize': page_size, 'poetId': poet_id})
+        return self.transport.build(
+            Poem._urls['search'], Poem._list_from_response, body)
+
+    async def hafez_faal(self) -> Poem:
+        body = await self.transport.get_json(Poem._urls['hafez_faal'])
+        return self.transport.build(
+            Poem._urls['hafez_faal'], Poem._from_response, body)
+
+    async def request_recitations(self, poem: Poem) -> List[Recitation]:
+        body = await self.transport.get_json(
+            Poem._urls['find']+Poem._urls['recitations'], id=poem.id)
+        return [Recitation(recitation) for recitation in body]
+
+    async def request_images(self, poem: Poem) -> List[PoemImage]:
+        body = await self.transport.get_json(
+            Poem._urls['find']+Poem._urls['images'], id=poem.id)
+        return [PoemImage(image) for image in body]
+
+    async def request_songs(self, poem: Poem, track_type=-1,
+                            approved=True) -> List[Song]:
+        body = await self.transport.get_json(
+            Poem._urls['find']+Poem._urls['songs'],
+            params=Poem._related_params('songs', track_type, approved),
+            id=poem.id)
+        return [Song(song) for song in body]
+
+    async def request_comments(self, poem: Poem) -> List[Comment]:
+        body = await self.transport.get_json(
+            Poem._urls['find']+Poem._urls['comments'], id=poem.id)
+        return [Comment(comment) for comment in body]
+
+    async def fetch_related(self, poem: Poem, recitations=True, images=True,
+                            songs=True, comments=True) -> Poem:
+        """Concurrent version of Poem.fetch_related, awaiting every
+        requested resource at once."""
+        names = Poem._related_names(recitations, images, songs, comments)
+        bodies = await asyncio.gather(
+            *[self.transport.get_json(
+                Poem._urls['find']+Poem._urls[name],
+                params=Poem._related_params(name), id=poem.id)
+              for name in names], return_exceptions=True)
+        poem._apply_related(
+            BulkResult(name, error=body) if isinstance(body, Exception)
+            else BulkResult(name, body) for name, body in zip(names, bodies))
+        return poem
@@ -0,0 +1,57 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable, Iterator
+
+
+@dataclass
+class BulkResult:
+    """Outcome of one item of a bulk fetch, either a value or an error."""
+    key: Any
+    value: Any = None
+    error: Exception = None
+
+    @property
+    def ok(self) -> bool:
+        return self.error is None
+
+
+def _call(fetch: Callable, key) -> BulkResult:
+    try:
+        return BulkResult(key, value=fetch(key))
+    except Exception as error:
+        return BulkResult(key, error=error)
+
+
+def fetch_concurrently(fetch: Callable, keys: Iterable, max_workers: int = 8,
+                       ordered: bool = True) -> Iterator[BulkResult]:
+    """Calls ``fetch(key)`` for every key on a pool of ``max_workers``
+    threads and yields a :class:`BulkResult` per key, in input order when
+    ``ordered`` is True or as soon as each one completes otherwise.
+
+    Only about ``2 * max_workers`` calls are in flight at once, so ``keys``
+    may be a lazy iterable of any length."""
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+    window = max(1, max_workers) * 2
+    keys = iter(keys)
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        pending = deque()
+
+        def fill():
+            for key in keys:
+                pending.append(executor.submit(_call, fetch, key))
+                if len(pending) >= window:
+                    break
+
+        fill()
+        while pending:
+            if ordered:
+                yield pending.popleft().result()
+            else:
+                done, _ = wait(pending, return_when=FIRST_COMPLETED)
+                for future in done:
+                    pending.remove(future)
+                    yield future.result()
+            fill()
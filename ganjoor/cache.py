@@ -0,0 +1,274 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from datetime import timedelta
+from threading import RLock
+from typing import TYPE_CHECKING, Dict, Optional, Union
+from urllib.parse import urlencode
+import json
+import os
+import time
+
+if TYPE_CHECKING:
+    import sqlite3
+
+NEVER_EXPIRE = -1
+DO_NOT_CACHE = 0
+
+ExpireAfter = Union[int, float, timedelta]
+
+
+def expire_seconds(expire_after: ExpireAfter) -> float:
+    if isinstance(expire_after, timedelta):
+        return expire_after.total_seconds()
+    return expire_after
+
+
+def cache_key(url: str, params=None) -> str:
+    """Key of a GET request, independent of the order of its params."""
+    if not params:
+        return url
+    query = sorted((key, str(value)) for key, value in params.items()
+                   if value is not None)
+    return url+'?'+urlencode(query)
+
+
+@dataclass
+class CacheEntry:
+    status_code: int
+    content: bytes
+    headers: Dict[str, str] = field(default_factory=dict)
+    created_at: float = field(default_factory=time.time)
+    expires_at: Optional[float] = None
+
+    @classmethod
+    def from_response(cls, response, expire_after: ExpireAfter) -> CacheEntry:
+        created_at = time.time()
+        expire_after = expire_seconds(expire_after)
+        expires_at = None if expire_after < 0 else created_at+expire_after
+        return cls(response.status_code, response.content,
+                   dict(response.headers), created_at, expires_at)
+
+    @property
+    def size(self) -> int:
+        return len(self.content)
+
+    def is_expired(self, now: float = None) -> bool:
+        if self.expires_at is None:
+            return False
+        return (now or time.time()) >= self.expires_at
+
+    def header(self, name: str) -> Optional[str]:
+        name = name.lower()
+        for key, value in self.headers.items():
+            if key.lower() == name:
+                return value
+        return None
+
+    @property
+    def validators(self) -> Dict[str, str]:
+        """Conditional request headers revalidating this entry, empty when
+        the server sent neither an ETag nor a Last-Modified date."""
+        conditional = {}
+        etag = self.header('ETag')
+        if etag:
+            conditional['If-None-Match'] = etag
+        last_modified = self.header('Last-Modified')
+        if last_modified:
+            conditional['If-Modified-Since'] = last_modified
+        return conditional
+
+    def refreshed(self, response, expire_after: ExpireAfter) -> CacheEntry:
+        """This entry renewed by a 304 Not Modified ``response``, with a new
+        lifetime and any headers the server updated."""
+        entry = CacheEntry.from_response(response, expire_after)
+        entry.status_code = self.status_code
+        entry.content = self.content
+        entry.headers = {**self.headers, **entry.headers}
+        return entry
+
+
+@dataclass
+class CacheStats:
+    """Counters of a transport's cache use. ``revalidations`` counts the
+    conditional requests sent for stale entries, ``not_modified`` those the
+    server answered with 304, so their bodies were not downloaded again."""
+    hits: int = 0
+    misses: int = 0
+    revalidations: int = 0
+    not_modified: int = 0
+
+
+class BaseCache:
+    """Storage for responses of a single client's transport."""
+
+    def get(self, key: str) -> Optional[CacheEntry]:
+        raise NotImplementedError
+
+    def set(self, key: str, entry: CacheEntry) -> None:
+        raise NotImplementedError
+
+    def delete(self, key: str) -> None:
+        raise NotImplementedError
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+    def close(self) -> None:
+        pass
+
+
+class MemoryCache(BaseCache):
+    """In-process LRU cache bounded by entry count and total body bytes."""
+
+    def __init__(self, max_entries: int = 1024,
+                 max_bytes: Optional[int] = None) -> None:
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self.total_bytes = 0
+        self._entries = OrderedDict()
+        self._lock = RLock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+            return entry
+
+    def set(self, key, entry):
+        with self._lock:
+            self.delete(key)
+            if self.max_bytes is not None and entry.size > self.max_bytes:
+                return
+            self._entries[key] = entry
+            self.total_bytes += entry.size
+            while len(self._entries) > self.max_entries or (
+                    self.max_bytes is not None and
+                    self.total_bytes > self.max_bytes):
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted.size
+
+    def delete(self, key):
+        with self._lock:
+            entry = self._entries.pop(key, None)
+            if entry is not None:
+                self.total_bytes -= entry.size
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+
+class SQLiteCache(BaseCache):
+    """Persistent cache in a single sqlite file, opened on first use."""
+
+    def __init__(self, path: str = 'ganjoor_cache.sqlite') -> None:
+        self.path = path
+        self._connection = None
+        self._lock = RLock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            import sqlite3
+            self._connection = sqlite3.connect(self.path,
+                                               check_same_thread=False)
+            self._connection.execute(
+                """CREATE TABLE IF NOT EXISTS ganjoor_responses (
+                    key TEXT PRIMARY KEY, status_code INTEGER,
+                    headers TEXT, content BLOB,
+                    created_at REAL, expires_at REAL)""")
+        return self._connection
+
+    def get(self, key):
+        with self._lock:
+            row = self.connection.execute(
+                """SELECT status_code, content, headers, created_at,
+                   expires_at FROM ganjoor_responses WHERE key = ?""",
+                (key,)).fetchone()
+        if row is None:
+            return None
+        status_code, content, headers, created_at, expires_at = row
+        return CacheEntry(status_code, content, json.loads(headers),
+                          created_at, expires_at)
+
+    def set(self, key, entry):
+        with self._lock, self.connection:
+            self.connection.execute(
+                """INSERT OR REPLACE INTO ganjoor_responses
+                   VALUES (?, ?, ?, ?, ?, ?)""",
+                (key, entry.status_code, json.dumps(entry.headers),
+                 entry.content, entry.created_at, entry.expires_at))
+
+    def delete(self, key):
+        with self._lock, self.connection:
+            self.connection.execute(
+                "DELETE FROM ganjoor_responses WHERE key = ?", (key,))
+
+    def clear(self):
+        with self._lock, self.connection:
+            self.connection.execute("DELETE FROM ganjoor_responses")
+
+    def close(self):
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+
+class FileCache(BaseCache):
+    """One file per response in ``directory``, named by the key's hash.
+    Files written by the cache end in ``.cache`` (``.cache.tmp`` while being
+    written); ``clear`` leaves any other file in the directory alone."""
+    suffix = '.cache'
+
+    def __init__(self, directory: str = 'ganjoor_cache') -> None:
+        self.directory = directory
+
+    def _path(self, key: str) -> str:
+        from hashlib import sha256
+        name = sha256(key.encode('utf-8')).hexdigest()+self.suffix
+        return os.path.join(self.directory, name)
+
+    def get(self, key):
+        try:
+            with open(self._path(key), 'rb') as cache_file:
+                meta = json.loads(cache_file.readline())
+                content = cache_file.read()
+        except (OSError, ValueError):
+            return None
+        return CacheEntry(meta['status_code'], content, meta['headers'],
+                          meta['created_at'], meta['expires_at'])
+
+    def set(self, key, entry):
+        import tempfile
+        os.makedirs(self.directory, exist_ok=True)
+        meta = json.dumps({'key': key, 'status_code': entry.status_code,
+                           'headers': entry.headers,
+                           'created_at': entry.created_at,
+                           'expires_at': entry.expires_at})
+        descriptor, temp_path = tempfile.mkstemp(suffix=self.suffix+'.tmp',
+                                                 dir=self.directory)
+        with os.fdopen(descriptor, 'wb') as cache_file:
+            cache_file.write(meta.encode('utf-8')+b'\n')
+            cache_file.write(entry.content)
+        os.replace(temp_path, self._path(key))
+
+    def delete(self, key):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def clear(self):
+        if os.path.isdir(self.directory):
+            for name in os.listdir(self.directory):
+                if name.endswith((self.suffix, self.suffix+'.tmp')):
+                    os.remove(os.path.join(self.directory, name))
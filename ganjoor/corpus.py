@@ -0,0 +1,331 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from array import array
+from bisect import bisect_left
+from typing import Dict, Iterable, Iterator, List, Optional
+import json
+import mmap
+import os
+import shutil
+import struct
+import sys
+import tempfile
+
+from .crawler import Sink
+from .exceptions import GanjoorException
+from .models import Poem
+from .poem_utils import Couplet, Verse
+from .utils import memoized_property
+
+MAGIC = b'GNJCRP01'
+# magic, poem count, couplet count, verse count, then the offset of every
+# section: ids, rows, poems, couplets, verse offsets, verses, meta, text.
+HEADER = struct.Struct('<8s3Q8Q')
+
+# Fields of the fixed-size tables, all little-endian int64 like the header.
+# Big-endian hosts swap them when writing and copy them when opening.
+POEM_FIELDS = 6  # verse start/end, couplet start/end, meta start/end
+COUPLET_FIELDS = 2  # couplet index, first verse
+VERSE_FIELDS = 4  # id, v_order, couplet index, verse position
+
+MISSING = -2**63
+
+_SWAP = sys.byteorder != 'little'
+
+# Keys left out of the stored metadata, they are rebuilt from the map.
+_TEXT_KEYS = ('verses', 'plainText')
+
+
+def _int(value: Optional[int]) -> int:
+    return MISSING if value is None else value
+
+
+def _value(value: int) -> Optional[int]:
+    return None if value == MISSING else value
+
+
+def _write_table(values: Iterable[int], output) -> None:
+    table = array('q', values)
+    if _SWAP:
+        table.byteswap()
+    table.tofile(output)
+
+
+def _pad(output) -> None:
+    output.write(b'\0' * (-output.tell() % 8))
+
+
+class CorpusWriter(Sink):
+    """Builds a compact corpus file for :class:`CorpusFile`.
+
+    Poems can be added in any order, each section is streamed to a
+    temporary file and they are joined into ``path`` on close, so only the
+    poem ids are held in memory. Can be passed to a Crawler as its sink."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        self._ids: Dict[int, int] = {}
+        self._counts = {'couplets': 0, 'verses': 0, 'meta': 0, 'text': 0}
+        self._sections = {name: tempfile.TemporaryFile()
+                          for name in ('poems', 'couplets', 'verse_offsets',
+                                       'verses', 'meta', 'text')}
+        _write_table([0], self._sections['verse_offsets'])
+        self._closed = False
+
+    def __enter__(self) -> CorpusWriter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def add_poem(self, poem: Poem) -> None:
+        payload = poem.to_dict()
+        poem_id = payload.get('id')
+        if poem_id in self._ids:
+            raise GanjoorException(f"Poem {poem_id} was already added")
+        self._ids[poem_id] = len(self._ids)
+        sections, counts = self._sections, self._counts
+        meta = json.dumps({key: value for key, value in payload.items()
+                           if key not in _TEXT_KEYS},
+                          ensure_ascii=False).encode('utf-8')
+        sections['meta'].write(meta)
+        verse_start, couplet_start = counts['verses'], counts['couplets']
+        verse_offsets, verse_fields, couplets = (array('q'), array('q'),
+                                                 array('q'))
+        couplet_index = object()
+        text = bytearray()
+        for verse in payload.get('verses') or []:
+            text += (verse.get('text') or '').encode('utf-8')
+            verse_offsets.append(counts['text']+len(text))
+            verse_fields.extend((
+                _int(verse.get('id')), _int(verse.get('vOrder')),
+                _int(verse.get('coupletIndex')),
+                _int(verse.get('versePosition'))))
+            if verse.get('coupletIndex') != couplet_index:
+                couplet_index = verse.get('coupletIndex')
+                couplets.extend((_int(couplet_index), counts['verses']))
+                counts['couplets'] += 1
+            counts['verses'] += 1
+        sections['text'].write(text)
+        _write_table(verse_offsets, sections['verse_offsets'])
+        _write_table(verse_fields, sections['verses'])
+        _write_table(couplets, sections['couplets'])
+        _write_table((verse_start, counts['verses'],
+                      couplet_start, counts['couplets'],
+                      counts['meta'], counts['meta']+len(meta)),
+                     sections['poems'])
+        counts['meta'] += len(meta)
+        counts['text'] += len(text)
+
+    def add_poems(self, poems: Iterable[Poem]) -> None:
+        for poem in poems:
+            self.add_poem(poem)
+
+    def on_poem(self, poem: Poem) -> None:
+        self.add_poem(poem)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        ids = sorted(self._ids)
+        sections = self._sections
+        temp_path = self.path+'.tmp'
+        with open(temp_path, 'wb') as output:
+            output.write(b'\0' * HEADER.size)
+            _pad(output)
+            offsets = [output.tell()]
+            _write_table(ids, output)
+            offsets.append(output.tell())
+            _write_table([self._ids[id] for id in ids], output)
+            for name in ('poems', 'couplets', 'verse_offsets', 'verses',
+                         'meta', 'text'):
+                _pad(output)
+                offsets.append(output.tell())
+                section = sections[name]
+                section.seek(0)
+                shutil.copyfileobj(section, output)
+                section.close()
+            output.seek(0)
+            output.write(HEADER.pack(MAGIC, len(ids), self._counts['couplets'],
+                                     self._counts['verses'], *offsets))
+        os.replace(temp_path, self.path)
+
+
+def write_corpus(poems: Iterable[Poem], path: str) -> None:
+    with CorpusWriter(path) as writer:
+        writer.add_poems(poems)
+
+
+class CorpusFile:
+    """Read-only, memory-mapped corpus written by :class:`CorpusWriter`.
+
+    Verse text lives in one UTF-8 blob addressed through offset arrays, so
+    opening the file reads nothing but the header and every process that
+    maps it shares the same page cache. Poems are returned as
+    :class:`CorpusPoem` views that slice their text out of the map on
+    demand. Pickling a CorpusFile reopens it by path, which makes it cheap
+    to hand to worker processes."""
+
+    def __init__(self, path: str) -> None:
+        self.path = path
+        with open(path, 'rb') as corpus_file:
+            self._map = mmap.mmap(corpus_file.fileno(), 0,
+                                  access=mmap.ACCESS_READ)
+        (magic, self.poem_count, self.couplet_count, self.verse_count,
+         *offsets) = HEADER.unpack_from(self._map)
+        if magic != MAGIC:
+            self._map.close()
+            raise GanjoorException(f"{path} is not a ganjoor corpus file")
+        (ids, rows, poems, couplets, verse_offsets, verses, self._meta,
+         self._text) = offsets
+        view = memoryview(self._map)
+        self._views = [view]
+
+        def table(start, length):
+            if _SWAP:
+                table = array('q', view[start:start+length*8].tobytes())
+                table.byteswap()
+                return table
+            table = view[start:start+length*8].cast('q')
+            self._views.append(table)
+            return table
+
+        self._ids = table(ids, self.poem_count)
+        self._rows = table(rows, self.poem_count)
+        self._poems = table(poems, self.poem_count*POEM_FIELDS)
+        self._couplets = table(couplets, self.couplet_count*COUPLET_FIELDS)
+        self._verse_offsets = table(verse_offsets, self.verse_count+1)
+        self._verses = table(verses, self.verse_count*VERSE_FIELDS)
+
+    def close(self) -> None:
+        if self._map.closed:
+            return
+        for view in reversed(self._views):
+            view.release()
+        self._map.close()
+
+    def __enter__(self) -> CorpusFile:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def __reduce__(self):
+        return type(self), (self.path,)
+
+    def __len__(self) -> int:
+        return self.poem_count
+
+    def __contains__(self, poem_id: int) -> bool:
+        return self._row(poem_id) is not None
+
+    def ids(self) -> Iterator[int]:
+        """Poem ids in ascending order."""
+        return iter(self._ids)
+
+    def _row(self, poem_id: int) -> Optional[int]:
+        index = bisect_left(self._ids, poem_id)
+        if index < self.poem_count and self._ids[index] == poem_id:
+            return self._rows[index]
+        return None
+
+    def poem(self, poem_id: int) -> CorpusPoem:
+        row = self._row(poem_id)
+        if row is None:
+            raise GanjoorException(f"Poem {poem_id} not found in corpus")
+        return CorpusPoem(self, row)
+
+    def iter_poems(self) -> Iterator[CorpusPoem]:
+        """Every poem, in id order."""
+        for poem_id in self._ids:
+            yield self.poem(poem_id)
+
+    def _poem_field(self, row: int, field: int) -> int:
+        return self._poems[row*POEM_FIELDS+field]
+
+    def _meta_payload(self, row: int) -> dict:
+        start = self._meta+self._poem_field(row, 4)
+        end = self._meta+self._poem_field(row, 5)
+        return json.loads(self._map[start:end].decode('utf-8'))
+
+    def verse_text(self, verse: int) -> str:
+        """Text of the verse at this position of the verse table."""
+        start = self._text+self._verse_offsets[verse]
+        end = self._text+self._verse_offsets[verse+1]
+        return self._map[start:end].decode('utf-8')
+
+    def verse(self, verse: int) -> Verse:
+        base, fields = verse*VERSE_FIELDS, self._verses
+        return Verse({'id': _value(fields[base]),
+                      'vOrder': _value(fields[base+1]),
+                      'coupletIndex': _value(fields[base+2]),
+                      'versePosition': _value(fields[base+3]),
+                      'text': self.verse_text(verse)})
+
+
+class CorpusPoem(Poem):
+    """Poem backed by a :class:`CorpusFile`.
+
+    Metadata is decoded when the view is created, verses are built from
+    the map only when they are accessed. Everything else behaves like the
+    Poem it was written from."""
+
+    def __init__(self, corpus: CorpusFile, row: int) -> None:
+        self._corpus = corpus
+        self._row = row
+        super().__init__(corpus._meta_payload(row))
+
+    def _field(self, field: int) -> int:
+        return self._corpus._poem_field(self._row, field)
+
+    @property
+    def verse_count(self) -> int:
+        return self._field(1)-self._field(0)
+
+    def verse_text(self, index: int) -> str:
+        """Text of the poem's verse at this index, without building the
+        Verse."""
+        if not 0 <= index < self.verse_count:
+            raise IndexError(index)
+        return self._corpus.verse_text(self._field(0)+index)
+
+    def iter_verse_texts(self) -> Iterator[str]:
+        for verse in range(self._field(0), self._field(1)):
+            yield self._corpus.verse_text(verse)
+
+    @memoized_property
+    def verses(self) -> List[Verse]:
+        return [self._corpus.verse(verse)
+                for verse in range(self._field(0), self._field(1))]
+
+    def iter_couplets(self) -> Iterator[Couplet]:
+        """Yields the couplets like Poem.iter_couplets, joining the runs of
+        the couplet table that share a couplet_index."""
+        corpus, end = self._corpus, self._field(1)
+        couplets, stop = corpus._couplets, self._field(3)
+        runs: Dict[int, List[range]] = {}
+        for couplet in range(self._field(2), stop):
+            first = couplets[couplet*COUPLET_FIELDS+1]
+            last = (couplets[(couplet+1)*COUPLET_FIELDS+1]
+                    if couplet+1 < stop else end)
+            runs.setdefault(couplets[couplet*COUPLET_FIELDS], []).append(
+                range(first, last))
+        for index in sorted(runs):
+            yield Couplet([corpus.verse(verse) for run in runs[index]
+                           for verse in run])
+
+    @property
+    def plain_text(self) -> str:
+        return '\n'.join(self.iter_verse_texts())
+
+    def to_dict(self) -> dict:
+        payload = super().to_dict()
+        payload['plainText'] = self.plain_text
+        payload['verses'] = [
+            {'id': verse.id, 'vOrder': verse.v_order,
+             'coupletIndex': verse.couplet_index,
+             'versePosition': verse.verse_position, 'text': verse.text}
+            for verse in self.verses]
+        return payload
@@ -0,0 +1,288 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field
+from typing import Callable, Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlsplit
+import json
+import os
+import tempfile
+
+from .ganjoor import Ganjoor
+from .models import Category, Poet, Poem
+from .ratelimit import RateLimiter
+
+POETS = 'poets'
+CATEGORY = 'category'
+POEM = 'poem'
+
+Task = Tuple[str, int]
+
+
+class Sink:
+    """Receives everything a Crawler fetches. Methods are always called
+    from the thread running Crawler.run, one at a time."""
+
+    def on_poet(self, poet: Poet) -> None:
+        pass
+
+    def on_category(self, category: Category) -> None:
+        pass
+
+    def on_poem(self, poem: Poem) -> None:
+        pass
+
+    def on_failure(self, task: Task, error: Exception) -> None:
+        pass
+
+    def close(self) -> None:
+        pass
+
+
+class CallbackSink(Sink):
+    """Sink calling ``callback(poem)`` for every fetched poem."""
+
+    def __init__(self, callback: Callable[[Poem], None]) -> None:
+        self.callback = callback
+
+    def on_poem(self, poem: Poem) -> None:
+        self.callback(poem)
+
+
+@dataclass
+class Checkpoint:
+    """Crawl frontier persisted as JSON so a stopped crawl can resume.
+    Tasks that were in flight when it was saved are kept as pending.
+
+    While a crawl runs, changes are appended to a journal next to ``path``
+    by ``record`` and ``flush``, so a checkpoint costs as much as the work
+    done since the last one. ``save`` compacts the journal into ``path``."""
+    path: Optional[str] = None
+    pending: List[Task] = field(default_factory=list)
+    done: Dict[str, List[int]] = field(default_factory=dict)
+    failed: Dict[str, List[int]] = field(default_factory=dict)
+    _entries: List[list] = field(default_factory=list, repr=False,
+                                 compare=False)
+
+    @property
+    def journal_path(self) -> Optional[str]:
+        return None if self.path is None else self.path+'.journal'
+
+    @classmethod
+    def load(cls, path: Optional[str]) -> Checkpoint:
+        checkpoint = cls(path)
+        if path is None:
+            return checkpoint
+        if os.path.exists(path):
+            with open(path, encoding='utf-8') as checkpoint_file:
+                state = json.load(checkpoint_file)
+            checkpoint.pending = [tuple(task) for task in state['pending']]
+            checkpoint.done, checkpoint.failed = state['done'], state['failed']
+        if os.path.exists(checkpoint.journal_path):
+            checkpoint._replay()
+        return checkpoint
+
+    def _replay(self) -> None:
+        pending = dict.fromkeys(self.pending)
+        finished = {'done': {kind: set(ids)
+                             for kind, ids in self.done.items()},
+                    'failed': {kind: set(ids)
+                               for kind, ids in self.failed.items()}}
+        with open(self.journal_path, encoding='utf-8') as journal:
+            for line in journal:
+                try:
+                    state, kind, id = json.loads(line)
+                except ValueError:
+                    # A line cut short by a crash ends the journal.
+                    break
+                if state == 'pending':
+                    pending[kind, id] = None
+                else:
+                    pending.pop((kind, id), None)
+                    finished[state].setdefault(kind, set()).add(id)
+        self.pending = list(pending)
+        self.done = {kind: sorted(ids)
+                     for kind, ids in finished['done'].items()}
+        self.failed = {kind: sorted(ids)
+                       for kind, ids in finished['failed'].items()}
+
+    def record(self, state: str, task: Task) -> None:
+        """Queues a task becoming ``'pending'``, ``'done'`` or
+        ``'failed'`` for the next ``flush``."""
+        if self.path is not None:
+            self._entries.append([state, *task])
+
+    def flush(self) -> None:
+        """Appends the recorded changes to the journal."""
+        if not self._entries:
+            return
+        with open(self.journal_path, 'a', encoding='utf-8') as journal:
+            journal.writelines(json.dumps(entry)+'\n'
+                               for entry in self._entries)
+        self._entries.clear()
+
+    def save(self) -> None:
+        if self.path is None:
+            return
+        directory = os.path.dirname(os.path.abspath(self.path))
+        descriptor, temp_path = tempfile.mkstemp(dir=directory)
+        with os.fdopen(descriptor, 'w', encoding='utf-8') as checkpoint_file:
+            json.dump({'pending': self.pending, 'done': self.done,
+                       'failed': self.failed}, checkpoint_file)
+        os.replace(temp_path, self.path)
+        self._entries.clear()
+        if os.path.exists(self.journal_path):
+            os.remove(self.journal_path)
+
+
+@dataclass
+class CrawlStats:
+    poets: int = 0
+    categories: int = 0
+    poems: int = 0
+    failures: int = 0
+
+
+class Crawler:
+    """Mirrors the corpus by walking poets, their category trees and every
+    poem listed in them.
+
+    Fetches run on ``max_workers`` threads sharing the client's pooled
+    transport, limited to ``rate`` requests per second per host when given.
+    Results are handed to ``sink`` (a Sink or a callable receiving each
+    poem) and progress is journaled next to ``checkpoint_path`` every
+    ``checkpoint_every`` tasks, so running a crawler again with the same
+    path resumes where the previous run stopped. Failed tasks are queued
+    again up to ``max_attempts`` times, so the default client does not
+    also retry them in its transport."""
+
+    def __init__(self, ganjoor: Ganjoor = None, sink=None,
+                 checkpoint_path: str = None, max_workers: int = 8,
+                 rate: float = None, poet_ids: Iterable[int] = None,
+                 poem_flags: Dict[str, bool] = None,
+                 checkpoint_every: int = 100, max_attempts: int = 3) -> None:
+        self.ganjoor = ganjoor or Ganjoor(cache=False, retry=False,
+                                          pool_size=max_workers)
+        if sink is None:
+            sink = Sink()
+        elif not isinstance(sink, Sink):
+            sink = CallbackSink(sink)
+        self.sink = sink
+        self.checkpoint = Checkpoint.load(checkpoint_path)
+        self.max_workers = max_workers
+        self.rate_limiter = RateLimiter(rate) if rate else None
+        self.poet_ids = set(poet_ids) if poet_ids is not None else None
+        self.poem_flags = poem_flags if poem_flags is not None else {
+            'complete': True}
+        self.checkpoint_every = checkpoint_every
+        self.max_attempts = max_attempts
+        self.stats = CrawlStats()
+        self._stopped = False
+
+    def stop(self) -> None:
+        """Asks a running crawl to checkpoint and return."""
+        self._stopped = True
+
+    def _throttle(self) -> None:
+        if self.rate_limiter is not None:
+            host = urlsplit(self.ganjoor.transport.base_url).netloc
+            self.rate_limiter.acquire(host)
+
+    def _fetch(self, task: Task):
+        kind, id = task
+        self._throttle()
+        transport = self.ganjoor.transport
+        if kind == POETS:
+            return Poet.all(transport=transport)
+        if kind == CATEGORY:
+            return Category.find(id, with_poems=True, transport=transport)
+        return Poem.find(id, transport=transport, **self.poem_flags)
+
+    def _expand(self, task: Task, result) -> List[Task]:
+        kind = task[0]
+        if kind == POETS:
+            tasks = []
+            for poet in result:
+                if self.poet_ids is None or poet.id in self.poet_ids:
+                    self.sink.on_poet(poet)
+                    self.stats.poets += 1
+                    tasks.append((CATEGORY, poet.root_cat_id))
+            return tasks
+        if kind == CATEGORY:
+            self.sink.on_category(result)
+            self.stats.categories += 1
+            return ([(CATEGORY, child.id) for child in result.children] +
+                    [(POEM, poem.id) for poem in result.poems])
+        self.sink.on_poem(result)
+        self.stats.poems += 1
+        return []
+
+    def run(self) -> CrawlStats:
+        checkpoint = self.checkpoint
+        done = {kind: set(ids) for kind, ids in checkpoint.done.items()}
+        failed = {kind: set(ids) for kind, ids in checkpoint.failed.items()}
+        frontier = deque(checkpoint.pending)
+        if not frontier and not done:
+            frontier.append((POETS, 0))
+            checkpoint.record('pending', (POETS, 0))
+        seen = set(frontier)
+        for kind, ids in done.items():
+            seen.update((kind, id) for id in ids)
+        attempts: Dict[Task, int] = {}
+        in_flight = {}
+        completed = 0
+
+        def compact():
+            checkpoint.pending = list(in_flight.values())+list(frontier)
+            checkpoint.done = {kind: sorted(ids) for kind, ids in done.items()}
+            checkpoint.failed = {kind: sorted(ids)
+                                 for kind, ids in failed.items()}
+            checkpoint.save()
+
+        executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        try:
+            while (frontier or in_flight) and not self._stopped:
+                while frontier and len(in_flight) < self.max_workers:
+                    task = frontier.popleft()
+                    in_flight[executor.submit(self._fetch, task)] = task
+                finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in finished:
+                    task = in_flight.pop(future)
+                    try:
+                        result = future.result()
+                    except Exception as error:
+                        attempts[task] = attempts.get(task, 0)+1
+                        if attempts[task] < self.max_attempts:
+                            frontier.append(task)
+                        else:
+                            failed.setdefault(task[0], set()).add(task[1])
+                            checkpoint.record('failed', task)
+                            self.stats.failures += 1
+                            self.sink.on_failure(task, error)
+                        continue
+                    try:
+                        new_tasks = self._expand(task, result)
+                    except BaseException:
+                        # Keeps the task, and so its subtree, in the
+                        # checkpoint for the next run.
+                        frontier.appendleft(task)
+                        raise
+                    for new_task in new_tasks:
+                        if new_task not in seen:
+                            seen.add(new_task)
+                            frontier.append(new_task)
+                            checkpoint.record('pending', new_task)
+                    done.setdefault(task[0], set()).add(task[1])
+                    checkpoint.record('done', task)
+                    completed += 1
+                    if completed % self.checkpoint_every == 0:
+                        checkpoint.flush()
+        finally:
+            for future in in_flight:
+                future.cancel()
+            executor.shutdown(wait=True)
+            compact()
+            self.sink.close()
+        return self.stats
@@ -0,0 +1,126 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from bisect import bisect_left
+from threading import Lock
+from typing import Callable, Dict, Iterator, List, Optional, Tuple
+import time
+
+from .models import Poet
+from .search import normalize_persian
+
+
+class _Indexes:
+    """Immutable lookup tables over one list of poets. Only ``loaded_at``
+    moves, when a reload fails."""
+
+    def __init__(self, poets: List[Poet]) -> None:
+        self.poets = poets
+        self.loaded_at = time.monotonic()
+        self.by_id: Dict[int, Poet] = {}
+        self.by_url: Dict[str, Poet] = {}
+        self.by_nickname: Dict[str, Poet] = {}
+        self.by_root_cat_id: Dict[int, Poet] = {}
+        names: Dict[Tuple[str, int], None] = {}
+        for position, poet in enumerate(poets):
+            self.by_id[poet.id] = poet
+            if poet.full_url:
+                self.by_url[poet.full_url] = poet
+            if poet.nickname:
+                self.by_nickname[poet.nickname] = poet
+            if poet.root_cat_id is not None:
+                self.by_root_cat_id[poet.root_cat_id] = poet
+            for name in (poet.name, poet.nickname):
+                words = normalize_persian(name or '').split()
+                # Every word start, so "حافظ" also finds "خواجه حافظ".
+                for start in range(len(words)):
+                    names[(' '.join(words[start:]), position)] = None
+        self.names = sorted(names)
+
+
+class PoetDirectory:
+    """Every poet, loaded at once with ``load`` (e.g. Poet.all) and indexed
+    by id, url, nickname and root category id.
+
+    Lookups are dict accesses on an immutable snapshot. When
+    ``refresh_interval`` seconds have passed since the last load, the next
+    lookup reloads in the calling thread while other threads keep using
+    the previous snapshot until the new one is swapped in. A reload that
+    fails keeps the previous snapshot for another ``refresh_interval``;
+    only the first load raises. Poets loaded with Poet.all come without
+    their root category: poet.category is None until
+    poet.fetch_category()."""
+
+    def __init__(self, load: Callable[[], List[Poet]],
+                 refresh_interval: float = None) -> None:
+        self.load = load
+        self.refresh_interval = refresh_interval
+        self._indexes: Optional[_Indexes] = None
+        self._lock = Lock()
+
+    def refresh(self) -> None:
+        """Reloads the poets now."""
+        with self._lock:
+            self._indexes = _Indexes(list(self.load()))
+
+    def _current(self) -> _Indexes:
+        indexes = self._indexes
+        if indexes is None:
+            with self._lock:
+                if self._indexes is None:
+                    self._indexes = _Indexes(list(self.load()))
+                return self._indexes
+        if (self.refresh_interval is not None and
+                time.monotonic()-indexes.loaded_at >= self.refresh_interval
+                and self._lock.acquire(blocking=False)):
+            try:
+                if self._indexes is indexes:
+                    self._indexes = _Indexes(list(self.load()))
+            except Exception:
+                # Stale poets beat failing every lookup until the API is
+                # back; try again after another interval.
+                indexes.loaded_at = time.monotonic()
+            finally:
+                self._lock.release()
+        return self._indexes
+
+    def __len__(self) -> int:
+        return len(self._current().poets)
+
+    def __iter__(self) -> Iterator[Poet]:
+        return iter(self._current().poets)
+
+    def __contains__(self, id: int) -> bool:
+        return id in self._current().by_id
+
+    def all(self) -> List[Poet]:
+        return list(self._current().poets)
+
+    def by_id(self, id: int) -> Optional[Poet]:
+        return self._current().by_id.get(id)
+
+    def by_url(self, url: str) -> Optional[Poet]:
+        return self._current().by_url.get(url)
+
+    def by_nickname(self, nickname: str) -> Optional[Poet]:
+        return self._current().by_nickname.get(nickname)
+
+    def by_root_cat_id(self, root_cat_id: int) -> Optional[Poet]:
+        return self._current().by_root_cat_id.get(root_cat_id)
+
+    def complete(self, prefix: str, limit: int = 10) -> List[Poet]:
+        """Poets whose name or nickname has a word starting with
+        ``prefix``, compared after Persian normalization, in directory
+        order."""
+        prefix = ' '.join(normalize_persian(prefix).split())
+        if not prefix:
+            return []
+        indexes = self._current()
+        names = indexes.names
+        positions = set()
+        for name, position in names[bisect_left(names, (prefix, -1)):]:
+            if not name.startswith(prefix):
+                break
+            positions.add(position)
+        return [indexes.poets[position]
+                for position in sorted(positions)[:limit]]
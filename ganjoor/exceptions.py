@@ -1,7 +1,38 @@
 # Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
 # SPDX-License-Identifier: MIT
+from typing import Optional
+
 
 class GanjoorException(Exception):
     pass
 
-# TODO: Add more Exceptions
+
+class ResponseError(GanjoorException):
+    """The API answered with a status code other than 200."""
+
+    def __init__(self, status_code: int, reason: str,
+                 retry_after: Optional[float] = None) -> None:
+        super().__init__(
+            f"Invalid Response Code: {status_code} with Message: {reason}")
+        self.status_code = status_code
+        self.reason = reason
+        self.retry_after = retry_after
+
+
+class RateLimitedError(ResponseError):
+    """The API kept answering 429 Too Many Requests; ``retry_after`` holds
+    the delay it asked for, if any."""
+
+
+class TransportError(GanjoorException):
+    """The request could not be sent or its response never arrived."""
+
+
+class CircuitOpenError(GanjoorException):
+    """Raised without sending the request while the circuit breaker is
+    open, i.e. after too many consecutive failures."""
+
+    def __init__(self, retry_in: float) -> None:
+        super().__init__(
+            f"Circuit open after repeated failures, retry in {retry_in:.1f}s")
+        self.retry_in = retry_in
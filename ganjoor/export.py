@@ -0,0 +1,158 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from typing import Dict, Iterable, List
+
+from .crawler import Sink
+from .exceptions import GanjoorException
+from .models import Poem
+
+PARQUET = 'parquet'
+ARROW = 'arrow'
+
+DEFAULT_ROW_GROUP_SIZE = 64*1024
+
+COLUMNS = ('poem_id', 'poet_id', 'cat_id', 'v_order', 'couplet_index',
+           'verse_position', 'text', 'metre', 'rhyme_letters')
+
+
+def _import_pyarrow():
+    try:
+        import pyarrow
+    except ImportError as error:
+        raise GanjoorException(
+            "Columnar export requires pyarrow, install it with "
+            "'pip install pyarrow'") from error
+    return pyarrow
+
+
+def _schema(pa):
+    return pa.schema([
+        ('poem_id', pa.int64()),
+        ('poet_id', pa.int64()),
+        ('cat_id', pa.int64()),
+        ('v_order', pa.int32()),
+        ('couplet_index', pa.int32()),
+        ('verse_position', pa.int32()),
+        ('text', pa.string()),
+        ('metre', pa.string()),
+        ('rhyme_letters', pa.string()),
+    ])
+
+
+class ColumnarExporter(Sink):
+    """Writes one row per verse of every poem it is given to a Parquet or
+    Arrow IPC file.
+
+    Rows are read straight from the poem payloads into column buffers, no
+    Verse objects are built, and the buffers are written out as a row group
+    every ``row_group_size`` rows, so memory stays flat whatever the size
+    of the corpus. Can be passed to a Crawler as its sink; the file is
+    complete once the exporter is closed."""
+
+    def __init__(self, path: str, format: str = PARQUET,
+                 row_group_size: int = DEFAULT_ROW_GROUP_SIZE,
+                 compression: str = 'zstd') -> None:
+        if format not in (PARQUET, ARROW):
+            raise GanjoorException(f"Unknown export format {format!r}")
+        self._pa = _import_pyarrow()
+        self.path = path
+        self.format = format
+        self.row_group_size = row_group_size
+        self.compression = compression
+        self.schema = _schema(self._pa)
+        self.rows = 0
+        self._writer = None
+        self._closed = False
+        self._buffer: Dict[str, List] = {name: [] for name in COLUMNS}
+        self._buffered = 0
+
+    def __enter__(self) -> ColumnarExporter:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _open_writer(self):
+        if self.format == PARQUET:
+            from pyarrow import parquet
+            return parquet.ParquetWriter(self.path, self.schema,
+                                         compression=self.compression)
+        from pyarrow import ipc
+        return ipc.new_file(self.path, self.schema)
+
+    def add_poem(self, poem: Poem) -> None:
+        payload = poem.to_dict()
+        verses = payload.get('verses') or []
+        if not verses:
+            return
+        category = payload.get('category') or {}
+        poet_id = (category.get('poet') or {}).get('id')
+        cat_id = (category.get('cat') or {}).get('id')
+        metre = (payload.get('ganjoorMetre') or {}).get('rhythm')
+        rhyme_letters = payload.get('rhymeLetters')
+        count = len(verses)
+        buffer = self._buffer
+        buffer['poem_id'].extend([payload.get('id')]*count)
+        buffer['poet_id'].extend([poet_id]*count)
+        buffer['cat_id'].extend([cat_id]*count)
+        buffer['metre'].extend([metre]*count)
+        buffer['rhyme_letters'].extend([rhyme_letters]*count)
+        for verse in verses:
+            buffer['v_order'].append(verse.get('vOrder'))
+            buffer['couplet_index'].append(verse.get('coupletIndex'))
+            buffer['verse_position'].append(verse.get('versePosition'))
+            buffer['text'].append(verse.get('text'))
+        self._buffered += count
+        if self._buffered >= self.row_group_size:
+            self._write(self._buffered - self._buffered % self.row_group_size)
+
+    def add_poems(self, poems: Iterable[Poem]) -> None:
+        for poem in poems:
+            self.add_poem(poem)
+
+    def on_poem(self, poem: Poem) -> None:
+        self.add_poem(poem)
+
+    def _write(self, count: int) -> None:
+        """Writes the first ``count`` buffered rows, in row groups of at
+        most ``row_group_size`` rows, and keeps the rest buffered."""
+        if self._writer is None:
+            self._writer = self._open_writer()
+        written = {name: column[:count]
+                   for name, column in self._buffer.items()}
+        self._buffer = {name: column[count:]
+                        for name, column in self._buffer.items()}
+        table = self._pa.Table.from_pydict(written, schema=self.schema)
+        if self.format == PARQUET:
+            self._writer.write_table(table,
+                                     row_group_size=self.row_group_size)
+        else:
+            self._writer.write_table(table,
+                                     max_chunksize=self.row_group_size)
+        self.rows += count
+        self._buffered -= count
+
+    def flush(self) -> None:
+        """Writes out every buffered row."""
+        if self._buffered:
+            self._write(self._buffered)
+
+    def close(self) -> None:
+        if self._closed:
+            return
+        self._closed = True
+        self.flush()
+        if self._writer is None:
+            # Nothing was exported, still leave a valid empty file.
+            self._writer = self._open_writer()
+        self._writer.close()
+
+
+def export_poems(poems: Iterable[Poem], path: str, format: str = PARQUET,
+                 row_group_size: int = DEFAULT_ROW_GROUP_SIZE) -> int:
+    """Exports the verses of ``poems`` to ``path`` and returns the number of
+    rows written."""
+    with ColumnarExporter(path, format, row_group_size) as exporter:
+        exporter.add_poems(poems)
+    return exporter.rows
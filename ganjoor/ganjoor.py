@@ -1,41 +1,108 @@
 # Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
 # SPDX-License-Identifier: MIT
-from typing import List
-import requests
+from functools import partial
+from typing import Dict, Iterable, Iterator, List, Union
 from ganjoor.exceptions import GanjoorException
 
-import requests_cache
-from requests_cache import DO_NOT_CACHE
-
 from .models import Category, Poet, Poem
+from .bulk import BulkResult, fetch_concurrently
+from .cache import BaseCache, ExpireAfter, MemoryCache
 from .config import GANJGAH_BASE_URL
+from .directory import PoetDirectory
+from .instrumentation import Instrumentation
+from .pagination import iter_pages
+from .ratelimit import RateLimiter
+from .retry import CircuitBreaker, RetryPolicy
+from .transport import DEFAULT_POOL_SIZE, DEFAULT_TIMEOUT, Transport
+from .walk import CategoryTree, CategoryVisit, walk_categories
 
 
 class Ganjoor:
     def __init__(self, token=None, language="string", app_name="pythonclient",
-                 base_url=GANJGAH_BASE_URL, cache_time=-1):
+                 base_url=GANJGAH_BASE_URL, cache_time=-1,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 headers: Dict[str, str] = None, cache: BaseCache = None,
+                 expire_after: Dict[str, ExpireAfter] = None,
+                 offline: str = None, search_index=None, similar_index=None,
+                 retry: RetryPolicy = None,
+                 rate_limit: Union[float, RateLimiter] = None,
+                 circuit_breaker: CircuitBreaker = None,
+                 coalesce: bool = True, json_loads=None,
+                 poet_directory: Union[bool, PoetDirectory] = False,
+                 instrumentation: Instrumentation = None):
+        """Transport settings, from pool_size to instrumentation, are passed
+        to ganjoor.transport.Transport. cache defaults to a MemoryCache,
+        False disables it, and cache_time is the '*' entry of expire_after.
+        offline (a SQLiteMirror path), search_index, similar_index and
+        poet_directory (True for one refreshed hourly) answer lookups
+        locally, see ganjoor.mirror, search, similar and directory."""
         self.token = token
         self.language = language
         self.base_url = base_url
         self.app_name = app_name
+        self.mirror = None
+        self.search_index = search_index
+        self.similar_index = similar_index
+        self._category_trees: Dict[tuple, CategoryTree] = {}
+        if offline is not None:
+            from .mirror import SQLiteMirror
+            self.mirror = SQLiteMirror(offline, read_only=True)
+            cache = False
+
+        if cache is None:
+            cache = MemoryCache()
+        elif cache is False:
+            cache = None
+        urls_expire_after = {'*': cache_time}
+        urls_expire_after.update(expire_after or {})
+        self.transport = Transport(base_url=base_url, pool_size=pool_size,
+                                   timeout=timeout, headers=headers,
+                                   cache=cache,
+                                   expire_after=urls_expire_after,
+                                   retry=retry, rate_limit=rate_limit,
+                                   circuit_breaker=circuit_breaker,
+                                   coalesce=coalesce,
+                                   json_loads=json_loads,
+                                   instrumentation=instrumentation)
+        if poet_directory is True:
+            poet_directory = PoetDirectory(self._load_poets,
+                                           refresh_interval=3600)
+        elif poet_directory is False:
+            poet_directory = None
+        self.poet_directory = poet_directory
+
+    def close(self) -> None:
+        """Releases the pooled connections, the cache and the offline
+        mirror's database connection."""
+        self.transport.close()
+        if self.mirror is not None:
+            self.mirror.close()
+
+    def __enter__(self) -> 'Ganjoor':
+        return self
 
-        urls_expire_after = {
-            GANJGAH_BASE_URL+Poem._urls['random']: DO_NOT_CACHE,
-            GANJGAH_BASE_URL+Poem._urls['hafez_faal']: DO_NOT_CACHE,
-            '*': cache_time
-        }
-        requests_cache.install_cache(
-            cache_name='ganjoor_cache', backend='sqlite',
-            urls_expire_after=urls_expire_after)
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    @property
+    def offline(self) -> bool:
+        return self.mirror is not None
+
+    def _require_online(self) -> None:
+        if self.offline:
+            raise GanjoorException(
+                "This method is not available in offline mode")
 
     def log_in(self, username, password):
+        self._require_online()
         self.username = username
         self.password = password
-        response = requests.post(self.base_url+"/api/users/login",
-                                 json={"username": self.username,
-                                       "password": self.password,
-                                       "clientAppName": self.app_name,
-                                       "language": self.language})
+        response = self.transport.post("/api/users/login",
+                                       json={"username": self.username,
+                                             "password": self.password,
+                                             "clientAppName": self.app_name,
+                                             "language": self.language})
         if response.status_code == 200:
             self.auth_token = response.json()['token']
         else:
@@ -49,59 +116,208 @@ class Ganjoor:
         else:
             pass  # TODO: get Bookmarks
 
+    def _load_poets(self) -> List[Poet]:
+        if self.offline:
+            return self.mirror.all_poets()
+        return Poet.all(transport=self.transport)
+
     def get_all_poets(self) -> List[Poet]:
-        return Poet.all()
+        if self.poet_directory is not None:
+            return self.poet_directory.all()
+        return self._load_poets()
 
     def find_poet_by_id(self, id: int) -> Poet:
-        return Poet.find(id)
+        if self.poet_directory is not None:
+            poet = self.poet_directory.by_id(id)
+            if poet is not None:
+                return poet
+        if self.offline:
+            return self.mirror.poet(id)
+        return Poet.find(id, transport=self.transport)
 
     def find_poet_by_url(self, url: str) -> Poet:
-        return Poet.find_by_url(url)
+        if self.poet_directory is not None:
+            poet = self.poet_directory.by_url(url)
+            if poet is not None:
+                return poet
+        if self.offline:
+            return self.mirror.poet_by_url(url)
+        return Poet.find_by_url(url, transport=self.transport)
 
     def find_category_by_id(self, id: int, with_poems=True) -> Category:
-        return Category.find(id, with_poems=with_poems)
+        if self.offline:
+            return self.mirror.category(id, with_poems=with_poems)
+        return Category.find(id, with_poems=with_poems,
+                             transport=self.transport)
 
     def find_category_by_url(self, url: str, with_poems=True) -> Category:
-        return Category.find_by_url(url, with_poems=with_poems)
+        if self.offline:
+            return self.mirror.category_by_url(url, with_poems=with_poems)
+        return Category.find_by_url(url, with_poems=with_poems,
+                                    transport=self.transport)
+
+    def walk_categories(self, root_id: int, max_workers: int = None,
+                        with_poems=True) -> Iterator[CategoryVisit]:
+        """Category.walk over this client, or over the mirror when offline.
+        max_workers defaults to the transport's pool size."""
+        return walk_categories(
+            partial(self.find_category_by_id, with_poems=with_poems),
+            root_id, max_workers or self.transport.pool_size)
+
+    def category_tree(self, root_id: int, max_workers: int = None,
+                      with_poems=True, refresh=False) -> CategoryTree:
+        """The materialized tree under root_id, walked once and then kept
+        on the client until refresh=True."""
+        key = (root_id, with_poems)
+        tree = self._category_trees.get(key)
+        if tree is None or refresh:
+            tree = self._category_trees[key] = CategoryTree(
+                self.walk_categories(root_id, max_workers, with_poems))
+        return tree
 
     def find_poem_by_id(self, id: int, complete=False, category_info=False,
                         category_poems=False, rhymes=False,
                         recitations=False, images=False,
                         songs=False, comments=False,
                         verse_details=False, navigation=False) -> Poem:
+        if self.offline:
+            return self.mirror.poem(id)
         return Poem.find(id, complete=complete,
                          category_info=category_info,
                          category_poems=category_poems, rhymes=rhymes,
                          recitations=recitations, images=images, songs=songs,
                          comments=comments, verse_details=verse_details,
-                         navigation=navigation)
+                         navigation=navigation, transport=self.transport)
 
     def find_poem_by_url(self, url: str, complete=False, category_info=False,
                          category_poems=False, rhymes=False,
                          recitations=False, images=False,
                          songs=False, comments=False,
                          verse_details=False, navigation=False) -> Poem:
+        if self.offline:
+            return self.mirror.poem_by_url(url)
         return Poem.find_by_url(url=url, complete=complete,
                                 category_info=category_info,
                                 category_poems=category_poems, rhymes=rhymes,
                                 recitations=recitations, images=images, songs=songs,
                                 comments=comments, verse_details=verse_details,
-                                navigation=navigation)
+                                navigation=navigation,
+                                transport=self.transport)
+
+    def find_poems_by_ids(self, ids: Iterable[int], max_workers: int = None,
+                          ordered: bool = True,
+                          **find_flags) -> Iterator[BulkResult]:
+        """Fetches many poems concurrently over the client's pool.
+        Accepts the same flags as Poem.find and yields a BulkResult per id
+        (in input order unless ordered=False), failures are reported on
+        the result instead of being raised.
+        max_workers defaults to the transport's pool size."""
+        from inspect import signature
+        signature(self.find_poem_by_id).bind(None, **find_flags)
+        fetch = partial(self.find_poem_by_id, **find_flags)
+        return fetch_concurrently(fetch, ids,
+                                  max_workers or self.transport.pool_size,
+                                  ordered)
+
+    def find_poems_by_urls(self, urls: Iterable[str], max_workers: int = None,
+                           ordered: bool = True,
+                           **find_flags) -> Iterator[BulkResult]:
+        """Same as find_poems_by_ids but keyed by poem urls."""
+        from inspect import signature
+        signature(self.find_poem_by_url).bind(None, **find_flags)
+        fetch = partial(self.find_poem_by_url, **find_flags)
+        return fetch_concurrently(fetch, urls,
+                                  max_workers or self.transport.pool_size,
+                                  ordered)
+
+    def fetch_related(self, poems: Iterable[Poem], max_workers: int = None,
+                      recitations=True, images=True, songs=True,
+                      comments=True) -> List[BulkResult]:
+        """Fills in the recitations, images, songs and comments of every
+        poem concurrently, see Poem.fetch_related_many.
+        max_workers defaults to the transport's pool size."""
+        self._require_online()
+        poems = list(poems)
+        for poem in poems:
+            if poem._transport is None:
+                poem._transport = self.transport
+        return Poem.fetch_related_many(
+            poems, max_workers or self.transport.pool_size,
+            recitations=recitations, images=images, songs=songs,
+            comments=comments)
 
     def random_poem(self, poet_id=None) -> Poem:
-        return Poem.random(poet_id=poet_id)
+        if self.offline:
+            return self.mirror.random_poem(poet_id)
+        return Poem.random(poet_id=poet_id, transport=self.transport)
+
+    def _find_indexed_poems(self, ids: List[int], index=None) -> List[Poem]:
+        """Poems for the ids found in a local index, served from the index
+        when it keeps them, otherwise from the mirror or fetched
+        concurrently. The first failure is raised."""
+        poems = {id: index.poem(id) if index is not None else None
+                 for id in ids}
+        missing = [id for id, poem in poems.items() if poem is None]
+        if self.offline:
+            poems.update((id, self.find_poem_by_id(id)) for id in missing)
+        elif missing:
+            for result in self.find_poems_by_ids(missing):
+                if not result.ok:
+                    raise result.error
+                poems[result.key] = result.value
+        return [poems[id] for id in ids]
 
     def find_similar_poems(self, page_size: int = 5, page_number: int = 1,
                            metre: str = None, rhyme: str = None,
                            poet_id=0) -> List[Poem]:
+        if self.similar_index is not None:
+            ids = self.similar_index.similar(page_number=page_number,
+                                             page_size=page_size, metre=metre,
+                                             rhyme=rhyme, poet_id=poet_id)
+            return self._find_indexed_poems(ids, self.similar_index)
+        self._require_online()
         return Poem.similar(page_number=page_number,
                             page_size=page_size, metre=metre, rhyme=rhyme,
-                            poet_id=poet_id)
+                            poet_id=poet_id, transport=self.transport)
 
     def search_poems(self, term: str, page_size: int = 5, page_number: int = 1,
                      cat_id: id = 0, poet_id=0) -> List[Poem]:
+        if self.search_index is not None:
+            ids = self.search_index.search(term, page_number=page_number,
+                                           page_size=page_size,
+                                           cat_id=cat_id, poet_id=poet_id)
+            return self._find_indexed_poems(ids, self.search_index)
+        self._require_online()
         return Poem.search(page_number=page_number, term=term,
-                           page_size=page_size, cat_id=cat_id, poet_id=poet_id)
+                           page_size=page_size, cat_id=cat_id, poet_id=poet_id,
+                           transport=self.transport)
+
+    def iter_similar(self, metre: str = None, rhyme: str = None, poet_id=0,
+                     page_size: int = 5, page_number: int = 1,
+                     prefetch=True) -> Iterator[Poem]:
+        if self.similar_index is not None:
+            fetch_page = partial(self.find_similar_poems, page_size,
+                                 metre=metre, rhyme=rhyme, poet_id=poet_id)
+            return iter_pages(fetch_page, page_size, page_number,
+                              prefetch=False)
+        self._require_online()
+        return Poem.iter_similar(metre=metre, rhyme=rhyme, poet_id=poet_id,
+                                 page_size=page_size, page_number=page_number,
+                                 prefetch=prefetch, transport=self.transport)
+
+    def iter_search(self, term: str, cat_id: int = 0, poet_id=0,
+                    page_size: int = 5, page_number: int = 1,
+                    prefetch=True) -> Iterator[Poem]:
+        if self.search_index is not None:
+            fetch_page = partial(self.search_poems, term, page_size,
+                                 cat_id=cat_id, poet_id=poet_id)
+            return iter_pages(fetch_page, page_size, page_number,
+                              prefetch=False)
+        self._require_online()
+        return Poem.iter_search(term, cat_id=cat_id, poet_id=poet_id,
+                                page_size=page_size, page_number=page_number,
+                                prefetch=prefetch, transport=self.transport)
 
     def hafez_faal(self) -> Poem:
-        return Poem.hafez_faal()
+        self._require_online()
+        return Poem.hafez_faal(transport=self.transport)
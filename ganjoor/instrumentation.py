@@ -0,0 +1,220 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from bisect import bisect_left
+from threading import Lock
+from typing import Dict, Iterable, List, Optional, Sequence
+
+CACHE_HIT = 'hit'
+CACHE_MISS = 'miss'
+CACHE_STALE = 'stale'
+
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0,
+                   10.0)
+
+
+class Instrumentation:
+    """Hooks a transport calls while it serves requests, all doing nothing
+    here; override the ones you need.
+
+    ``endpoint`` is always the template from the models' ``_urls`` tables
+    (e.g. ``Poem._urls['find']``), never the formatted URL, so metrics stay
+    grouped per kind of call. Hooks may be called from several threads at
+    once and should be quick, they run on the request path."""
+
+    def on_request(self, endpoint: str, status_code: Optional[int],
+                   seconds: float, bytes_received: int) -> None:
+        """An HTTP attempt finished. ``status_code`` is None when it got no
+        response (connection error or timeout)."""
+
+    def on_retry(self, endpoint: str, attempt: int, wait: float) -> None:
+        """Attempt number ``attempt`` failed and is retried in ``wait``
+        seconds."""
+
+    def on_cache(self, endpoint: str, outcome: str) -> None:
+        """A cache lookup ended with CACHE_HIT, CACHE_MISS or CACHE_STALE
+        (found but expired)."""
+
+    def on_decode(self, endpoint: str, seconds: float) -> None:
+        """A response body was decoded from JSON."""
+
+    def on_construct(self, endpoint: str, seconds: float) -> None:
+        """Models were built from a decoded response body."""
+
+
+class Histogram:
+    """Counts of observed values per upper bound, Prometheus style."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self.counts = [0]*(len(self.buckets)+1)
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, value: float) -> None:
+        self.counts[bisect_left(self.buckets, value)] += 1
+        self.count += 1
+        self.sum += value
+
+    def cumulative(self) -> List[int]:
+        """Observations at or below each bucket, the last one being +Inf."""
+        total, counts = 0, []
+        for count in self.counts:
+            total += count
+            counts.append(total)
+        return counts
+
+    def to_dict(self) -> dict:
+        bounds = [*map(_format_number, self.buckets), '+Inf']
+        return {'count': self.count, 'sum': self.sum,
+                'buckets': dict(zip(bounds, self.cumulative()))}
+
+
+class EndpointMetrics:
+    """Everything recorded for one endpoint template."""
+
+    def __init__(self, buckets: Sequence[float]) -> None:
+        self.latency = Histogram(buckets)
+        self.decode = Histogram(buckets)
+        self.construct = Histogram(buckets)
+        self.statuses: Dict[str, int] = {}
+        self.cache = {CACHE_HIT: 0, CACHE_MISS: 0, CACHE_STALE: 0}
+        self.bytes_received = 0
+        self.retries = 0
+
+    def to_dict(self) -> dict:
+        return {'latency': self.latency.to_dict(),
+                'statuses': dict(self.statuses),
+                'bytes_received': self.bytes_received,
+                'cache': dict(self.cache), 'retries': self.retries,
+                'decode': self.decode.to_dict(),
+                'construct': self.construct.to_dict()}
+
+
+class MetricsCollector(Instrumentation):
+    """Keeps every hook call in memory, per endpoint template.
+
+    Latencies, decode and construction times go into histograms with
+    ``buckets`` (seconds). Responses are counted per status code, with
+    ``'error'`` for attempts that got none. Read the numbers with
+    :meth:`snapshot` or expose them with :meth:`to_prometheus`."""
+
+    def __init__(self, buckets: Sequence[float] = DEFAULT_BUCKETS) -> None:
+        self.buckets = tuple(sorted(buckets))
+        self._endpoints: Dict[str, EndpointMetrics] = {}
+        self._lock = Lock()
+
+    def _metrics(self, endpoint: str) -> EndpointMetrics:
+        metrics = self._endpoints.get(endpoint)
+        if metrics is None:
+            metrics = self._endpoints[endpoint] = EndpointMetrics(
+                self.buckets)
+        return metrics
+
+    def on_request(self, endpoint, status_code, seconds,
+                   bytes_received) -> None:
+        status = 'error' if status_code is None else str(status_code)
+        with self._lock:
+            metrics = self._metrics(endpoint)
+            metrics.latency.observe(seconds)
+            metrics.statuses[status] = metrics.statuses.get(status, 0)+1
+            metrics.bytes_received += bytes_received
+
+    def on_retry(self, endpoint, attempt, wait) -> None:
+        with self._lock:
+            self._metrics(endpoint).retries += 1
+
+    def on_cache(self, endpoint, outcome) -> None:
+        with self._lock:
+            cache = self._metrics(endpoint).cache
+            cache[outcome] = cache.get(outcome, 0)+1
+
+    def on_decode(self, endpoint, seconds) -> None:
+        with self._lock:
+            self._metrics(endpoint).decode.observe(seconds)
+
+    def on_construct(self, endpoint, seconds) -> None:
+        with self._lock:
+            self._metrics(endpoint).construct.observe(seconds)
+
+    def endpoints(self) -> List[str]:
+        with self._lock:
+            return sorted(self._endpoints)
+
+    def snapshot(self) -> Dict[str, dict]:
+        """Plain dict of the metrics of every endpoint, safe to serialize
+        or compare later on."""
+        with self._lock:
+            return {endpoint: metrics.to_dict() for endpoint, metrics
+                    in sorted(self._endpoints.items())}
+
+    def reset(self) -> None:
+        with self._lock:
+            self._endpoints.clear()
+
+    def to_prometheus(self, prefix: str = 'ganjoor') -> str:
+        """The metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        lines: List[str] = []
+        _histogram(lines, f'{prefix}_request_duration_seconds',
+                   'Time spent on each HTTP attempt.', snapshot, 'latency')
+        _counter(lines, f'{prefix}_responses_total',
+                 'HTTP attempts by status code, error when none came back.',
+                 ((endpoint, {'status': status}, count)
+                  for endpoint, metrics in snapshot.items()
+                  for status, count in sorted(metrics['statuses'].items())))
+        _counter(lines, f'{prefix}_received_bytes_total',
+                 'Response body bytes received.',
+                 ((endpoint, {}, metrics['bytes_received'])
+                  for endpoint, metrics in snapshot.items()))
+        _counter(lines, f'{prefix}_cache_lookups_total',
+                 'Cache lookups by result.',
+                 ((endpoint, {'result': outcome}, count)
+                  for endpoint, metrics in snapshot.items()
+                  for outcome, count in sorted(metrics['cache'].items())))
+        _counter(lines, f'{prefix}_retries_total', 'Retried HTTP attempts.',
+                 ((endpoint, {}, metrics['retries'])
+                  for endpoint, metrics in snapshot.items()))
+        _histogram(lines, f'{prefix}_json_decode_seconds',
+                   'Time spent decoding response bodies.', snapshot,
+                   'decode')
+        _histogram(lines, f'{prefix}_model_construction_seconds',
+                   'Time spent building models from decoded bodies.',
+                   snapshot, 'construct')
+        return '\n'.join(lines)+'\n'
+
+
+def _format_number(value: float) -> str:
+    return repr(float(value))
+
+
+def _escape(value: str) -> str:
+    return (value.replace('\\', '\\\\').replace('"', '\\"')
+            .replace('\n', '\\n'))
+
+
+def _labels(endpoint: str, labels: Dict[str, str]) -> str:
+    pairs = [('endpoint', endpoint), *labels.items()]
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+
+
+def _counter(lines: List[str], name: str, help: str,
+             samples: Iterable[tuple]) -> None:
+    lines += [f'# HELP {name} {help}', f'# TYPE {name} counter']
+    for endpoint, labels, value in samples:
+        lines.append(f'{name}{{{_labels(endpoint, labels)}}} {value}')
+
+
+def _histogram(lines: List[str], name: str, help: str,
+               snapshot: Dict[str, dict], key: str) -> None:
+    lines += [f'# HELP {name} {help}', f'# TYPE {name} histogram']
+    for endpoint, metrics in snapshot.items():
+        histogram = metrics[key]
+        if not histogram['count']:
+            continue
+        for bound, count in histogram['buckets'].items():
+            labels = _labels(endpoint, {'le': bound})
+            lines.append(f'{name}_bucket{{{labels}}} {count}')
+        labels = _labels(endpoint, {})
+        lines.append(f'{name}_sum{{{labels}}} {histogram["sum"]!r}')
+        lines.append(f'{name}_count{{{labels}}} {histogram["count"]}')
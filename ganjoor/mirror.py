@@ -0,0 +1,240 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from pathlib import Path
+from threading import RLock
+from typing import Iterator, List, Optional
+import json
+import os
+import sqlite3
+
+from .crawler import Sink
+from .exceptions import GanjoorException
+from .models import Category, Poet, Poem
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS poets (
+    id INTEGER PRIMARY KEY,
+    full_url TEXT,
+    root_cat_id INTEGER,
+    nickname TEXT,
+    payload TEXT NOT NULL,
+    cat_payload TEXT
+);
+CREATE INDEX IF NOT EXISTS poets_full_url ON poets (full_url);
+
+CREATE TABLE IF NOT EXISTS categories (
+    id INTEGER PRIMARY KEY,
+    poet_id INTEGER,
+    full_url TEXT,
+    payload TEXT NOT NULL,
+    poet_payload TEXT
+);
+CREATE INDEX IF NOT EXISTS categories_full_url ON categories (full_url);
+CREATE INDEX IF NOT EXISTS categories_poet_id ON categories (poet_id);
+
+CREATE TABLE IF NOT EXISTS poems (
+    id INTEGER PRIMARY KEY,
+    poet_id INTEGER,
+    cat_id INTEGER,
+    full_url TEXT,
+    title TEXT,
+    payload TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS poems_full_url ON poems (full_url);
+CREATE INDEX IF NOT EXISTS poems_poet_id ON poems (poet_id);
+CREATE INDEX IF NOT EXISTS poems_cat_id ON poems (cat_id);
+"""
+
+
+def _dumps(payload) -> Optional[str]:
+    if payload is None:
+        return None
+    return json.dumps(payload, ensure_ascii=False)
+
+
+def _loads(payload: Optional[str]):
+    if payload is None:
+        return None
+    return json.loads(payload)
+
+
+class SQLiteMirror:
+    """Local copy of poets, categories and poems in a sqlite database.
+
+    Models are stored with the payload they were built from, so reading
+    them back returns the same Poet/Category/Poem objects the API did.
+    The database is opened on first use and is safe to share between
+    threads. A read_only mirror must already exist and is never written,
+    otherwise the database and its tables are created when missing."""
+
+    def __init__(self, path: str, read_only: bool = False) -> None:
+        self.path = path
+        self.read_only = read_only
+        self._connection = None
+        self._lock = RLock()
+
+    @property
+    def connection(self) -> sqlite3.Connection:
+        if self._connection is None:
+            if self.read_only:
+                if not os.path.isfile(self.path):
+                    raise GanjoorException(
+                        f"Offline mirror {self.path} does not exist")
+                uri = Path(os.path.abspath(self.path)).as_uri()+'?mode=ro'
+                self._connection = sqlite3.connect(uri, uri=True,
+                                                   check_same_thread=False)
+            else:
+                self._connection = sqlite3.connect(self.path,
+                                                   check_same_thread=False)
+                self._connection.executescript(SCHEMA)
+        return self._connection
+
+    def close(self) -> None:
+        with self._lock:
+            if self._connection is not None:
+                self._connection.close()
+                self._connection = None
+
+    def __enter__(self) -> SQLiteMirror:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+    def _fetchone(self, query: str, args=()):
+        with self._lock:
+            return self.connection.execute(query, args).fetchone()
+
+    # Export
+
+    def add_poet(self, poet: Poet) -> None:
+        payload = poet.to_dict()
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO poets VALUES (?, ?, ?, ?, ?, ?)",
+                (payload.get('id'), payload.get('fullUrl'),
+                 payload.get('rootCatId'), payload.get('nickname'),
+                 _dumps(payload), _dumps(poet._cat)))
+            if poet._cat:
+                self._add_category(poet._cat, payload)
+
+    def add_category(self, category: Category) -> None:
+        with self._lock, self.connection:
+            self._add_category(category.to_dict(),
+                               getattr(category, '_poet', None))
+
+    def _add_category(self, payload, poet_payload) -> None:
+        poet_id = poet_payload.get('id') if poet_payload else None
+        self.connection.execute(
+            "INSERT OR REPLACE INTO categories VALUES (?, ?, ?, ?, ?)",
+            (payload.get('id'), poet_id, payload.get('fullUrl'),
+             _dumps(payload), _dumps(poet_payload)))
+
+    def add_poem(self, poem: Poem) -> None:
+        payload = poem.to_dict()
+        category = payload.get('category') or {}
+        poet_id = (category.get('poet') or {}).get('id')
+        cat_id = (category.get('cat') or {}).get('id')
+        with self._lock, self.connection:
+            self.connection.execute(
+                "INSERT OR REPLACE INTO poems VALUES (?, ?, ?, ?, ?, ?)",
+                (payload.get('id'), poet_id, cat_id, payload.get('fullUrl'),
+                 payload.get('title'), _dumps(payload)))
+
+    # Lookups
+
+    def _poet(self, row) -> Poet:
+        if row is None:
+            raise GanjoorException("Poet not found in offline mirror")
+        poet = Poet(_loads(row[0]))
+        poet._cat = _loads(row[1])
+        if poet._cat is None:
+            # Poets stored from Poet.all() have no category, use the
+            # mirrored root category instead.
+            cat_row = self._fetchone(
+                "SELECT payload FROM categories WHERE id = ?",
+                (poet.to_dict().get('rootCatId'),))
+            poet._cat = _loads(cat_row[0]) if cat_row else None
+        return poet
+
+    def _category(self, row, with_poems=True) -> Category:
+        if row is None:
+            raise GanjoorException("Category not found in offline mirror")
+        payload = _loads(row[0])
+        if not with_poems:
+            payload['poems'] = []
+        category = Category(payload)
+        category._poet = _loads(row[1])
+        return category
+
+    def _poem(self, row) -> Poem:
+        if row is None:
+            raise GanjoorException("Poem not found in offline mirror")
+        return Poem(_loads(row[0]))
+
+    def all_poets(self) -> List[Poet]:
+        with self._lock:
+            rows = self.connection.execute(
+                "SELECT payload, cat_payload FROM poets ORDER BY id"
+            ).fetchall()
+        return [self._poet(row) for row in rows]
+
+    def poet(self, id: int) -> Poet:
+        return self._poet(self._fetchone(
+            "SELECT payload, cat_payload FROM poets WHERE id = ?", (id,)))
+
+    def poet_by_url(self, url: str) -> Poet:
+        return self._poet(self._fetchone(
+            "SELECT payload, cat_payload FROM poets WHERE full_url = ?",
+            (url,)))
+
+    def category(self, id: int, with_poems=True) -> Category:
+        return self._category(self._fetchone(
+            "SELECT payload, poet_payload FROM categories WHERE id = ?",
+            (id,)), with_poems)
+
+    def category_by_url(self, url: str, with_poems=True) -> Category:
+        return self._category(self._fetchone(
+            "SELECT payload, poet_payload FROM categories WHERE full_url = ?",
+            (url,)), with_poems)
+
+    def poem(self, id: int) -> Poem:
+        return self._poem(self._fetchone(
+            "SELECT payload FROM poems WHERE id = ?", (id,)))
+
+    def poem_by_url(self, url: str) -> Poem:
+        return self._poem(self._fetchone(
+            "SELECT payload FROM poems WHERE full_url = ?", (url,)))
+
+    def random_poem(self, poet_id=None) -> Poem:
+        if poet_id:
+            return self._poem(self._fetchone(
+                """SELECT payload FROM poems WHERE poet_id = ?
+                   ORDER BY RANDOM() LIMIT 1""", (poet_id,)))
+        return self._poem(self._fetchone(
+            "SELECT payload FROM poems ORDER BY RANDOM() LIMIT 1"))
+
+    def iter_poems(self) -> Iterator[Poem]:
+        """Every mirrored poem, in id order."""
+        with self._lock:
+            ids = [row[0] for row in self.connection.execute(
+                "SELECT id FROM poems ORDER BY id")]
+        for id in ids:
+            yield self.poem(id)
+
+
+class MirrorSink(Sink):
+    """Crawler sink writing everything it receives into a SQLiteMirror."""
+
+    def __init__(self, mirror: SQLiteMirror) -> None:
+        self.mirror = mirror
+
+    def on_poet(self, poet: Poet) -> None:
+        self.mirror.add_poet(poet)
+
+    def on_category(self, category: Category) -> None:
+        self.mirror.add_category(category)
+
+    def on_poem(self, poem: Poem) -> None:
+        self.mirror.add_poem(poem)
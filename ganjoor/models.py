@@ -1,18 +1,21 @@
 # Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
 # SPDX-License-Identifier: MIT
 from __future__ import annotations
-from typing import List
-from inflection import underscore
+from typing import Dict, Iterable, Iterator, List, Optional
 from dataclasses import dataclass
-import requests
+from functools import partial
+from .bulk import BulkResult, fetch_concurrently
 from .config import GANJGAH_BASE_URL, GANJOOR_BASE_URL
-from ganjoor.exceptions import GanjoorException
+from .pagination import iter_pages
+from .transport import Transport, get_default_transport
+from .utils import Memoized, attribute_name, memoized_property
+from .walk import CategoryTree, CategoryVisit, walk_categories
 from .poem_utils import (PoemImage, Comment, IncompletePoem,
                          Song, Recitation, Verse, Metre, Couplet)
 
 
 @dataclass
-class Category:
+class Category(Memoized):
 
     _id: int
     _title: str
@@ -28,51 +31,71 @@ class Category:
         "find": "/api/ganjoor/cat/{id}",
         "find_by_url": "/api/ganjoor/cat"
     }
+    _transport = None
+    _raw = None
 
     def __init__(self, category_args):
         self.from_dict(category_args)
 
     def from_dict(self, args):
-        for key in args.keys():
-            snake_key = underscore(key)
-            setattr(self, "_"+snake_key, args[key])
+        self.invalidate()
+        self._raw = {**self._raw, **args} if self._raw else args
+        for key, value in args.items():
+            setattr(self, attribute_name(key), value)
+
+    def to_dict(self) -> dict:
+        """The API payload this category was built from."""
+        return dict(self._raw or {})
 
     @classmethod
-    def find(cls, id, with_poems=True) -> Category:
-        path = GANJGAH_BASE_URL+cls._urls['find'].format(id=id)
-        response = requests.get(path, params={'poems': with_poems})
-        if response.status_code == 200:
-            body_poet = response.json()['poet']
-            body_cat = response.json()['cat']
-            category = Category(body_cat)
-            category._poet = body_poet
-            return category
-        else:
-            raise GanjoorException(
-                f"Invalid Response Code: {response.status_code} with Message: {response.reason}")
+    def find(cls, id, with_poems=True,
+             transport: Transport = None) -> Category:
+        transport = transport or get_default_transport()
+        body = transport.get_json(cls._urls['find'],
+                                  params={'poems': with_poems}, id=id)
+        return transport.build(cls._urls['find'], cls._from_response, body)
 
     @classmethod
-    def find_by_url(cls, url, with_poems=True) -> Category:
-        path = GANJGAH_BASE_URL+cls._urls['find_by_url']
-        response = requests.get(path, params={'poems': with_poems, 'url': url})
-        if response.status_code == 200:
-            body_poet = response.json()['poet']
-            body_cat = response.json()['cat']
-            category = Category(body_cat)
-            category._poet = body_poet
-            return category
-        else:
-            raise GanjoorException(
-                f"""Invalid Response Code: {response.status_code}
-                Message: {response.reason}""")
+    def find_by_url(cls, url, with_poems=True,
+                    transport: Transport = None) -> Category:
+        transport = transport or get_default_transport()
+        body = transport.get_json(cls._urls['find_by_url'],
+                                  params={'poems': with_poems, 'url': url})
+        return transport.build(cls._urls['find_by_url'],
+                               cls._from_response, body)
 
-    @property
+    @classmethod
+    def walk(cls, root_id: int, max_workers: int = 8, with_poems=True,
+             transport: Transport = None) -> Iterator[CategoryVisit]:
+        """Fetches the category tree under root_id breadth-first, siblings
+        concurrently on max_workers threads, and yields a CategoryVisit
+        (category, depth, ancestor path) for each one as it arrives."""
+        transport = transport or get_default_transport()
+        return walk_categories(
+            partial(cls.find, with_poems=with_poems, transport=transport),
+            root_id, max_workers)
+
+    @classmethod
+    def tree(cls, root_id: int, max_workers: int = 8, with_poems=True,
+             transport: Transport = None) -> CategoryTree:
+        """Walks the whole tree under root_id into a CategoryTree."""
+        return CategoryTree(cls.walk(root_id, max_workers, with_poems,
+                                     transport))
+
+    @classmethod
+    def _from_response(cls, body, transport: Transport) -> Category:
+        category = Category(body['cat'])
+        category._poet = body['poet']
+        category._transport = transport
+        return category
+
+    @memoized_property
     def children(self) -> List[Category]:
         if self._children:
             return [Category(child) for child in self._children]
         return []
 
-    @property
+    @memoized_property
     def poems(self) -> List[IncompletePoem]:
         if self._poems:
             return [IncompletePoem(poem) for poem in self._poems]
@@ -87,7 +110,7 @@ class Category:
     def previous_category(self) -> Category:
         return Category(self._previous)
 
-    @property
+    @memoized_property
     def ancestors(self) -> List[Category]:
         if self._ancestors:
             return [Category(ancestor) for ancestor in self._ancestors]
@@ -136,57 +159,56 @@ class Poet:
         "find": "/api/ganjoor/poet/{id}",
         "find_by_url": "/api/ganjoor/poet"
     }
+    _transport = None
+    _raw = None
 
     def __init__(self, poet_args) -> None:
         self.from_dict(poet_args)
 
     def from_dict(self, args):
-        for key in args.keys():
-            snake_key = underscore(key)
-            setattr(self, "_"+snake_key, args[key])
+        self._raw = {**self._raw, **args} if self._raw else args
+        for key, value in args.items():
+            setattr(self, attribute_name(key), value)
+
+    def to_dict(self) -> dict:
+        """The API payload this poet was built from."""
+        return dict(self._raw or {})
+
+    @classmethod
+    def all(cls, transport: Transport = None) -> List[Poet]:
+        transport = transport or get_default_transport()
+        body = transport.get_json(cls._urls['all'])
+        return transport.build(cls._urls['all'], cls._list_from_response, body)
+
+    @classmethod
+    def find(cls, id: int, transport: Transport = None):
+        transport = transport or get_default_transport()
+        body = transport.get_json(cls._urls['find'], id=id)
+        return transport.build(cls._urls['find'], cls._from_response, body)
 
     @classmethod
-    def all(cls) -> List[Poet]:
-        path = GANJGAH_BASE_URL+cls._urls['all']
-        response = requests.get(path)
-        if response.status_code == 200:
-            body = response.json()
-            poets = []
-            for entry in body:
-                poet = Poet(entry)
-                poets.append(poet)
-            return poets
-        else:
-            raise GanjoorException(
-                f"Invalid Response Code: {response.status_code} with Message: {response.reason}")
+    def find_by_url(cls, url, transport: Transport = None):
+        transport = transport or get_default_transport()
+        body = transport.get_json(cls._urls['find_by_url'],
+                                  params={'url': url})
+        return transport.build(cls._urls['find_by_url'],
+                               cls._from_response, body)
 
     @classmethod
-    def find(cls, id: int):
-        path = GANJGAH_BASE_URL+cls._urls['find'].format(id=id)
-        response = requests.get(path)
-        if response.status_code == 200:
-            body_poet = response.json()['poet']
-            body_cat = response.json()['cat']
-            poet = Poet(body_poet)
-            poet._cat = body_cat
-            return poet
-        else:
-            raise GanjoorException(
-                f"Invalid Response Code: {response.status_code} with Message: {response.reason}")
+    def _from_response(cls, body, transport: Transport) -> Poet:
+        poet = Poet(body['poet'])
+        poet._cat = body['cat']
+        poet._transport = transport
+        return poet
 
     @classmethod
-    def find_by_url(cls, url):
-        path = GANJGAH_BASE_URL+cls._urls['find_by_url']
-        response = requests.get(path, params={'url': url})
-        if response.status_code == 200:
-            body_poet = response.json()['poet']
-            body_cat = response.json()['cat']
-            poet = Poet(body_poet)
-            poet._cat = body_cat
-            return poet
-        else:
-            raise GanjoorException(
-                f"Invalid Response Code: {response.status_code} with Message: {response.reason}")
+    def _list_from_response(cls, body, transport: Transport) -> List[Poet]:
+        poets = []
+        for entry in body:
+            poet = Poet(entry)
+            poet._transport = transport
+            poets.append(poet)
+        return poets
 
     @property
     def avatar_url(self, format="png") -> str:
@@ -225,12 +247,23 @@ class Poet:
         return self._published
 
     @property
-    def category(self) -> Category:
+    def category(self) -> Optional[Category]:
+        """The poet's root category, None for poets listed by Poet.all
+        until fetch_category is called."""
+        if self._cat is None:
+            return None
+        return Category(self._cat)
+
+    def fetch_category(self, transport: Transport = None) -> Category:
+        """Requests the poet's root category, keeps it for ``category``
+        and returns it."""
+        transport = transport or self._transport
+        self._cat = Poet.find(self.id, transport=transport)._cat
         return Category(self._cat)
 
 
 @dataclass
-class Poem:
+class Poem(Memoized):
     _id: int
     _title: str
     _full_title: str
@@ -266,22 +299,30 @@ class Poem:
         "similar": "/api/ganjoor/poems/similar",
         "search": "/api/ganjoor/poems/search"
     }
+    _transport = None
+    _raw = None
 
     def __init__(self, poem_args) -> None:
         self.from_dict(poem_args)
 
     def from_dict(self, args):
-        for key in args.keys():
-            snake_key = underscore(key)
-            setattr(self, "_"+snake_key, args[key])
-        if self._category:
+        self.invalidate()
+        self._raw = {**self._raw, **args} if self._raw else args
+        for key, value in args.items():
+            setattr(self, attribute_name(key), value)
+        if args.get('category'):
             self._poet = Poet(self._category['poet'])
             self._category = Category(self._category['cat'])
 
+    def to_dict(self) -> dict:
+        """The API payload this poem was built from."""
+        return dict(self._raw or {})
+
     @classmethod
     def find(cls, id, complete=False, category_info=False, category_poems=False, rhymes=False,
              recitations=False, images=False, songs=False, comments=False,
-             verse_details=False, navigation=False) -> Poem:
+             verse_details=False, navigation=False,
+             transport: Transport = None) -> Poem:
         """
         Requests Ganjoor API for a poem with this id.
 
@@ -294,6 +335,8 @@ class Poem:
             If set to true, all other keyword parameters will be ignored
         category_info: bool
             If category info should be included in the response
+        transport: Transport
+            Transport used for the request, defaults to the shared one
 
         Returns
         -------
@@ -301,34 +344,28 @@ class Poem:
             The poem with the requested id
         """
         params = dict.copy(locals())
-        params.pop('id')
+        for key in ('cls', 'id', 'transport'):
+            params.pop(key)
         if complete:
             params = {}
-        path = GANJGAH_BASE_URL+cls._urls['find'].format(id=id)
-        response = requests.get(path, params=params)
-        if response.status_code == 200:
-            body = response.json()
-            return Poem(body)
-        else:
-            raise GanjoorException(
-                f"Invalid Response Code: {response.status_code} with Message: {response.reason}")
+        transport = transport or get_default_transport()
+        body = transport.get_json(cls._urls['find'], params=params, id=id)
+        return transport.build(cls._urls['find'], cls._from_response, body)
 
     @classmethod
     def find_by_url(cls, url, complete=False, category_info=False, category_poems=False,
                     rhymes=False, recitations=False, images=False, songs=False,
                     comments=False, verse_details=False,
-                    navigation=False) -> Poem:
+                    navigation=False, transport: Transport = None) -> Poem:
         params = dict.copy(locals())
+        for key in ('cls', 'transport'):
+            params.pop(key)
         if complete:
             params = {'url': url}
-        path = GANJGAH_BASE_URL+cls._urls['find_by_url']
-        response = requests.get(path, params=params)
-        if response.status_code == 200:
-            body = response.json()
-            return Poem(body)
-        else:
-            raise GanjoorException(
-                f"Invalid Response Code: {response.status_code} with Message: {response.reason}")
+        transport = transport or get_default_transport()
+        body = transport.get_json(cls._urls['find_by_url'], params=params)
+        return transport.build(cls._urls['find_by_url'],
+                               cls._from_response, body)
         # @classmethod
         # def get_user_bookmarked_poems(cls, auth_token):
         #     response = requests.get(
@@ -336,119 +373,211 @@ class Poem:
         #         headers={'Authorization': 'bearer '+auth_token})
 
     @classmethod
-    def hafez_faal(cls) -> Poem:
-        path = GANJGAH_BASE_URL+cls._urls['hafez_faal']
-        response = requests.get(path)
-        if response.status_code == 200:
-            body = response.json()
-            return Poem(body)
-        else:
-            raise GanjoorException(
-                f"Invalid Response Code: {response.status_code} with Message: {response.reason}")
+    def hafez_faal(cls, transport: Transport = None) -> Poem:
+        transport = transport or get_default_transport()
+        body = transport.get_json(cls._urls['hafez_faal'])
+        return transport.build(cls._urls['hafez_faal'],
+                               cls._from_response, body)
 
     @classmethod
-    def random(cls, poet_id=None) -> Poem:
-        path = GANJGAH_BASE_URL+cls._urls['random']
-        response = requests.get(path, params={'poetId': poet_id})
-        if response.status_code == 200:
-            body = response.json()
-            return Poem(body)
-        else:
-            raise GanjoorException(
-                f"Invalid Response Code: {response.status_code} with Message: {response.reason}")
+    def random(cls, poet_id=None, transport: Transport = None) -> Poem:
+        transport = transport or get_default_transport()
+        body = transport.get_json(cls._urls['random'],
+                                  params={'poetId': poet_id})
+        return transport.build(cls._urls['random'], cls._from_response, body)
 
     @classmethod
     def similar(cls, page_number=1, page_size=5, metre: str = None,
-                rhyme: str = None, poet_id=0) -> List[Poem]:
+                rhyme: str = None, poet_id=0,
+                transport: Transport = None) -> List[Poem]:
         """Gets a list of similar Poems. if no metre is supplied
         the list will return texts not poems. Use poet_id=0 for all poets"""
-        path = GANJGAH_BASE_URL+cls._urls['similar']
-        response = requests.get(path, params={
-                                'pageNumber': page_number, 'rhyme': rhyme,
-                                'metre': metre, 'pageSize': page_size,
-                                'poetId': poet_id})
-        if response.status_code == 200:
-            body = response.json()
-            return [Poem(poem) for poem in body]
-        else:
-            raise GanjoorException(
-                f"Invalid Response Code: {response.status_code} with Message: {response.reason}")
+        transport = transport or get_default_transport()
+        body = transport.get_json(cls._urls['similar'], params={
+                                  'pageNumber': page_number, 'rhyme': rhyme,
+                                  'metre': metre, 'pageSize': page_size,
+                                  'poetId': poet_id})
+        return transport.build(cls._urls['similar'],
+                               cls._list_from_response, body)
 
     @classmethod
     def search(cls, page_number=1, page_size=5, term: str = "شیراز",
-               cat_id: int = 0, poet_id=0) -> List[Poem]:
+               cat_id: int = 0, poet_id=0,
+               transport: Transport = None) -> List[Poem]:
         """Gets a list of Poems with the search term.
         if term is empty or an empty string or whitespace
         there will be an internal server error (500).
         Use poet_id=0 for all poets and cat_id=0 for all categories"""
-        path = GANJGAH_BASE_URL+cls._urls['search']
-        response = requests.get(path, params={
-                                'pageNumber': page_number, 'term': term,
-                                'cat_id': cat_id, 'pageSize': page_size,
-                                'poetId': poet_id})
-        if response.status_code == 200:
-            body = response.json()
-            return [Poem(poem) for poem in body]
-        else:
-            raise GanjoorException(
-                f"Invalid Response Code: {response.status_code} with Message: {response.reason}")
+        transport = transport or get_default_transport()
+        body = transport.get_json(cls._urls['search'], params={
+                                  'pageNumber': page_number, 'term': term,
+                                  'cat_id': cat_id, 'pageSize': page_size,
+                                  'poetId': poet_id})
+        return transport.build(cls._urls['search'],
+                               cls._list_from_response, body)
+
+    @classmethod
+    def iter_similar(cls, metre: str = None, rhyme: str = None, poet_id=0,
+                     page_size=5, page_number=1, prefetch=True,
+                     transport: Transport = None) -> Iterator[Poem]:
+        """Walks every page of Poem.similar lazily, starting at
+        page_number. The next page is fetched in the background while
+        the current one is consumed unless prefetch is False."""
+        fetch_page = partial(cls.similar, page_size=page_size,
+                             metre=metre, rhyme=rhyme, poet_id=poet_id,
+                             transport=transport)
+        return iter_pages(fetch_page, page_size, page_number, prefetch)
+
+    @classmethod
+    def iter_search(cls, term: str, cat_id: int = 0, poet_id=0, page_size=5,
+                    page_number=1, prefetch=True,
+                    transport: Transport = None) -> Iterator[Poem]:
+        """Walks every page of Poem.search lazily, see iter_similar."""
+        fetch_page = partial(cls.search, page_size=page_size,
+                             term=term, cat_id=cat_id, poet_id=poet_id,
+                             transport=transport)
+        return iter_pages(fetch_page, page_size, page_number, prefetch)
+
+    @classmethod
+    def _from_response(cls, body, transport: Transport) -> Poem:
+        poem = Poem(body)
+        poem._transport = transport
+        return poem
+
+    @classmethod
+    def _list_from_response(cls, body, transport: Transport) -> List[Poem]:
+        return [cls._from_response(poem, transport) for poem in body]
+
+    @property
+    def transport(self) -> Transport:
+        return self._transport or get_default_transport()
+
+    @staticmethod
+    def _related_params(name: str, track_type=-1, approved=True):
+        """Query params sent when requesting the related resource
+        ``name``, the same for every client."""
+        if name == 'songs':
+            return {'track_type': track_type, 'approved': approved}
+        return None
+
+    def _request_related(self, name: str, params=None):
+        if params is None:
+            params = self._related_params(name)
+        return self.transport.get_json(
+            self._urls['find']+self._urls[name], params=params, id=self.id)
 
     def request_recitations(self) -> List[Recitation]:
-        path = GANJGAH_BASE_URL + \
-            self._urls['find'].format(id=self.id)+self._urls['recitations']
-        response = requests.get(path)
-        if response.status_code == 200:
-            body = response.json()
-            return [Recitation(recitation) for recitation in body]
-        else:
-            raise GanjoorException(
-                f"Invalid Response Code: {response.status_code} with Message: {response.reason}")
+        return [Recitation(recitation)
+                for recitation in self._request_related('recitations')]
 
     def request_images(self) -> List[PoemImage]:
-        path = GANJGAH_BASE_URL + \
-            self._urls['find'].format(id=self.id)+self._urls['images']
-        response = requests.get(path)
-        if response.status_code == 200:
-            body = response.json()
-            return [PoemImage(image) for image in body]
-        else:
-            raise GanjoorException(
-                f"Invalid Response Code: {response.status_code} with Message: {response.reason}")
+        return [PoemImage(image) for image in self._request_related('images')]
 
     def request_songs(self, track_type=-1, approved=True) -> List[Song]:
-        path = GANJGAH_BASE_URL + \
-            self._urls['find'].format(id=self.id)+self._urls['songs']
-        response = requests.get(
-            path, params={'track_type': track_type, 'approved': approved})
-        if response.status_code == 200:
-            body = response.json()
-            return [Song(song) for song in body]
-        else:
-            raise GanjoorException(
-                f"Invalid Response Code: {response.status_code} with Message: {response.reason}")
+        body = self._request_related('songs', params=self._related_params(
+            'songs', track_type, approved))
+        return [Song(song) for song in body]
 
     def request_comments(self) -> List[Comment]:
-        path = GANJGAH_BASE_URL + \
-            self._urls['find'].format(id=self.id)+self._urls['comments']
-        response = requests.get(path)
-        if response.status_code == 200:
-            body = response.json()
-            return [Comment(comment) for comment in body]
-        else:
-            raise GanjoorException(
-                f"Invalid Response Code: {response.status_code} with Message: {response.reason}")
+        return [Comment(comment)
+                for comment in self._request_related('comments')]
+
+    @staticmethod
+    def _related_names(recitations, images, songs, comments) -> List[str]:
+        wanted = {'recitations': recitations, 'images': images,
+                  'songs': songs, 'comments': comments}
+        return [name for name, fetch in wanted.items() if fetch]
+
+    def _apply_related(self, results: Iterable[BulkResult]) -> None:
+        """Stores the fetched related resources, then raises the first
+        error if any of them failed."""
+        related, errors = {}, []
+        for result in results:
+            if result.ok:
+                related[result.key] = result.value
+            else:
+                errors.append(result.error)
+        if related:
+            self.from_dict(related)
+        if errors:
+            raise errors[0]
+
+    def fetch_related(self, recitations=True, images=True, songs=True,
+                      comments=True, max_workers: int = 4) -> Poem:
+        """Requests the poem's recitations, images, songs and comments in
+        parallel and stores them on the poem, as if it had been found with
+        those flags. Resources that arrived are kept even when another one
+        failed, the first failure is then raised. Returns the poem."""
+        names = self._related_names(recitations, images, songs, comments)
+        self._apply_related(fetch_concurrently(self._request_related, names,
+                                               max_workers, ordered=False))
+        return self
+
+    @classmethod
+    def fetch_related_many(cls, poems: Iterable[Poem], max_workers: int = 8,
+                           recitations=True, images=True, songs=True,
+                           comments=True) -> List[BulkResult]:
+        """fetch_related for many poems sharing one pool of ``max_workers``
+        threads. Returns a BulkResult per poem, keyed by poem id, in input
+        order; failures are reported on the result instead of raised."""
+        poems = list(poems)
+        names = cls._related_names(recitations, images, songs, comments)
+        results: List[List[BulkResult]] = [[] for _ in poems]
+        for result in fetch_concurrently(
+                lambda key: poems[key[0]]._request_related(key[1]),
+                [(index, name) for index in range(len(poems))
+                 for name in names], max_workers, ordered=False):
+            index, name = result.key
+            results[index].append(BulkResult(name, result.value,
+                                             result.error))
+        outcomes = []
+        for poem, poem_results in zip(poems, results):
+            try:
+                poem._apply_related(poem_results)
+            except Exception as error:
+                outcomes.append(BulkResult(poem.id, poem, error))
+            else:
+                outcomes.append(BulkResult(poem.id, poem))
+        return outcomes
 
     def get_couplet(self, index: int) -> Couplet:
-        return Couplet([verse for verse in self.verses
-                        if verse.couplet_index == index])
+        couplet = self.couplets_by_index.get(index)
+        return Couplet(list(couplet.verses) if couplet is not None else [])
 
     def get_all_couplets(self) -> List[Couplet]:
-        if self.verses:
-            last_couplet = max([verse.couplet_index for verse in self.verses])
+        if self.couplets_by_index:
+            last_couplet = max(self.couplets_by_index)
             return [self.get_couplet(index)
                     for index in range(0, last_couplet+1)]
         return []
 
+    def iter_couplets(self) -> Iterator[Couplet]:
+        """Yields the poem's couplets in couplet_index order, building the
+        verses of each one only when it is reached so long poems can be
+        rendered as a stream. Verses are grouped by couplet_index like
+        get_all_couplets, but missing couplet indexes are skipped."""
+        verses = self.__dict__.get('verses')
+        if verses is not None:
+            for index in sorted(self.couplets_by_index):
+                yield self.get_couplet(index)
+            return
+        groups: Dict[int, list] = {}
+        for verse in self._verses or []:
+            groups.setdefault(verse.get('coupletIndex'), []).append(verse)
+        for index in sorted(groups):
+            yield Couplet([Verse(verse) for verse in groups[index]])
+
+    @memoized_property(depends_on=('verses',))
+    def couplets_by_index(self) -> Dict[int, Couplet]:
+        """Couplets keyed by couplet_index, grouped in a single pass."""
+        couplets = {}
+        for verse in self.verses:
+            couplet = couplets.get(verse.couplet_index)
+            if couplet is None:
+                couplet = couplets[verse.couplet_index] = Couplet([])
+            couplet.verses.append(verse)
+        return couplets
+
     def get_poet_name_from_url(self) -> str:
         return self.full_url.split('/')[1]
 
@@ -471,25 +600,25 @@ class Poem:
     def poet(self) -> Poet:
         return self._poet
 
-    @property
+    @memoized_property
     def recitations(self) -> List[Recitation]:
         if self._recitations:
             return [Recitation(recitation) for recitation in self._recitations]
         return []
 
-    @property
+    @memoized_property
     def songs(self) -> List[Song]:
         if self._songs:
             return [Song(song) for song in self._songs]
         return []
 
-    @property
+    @memoized_property
     def comments(self) -> List[Comment]:
         if self._comments:
             return [Comment(comment) for comment in self._comments]
         return []
 
-    @property
+    @memoized_property
     def images(self) -> List[PoemImage]:
         if self._images:
             return [PoemImage(image) for image in self._images]
@@ -515,7 +644,7 @@ class Poem:
             return [poem_image.thumbnail_image_url for poem_image in self.images]
         return []
 
-    @property
+    @memoized_property
     def verses(self) -> List[Verse]:
         if self._verses:
             return [Verse(verse) for verse in self._verses]
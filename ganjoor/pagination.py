@@ -0,0 +1,44 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from typing import Callable, Iterator, List
+
+
+def iter_pages(fetch_page: Callable[[int], List], page_size: int,
+               page_number: int = 1, prefetch: bool = True) -> Iterator:
+    """Yields the items of ``fetch_page(page_number)``, ``fetch_page(
+    page_number+1)``, ... and stops after the first page holding fewer
+    than ``page_size`` items.
+
+    With ``prefetch`` the next page is requested on a background thread
+    while the items of the current one are being consumed. Raises
+    ValueError right away when ``page_size`` is below 1, since no page
+    could then end the iteration."""
+    if page_size < 1:
+        raise ValueError(f"page_size must be at least 1, got {page_size}")
+    return _iter_pages(fetch_page, page_size, page_number, prefetch)
+
+
+def _iter_pages(fetch_page: Callable[[int], List], page_size: int,
+                page_number: int, prefetch: bool) -> Iterator:
+    if not prefetch:
+        while True:
+            page = fetch_page(page_number)
+            yield from page
+            if len(page) < page_size:
+                return
+            page_number += 1
+
+    from concurrent.futures import ThreadPoolExecutor
+    executor = ThreadPoolExecutor(max_workers=1)
+    try:
+        next_page = executor.submit(fetch_page, page_number)
+        while next_page is not None:
+            page = next_page.result()
+            page_number += 1
+            next_page = None
+            if len(page) >= page_size:
+                next_page = executor.submit(fetch_page, page_number)
+            yield from page
+    finally:
+        executor.shutdown(wait=False)
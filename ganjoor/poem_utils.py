@@ -3,12 +3,62 @@
 
 from __future__ import annotations
 from dataclasses import dataclass
-from typing import List
-from inflection import underscore
-
-
-@dataclass
-class Metre:
+from typing import Any, Dict, List
+from .exceptions import GanjoorException
+from .utils import attribute_name
+
+KEEP = 'keep'
+IGNORE = 'ignore'
+RAISE = 'raise'
+
+
+class SlottedModel:
+    """Base of the compact, high-volume models. Instances have no
+    ``__dict__``, only the slots of their dataclass fields.
+
+    API keys that are not fields follow the class' ``unknown_keys`` policy:
+    ``KEEP`` (default) stores them in :attr:`extra` and still exposes them
+    as ``_snake_case`` attributes, ``IGNORE`` drops them and ``RAISE``
+    raises a GanjoorException. Models built by the thousand, such as
+    Verse and IncompletePoem, default to ``IGNORE`` since a dict per
+    instance would cost more than the slots save."""
+    __slots__ = ('_extra',)
+    unknown_keys = KEEP
+
+    def __init__(self, args: Dict[str, Any]) -> None:
+        fields = self.__dataclass_fields__
+        for name in fields:
+            setattr(self, name, None)
+        self._extra = None
+        for key, value in args.items():
+            name = attribute_name(key)
+            if name in fields:
+                setattr(self, name, value)
+            elif self.unknown_keys == KEEP:
+                if self._extra is None:
+                    self._extra = {}
+                self._extra[name] = value
+            elif self.unknown_keys == RAISE:
+                raise GanjoorException(
+                    f"Unknown key {key!r} for {type(self).__name__}")
+
+    def __getattr__(self, name):
+        extra = object.__getattribute__(self, '_extra')
+        if extra and name in extra:
+            return extra[name]
+        raise AttributeError(
+            f"{type(self).__name__!r} object has no attribute {name!r}")
+
+    @property
+    def extra(self) -> Dict[str, Any]:
+        """API values that are not fields of this model, by attribute name."""
+        return dict(self._extra or {})
+
+
+@dataclass(init=False)
+class Metre(SlottedModel):
+    __slots__ = ('_id', '_url_slug', '_rhythm', '_name', '_description',
+                 '_verse_count')
     _id: int
     _url_slug: str
     _rhythm: str
@@ -16,11 +66,6 @@ class Metre:
     _description: str
     _verse_count: int
 
-    def __init__(self, metre_args) -> None:
-        for key in metre_args.keys():
-            snake_key = underscore(key)
-            setattr(self, "_"+snake_key, metre_args[key])
-
     @property
     def id(self) -> int:
         return self._id
@@ -46,19 +91,16 @@ class Metre:
         return self._verse_count
 
 
-@dataclass
-class PoemImage:
+@dataclass(init=False)
+class PoemImage(SlottedModel):
+    __slots__ = ('_image_order', '_poem_related_image_type',
+                 '_thumbnail_image_url', '_target_page_url', '_alt_text')
     _image_order: int
     _poem_related_image_type: int
     _thumbnail_image_url: str
     _target_page_url: str
     _alt_text: str
 
-    def __init__(self, poem_image_args) -> None:
-        for key in poem_image_args.keys():
-            snake_key = underscore(key)
-            setattr(self, "_"+snake_key, poem_image_args[key])
-
     @property
     def normal_image_url(self) -> str:
         return self.thumbnail_image_url.replace('thumb', 'normal')
@@ -84,18 +126,24 @@ class PoemImage:
         return self._alt_text
 
 
-@dataclass
-class Verse:
+@dataclass(init=False)
+class Verse(SlottedModel):
+    __slots__ = ('_id', '_v_order', '_couplet_index', '_verse_position',
+                 '_text', '_section_index1', '_section_index2',
+                 '_section_index3', '_section_index4', '_language_id',
+                 '_couplet_summary')
+    unknown_keys = IGNORE
     _id: int
     _v_order: int
     _couplet_index: int
     _verse_position: int
     _text: str
-
-    def __init__(self, verse_args):
-        for key in verse_args.keys():
-            snake_key = underscore(key)
-            setattr(self, "_"+snake_key, verse_args[key])
+    _section_index1: int
+    _section_index2: int
+    _section_index3: int
+    _section_index4: int
+    _language_id: int
+    _couplet_summary: str
 
     @property
     def id(self) -> int:
@@ -117,12 +165,37 @@ class Verse:
     def text(self) -> str:
         return self._text
 
+    @property
+    def section_index1(self) -> int:
+        return self._section_index1
+
+    @property
+    def section_index2(self) -> int:
+        return self._section_index2
+
+    @property
+    def section_index3(self) -> int:
+        return self._section_index3
+
+    @property
+    def section_index4(self) -> int:
+        return self._section_index4
+
+    @property
+    def language_id(self) -> int:
+        return self._language_id
+
+    @property
+    def couplet_summary(self) -> str:
+        return self._couplet_summary
+
     def __str__(self) -> str:
         return self.text
 
 
 @dataclass
 class Couplet:
+    __slots__ = ('_verses',)
     _verses: List[Verse]
 
     @property
@@ -154,9 +227,8 @@ class Song:
     _suggested_by_nickname: str
 
     def __init__(self, song_args):
-        for key in song_args.keys():
-            snake_key = underscore(key)
-            setattr(self, "_"+snake_key, song_args[key])
+        for key, value in song_args.items():
+            setattr(self, attribute_name(key), value)
 
     @property
     def id(self) -> int:
@@ -227,8 +299,12 @@ class Song:
         return self._suggested_by_nickname
 
 
-@dataclass
-class Comment:
+@dataclass(init=False)
+class Comment(SlottedModel):
+    __slots__ = ('_id', '_author_name', '_author_url', '_comment_date',
+                 '_html_comment', '_publish_status', '_in_reply_to_id',
+                 '_user_id', '_replies', '_my_comment', '_couplet_index',
+                 '_couplet_summary')
     _id: int
     _author_name: str
     _author_url: str
@@ -242,11 +318,6 @@ class Comment:
     _couplet_index: int
     _couplet_summary: str
 
-    def __init__(self, comment_args):
-        for key in comment_args.keys():
-            snake_key = underscore(key)
-            setattr(self, "_"+snake_key, comment_args[key])
-
     # TODO: Add get recent comments
 
     @property
@@ -255,7 +326,7 @@ class Comment:
 
     @property
     def replies(self) -> List[Comment]:
-        return [Comment(comment) for comment in self._replies]
+        return [Comment(comment) for comment in self._replies or []]
 
     @property
     def author_name(self) -> str:
@@ -320,9 +391,8 @@ class Recitation:
     _html_text: str
 
     def __init__(self, recitation_args):
-        for key in recitation_args.keys():
-            snake_key = underscore(key)
-            setattr(self, "_"+snake_key, recitation_args[key])
+        for key, value in recitation_args.items():
+            setattr(self, attribute_name(key), value)
 
     @property
     def id(self) -> int:
@@ -397,8 +467,11 @@ class Recitation:
         return self._html_text
 
 
-@dataclass
-class IncompletePoem:
+@dataclass(init=False)
+class IncompletePoem(SlottedModel):
+    __slots__ = ('_id', '_title', '_url_slug', '_excerpt', '_rhythm',
+                 '_rhyme_letters')
+    unknown_keys = IGNORE
     _id: int
     _title: str
     _url_slug: str
@@ -406,11 +479,6 @@ class IncompletePoem:
     _rhythm: str
     _rhyme_letters: str
 
-    def __init__(self, incomplete_poem_args):
-        for key in incomplete_poem_args.keys():
-            snake_key = underscore(key)
-            setattr(self, "_"+snake_key, incomplete_poem_args[key])
-
     @property
     def id(self) -> int:
         return self._id
@@ -0,0 +1,62 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from threading import Lock
+from typing import Dict
+import time
+
+
+class TokenBucket:
+    """Allows ``rate`` acquisitions per second on average with bursts of
+    up to ``capacity``. Safe to share between threads."""
+
+    def __init__(self, rate: float, capacity: float = None) -> None:
+        self.rate = rate
+        self.capacity = capacity if capacity is not None else max(rate, 1)
+        self._tokens = self.capacity
+        self._updated_at = time.monotonic()
+        self._lock = Lock()
+
+    def _refill(self, now: float) -> None:
+        self._tokens = min(self.capacity,
+                           self._tokens+(now-self._updated_at)*self.rate)
+        self._updated_at = now
+
+    def try_acquire(self, tokens: float = 1) -> float:
+        """Takes ``tokens`` if available and returns 0, otherwise returns
+        the seconds to wait before they will be."""
+        with self._lock:
+            self._refill(time.monotonic())
+            if self._tokens >= tokens:
+                self._tokens -= tokens
+                return 0
+            return (tokens-self._tokens)/self.rate
+
+    def acquire(self, tokens: float = 1) -> None:
+        """Blocks until ``tokens`` are available and takes them."""
+        while True:
+            wait = self.try_acquire(tokens)
+            if not wait:
+                return
+            time.sleep(wait)
+
+
+class RateLimiter:
+    """One TokenBucket per host, created on first use."""
+
+    def __init__(self, rate: float, capacity: float = None) -> None:
+        self.rate = rate
+        self.capacity = capacity
+        self._buckets: Dict[str, TokenBucket] = {}
+        self._lock = Lock()
+
+    def bucket(self, host: str) -> TokenBucket:
+        with self._lock:
+            bucket = self._buckets.get(host)
+            if bucket is None:
+                bucket = self._buckets[host] = TokenBucket(self.rate,
+                                                           self.capacity)
+            return bucket
+
+    def acquire(self, host: str) -> None:
+        self.bucket(host).acquire()
@@ -0,0 +1,125 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from dataclasses import dataclass
+from threading import Lock
+from typing import FrozenSet, Mapping, Optional
+import random
+import time
+
+from .exceptions import CircuitOpenError
+
+RETRY_STATUSES = frozenset({429, 502, 503, 504})
+
+
+def parse_retry_after(value: Optional[str]) -> Optional[float]:
+    """Seconds to wait from a Retry-After header, given either as a number
+    of seconds or as an HTTP date. None when missing or unparsable."""
+    if not value:
+        return None
+    try:
+        return max(0.0, float(value))
+    except ValueError:
+        pass
+    from email.utils import parsedate_to_datetime
+    try:
+        date = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    return max(0.0, date.timestamp()-time.time())
+
+
+@dataclass
+class RetryPolicy:
+    """How a transport retries idempotent requests.
+
+    Connection errors, timeouts and responses with a status in ``statuses``
+    are retried up to ``total`` times. Waits grow exponentially from
+    ``backoff_factor`` up to ``max_backoff`` seconds with full jitter, so
+    concurrent clients do not retry in lockstep. A ``Retry-After`` header is
+    honoured instead when present; if it asks for more than
+    ``max_retry_after`` seconds the error is raised right away."""
+    total: int = 3
+    backoff_factor: float = 0.5
+    max_backoff: float = 30
+    jitter: bool = True
+    statuses: FrozenSet[int] = RETRY_STATUSES
+    respect_retry_after: bool = True
+    max_retry_after: float = 120
+
+    def backoff(self, attempt: int) -> float:
+        """Seconds to wait before retry number ``attempt`` (from 1)."""
+        delay = min(self.max_backoff, self.backoff_factor*2**(attempt-1))
+        return random.uniform(0, delay) if self.jitter else delay
+
+    def retry_after(self, headers: Mapping[str, str]) -> Optional[float]:
+        if not self.respect_retry_after:
+            return None
+        return parse_retry_after(headers.get('Retry-After'))
+
+    def wait(self, attempt: int,
+             headers: Mapping[str, str] = None) -> Optional[float]:
+        """Seconds to wait before retrying, or None when the request should
+        not be retried again."""
+        if attempt > self.total:
+            return None
+        retry_after = self.retry_after(headers or {})
+        if retry_after is not None:
+            return retry_after if retry_after <= self.max_retry_after else None
+        return self.backoff(attempt)
+
+
+NO_RETRY = RetryPolicy(total=0)
+
+
+class CircuitBreaker:
+    """Fails fast once the upstream looks down.
+
+    After ``failure_threshold`` consecutive failures the circuit opens and
+    every call raises CircuitOpenError for ``reset_timeout`` seconds. Then a
+    single trial call is let through: success closes the circuit, failure
+    opens it again. Safe to share between threads and event loops."""
+    CLOSED = 'closed'
+    OPEN = 'open'
+    HALF_OPEN = 'half-open'
+
+    def __init__(self, failure_threshold: int = 5,
+                 reset_timeout: float = 30) -> None:
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.failures = 0
+        self._opened_at = 0.0
+        self._lock = Lock()
+
+    def before_call(self) -> None:
+        """Raises CircuitOpenError if the call should not be made."""
+        with self._lock:
+            if self.state == self.CLOSED:
+                return
+            retry_in = self._opened_at+self.reset_timeout-time.monotonic()
+            if self.state == self.OPEN and retry_in <= 0:
+                self.state = self.HALF_OPEN
+                return
+            raise CircuitOpenError(max(retry_in, 0))
+
+    def record_success(self) -> None:
+        with self._lock:
+            self.state = self.CLOSED
+            self.failures = 0
+
+    def release(self) -> None:
+        """Ends a call that got no answer either way, such as a cancelled
+        one, without counting it. A half-open circuit lets the next call
+        through as its trial instead."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self.failures += 1
+            if (self.state == self.HALF_OPEN or
+                    self.failures >= self.failure_threshold):
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
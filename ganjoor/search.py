@@ -0,0 +1,202 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from dataclasses import dataclass
+from threading import RLock
+from typing import (Dict, FrozenSet, Iterable, Iterator, List, Optional, Set,
+                    Tuple, Union)
+import re
+
+from .models import Poem
+
+_PERSIAN_TABLE = {
+    ord('ي'): 'ی',  # Arabic yeh
+    ord('ى'): 'ی',  # Alef maksura
+    ord('ئ'): 'ی',
+    ord('ك'): 'ک',  # Arabic kaf
+    ord('ة'): 'ه',
+    ord('ۀ'): 'ه',
+    ord('أ'): 'ا',
+    ord('إ'): 'ا',
+    ord('ٱ'): 'ا',
+    0x0640: None,  # Tatweel
+    0x200C: None,  # ZWNJ
+    0x200D: None,  # ZWJ
+    0x0670: None,  # Superscript alef
+}
+_PERSIAN_TABLE.update({code: None for code in range(0x064B, 0x0660)})
+_PERSIAN_TABLE.update({code: None for code in range(0x0610, 0x061B)})
+
+_TOKEN = re.compile(r'\w+')
+
+# A token, or ('poet', id) / ('cat', id) for the poems of a poet or in a
+# category, so filters are intersected like any other posting list.
+_Key = Union[str, Tuple[str, int]]
+
+# Queries whose full list of matches is kept for paging past the first page.
+_CACHED_QUERIES = 64
+
+
+def normalize_persian(text: str) -> str:
+    """Folds the spelling variants of Persian text found in the corpus:
+    Arabic yeh and kaf become their Persian forms, diacritics, tatweel
+    and zero-width joiners are removed and latin letters are lowercased."""
+    return text.translate(_PERSIAN_TABLE).lower()
+
+
+def tokenize(text: str) -> List[str]:
+    return _TOKEN.findall(normalize_persian(text))
+
+
+@dataclass
+class _Document:
+    tokens: FrozenSet[str]
+    poet_id: Optional[int]
+    cat_ids: FrozenSet[int]
+
+    def keys(self) -> Iterator[_Key]:
+        yield from self.tokens
+        if self.poet_id is not None:
+            yield ('poet', self.poet_id)
+        for cat_id in self.cat_ids:
+            yield ('cat', cat_id)
+
+
+class SearchIndex:
+    """In-memory inverted index over the verse text of poems.
+
+    Poems can be added at any time; searching for a term returns the ids
+    of poems containing every token of it, in id order, with the same
+    paging and poet_id/cat_id filters as Poem.search. cat_id matches the
+    poem's category and any of its ancestors. Poets and categories have
+    posting lists of their own, and the matches of recent queries are
+    kept for later pages until the index changes. Unless ``keep_poems`` is
+    False the payload of every indexed poem is kept too, so results can be
+    served with ``poem`` instead of being fetched again."""
+
+    def __init__(self, poems: Iterable[Poem] = (),
+                 keep_poems: bool = True) -> None:
+        self.keep_poems = keep_poems
+        self._payloads: Dict[int, dict] = {}
+        self._postings: Dict[_Key, Set[int]] = {}
+        self._sorted_postings: Dict[_Key, List[int]] = {}
+        self._matches: Dict[FrozenSet[_Key], List[int]] = {}
+        self._documents: Dict[int, _Document] = {}
+        self._lock = RLock()
+        for poem in poems:
+            self.add_poem(poem)
+
+    @classmethod
+    def from_mirror(cls, mirror) -> SearchIndex:
+        return cls(mirror.iter_poems())
+
+    def __len__(self) -> int:
+        return len(self._documents)
+
+    def __contains__(self, poem_id: int) -> bool:
+        return poem_id in self._documents
+
+    def poem(self, poem_id: int) -> Optional[Poem]:
+        """The indexed version of the poem, None when it is not indexed or
+        its payload is not kept."""
+        payload = self._payloads.get(poem_id)
+        return Poem(dict(payload)) if payload is not None else None
+
+    def add_poem(self, poem: Poem) -> None:
+        """Indexes the poem, replacing any earlier version of it."""
+        payload = poem.to_dict()
+        verses = payload.get('verses')
+        if verses:
+            text = ' '.join(verse.get('text') or '' for verse in verses)
+        else:
+            text = payload.get('plainText') or ''
+        category = payload.get('category') or {}
+        poet = category.get('poet') or {}
+        cat = category.get('cat') or {}
+        cat_ids = {ancestor.get('id')
+                   for ancestor in cat.get('ancestors') or []}
+        cat_ids.add(cat.get('id'))
+        cat_ids.discard(None)
+        document = _Document(frozenset(tokenize(text)), poet.get('id'),
+                             frozenset(cat_ids))
+        poem_id = payload.get('id')
+        with self._lock:
+            self.remove_poem(poem_id)
+            self._matches.clear()
+            self._documents[poem_id] = document
+            if self.keep_poems:
+                self._payloads[poem_id] = payload
+            for key in document.keys():
+                self._postings.setdefault(key, set()).add(poem_id)
+                ordered = self._sorted_postings.get(key)
+                if ordered is not None:
+                    if not ordered or ordered[-1] < poem_id:
+                        ordered.append(poem_id)
+                    else:
+                        del self._sorted_postings[key]
+
+    def remove_poem(self, poem_id: int) -> None:
+        with self._lock:
+            document = self._documents.pop(poem_id, None)
+            if document is None:
+                return
+            self._payloads.pop(poem_id, None)
+            self._matches.clear()
+            for key in document.keys():
+                postings = self._postings[key]
+                postings.discard(poem_id)
+                if not postings:
+                    del self._postings[key]
+                self._sorted_postings.pop(key, None)
+
+    def _sorted(self, key: _Key) -> List[int]:
+        postings = self._sorted_postings.get(key)
+        if postings is None:
+            postings = sorted(self._postings[key])
+            self._sorted_postings[key] = postings
+        return postings
+
+    def _all_matches(self, ordered: List[_Key]) -> List[int]:
+        """Sorted ids of the poems under every key, kept until the index
+        changes so later pages are slices."""
+        query = frozenset(ordered)
+        matches = self._matches.get(query)
+        if matches is None:
+            matches = sorted(self._postings[ordered[0]].intersection(
+                *[self._postings[key] for key in ordered[1:]]))
+            if len(self._matches) >= _CACHED_QUERIES:
+                del self._matches[next(iter(self._matches))]
+            self._matches[query] = matches
+        return matches
+
+    def search(self, term: str, page_number=1, page_size=5,
+               cat_id: int = 0, poet_id=0) -> List[int]:
+        """Ids of the poems on the requested page, see Poem.search.
+        An empty or whitespace term matches nothing."""
+        keys: Set[_Key] = set(tokenize(term or ''))
+        if not keys:
+            return []
+        if poet_id:
+            keys.add(('poet', poet_id))
+        if cat_id:
+            keys.add(('cat', cat_id))
+        start = (page_number-1)*page_size
+        with self._lock:
+            if any(key not in self._postings for key in keys):
+                return []
+            ordered = sorted(keys, key=lambda key: len(self._postings[key]))
+            if len(ordered) == 1:
+                return self._sorted(ordered[0])[start:start+page_size]
+            if start > 0:
+                return self._all_matches(ordered)[start:start+page_size]
+            # The first page walks the shortest list until it is full, so a
+            # rare token or a small poet or category bounds the work.
+            others = [self._postings[key] for key in ordered[1:]]
+            page = []
+            for poem_id in self._sorted(ordered[0]):
+                if any(poem_id not in postings for postings in others):
+                    continue
+                page.append(poem_id)
+                if len(page) == page_size:
+                    break
+            return page
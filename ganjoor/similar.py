@@ -0,0 +1,105 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from bisect import bisect_left, insort
+from threading import RLock
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from .models import Poem
+from .search import normalize_persian
+
+Key = Tuple[Optional[str], Optional[str], int]
+
+
+def _normalize(value: Optional[str]) -> Optional[str]:
+    if value is None:
+        return None
+    value = normalize_persian(value).strip()
+    return value or None
+
+
+class SimilarIndex:
+    """Answers Poem.similar queries from poems seen locally.
+
+    Poems are grouped by metre (the rhythm of their ganjoor_metre), rhyme
+    letters and poet id. Every combination with the rhyme, the metre or
+    the poet left out is precomputed too, so a query is a dict lookup and
+    a slice of an id-ordered list whatever parameters are given. Like
+    SearchIndex, the payloads of indexed poems are kept unless
+    ``keep_poems`` is False."""
+
+    def __init__(self, poems: Iterable[Poem] = (),
+                 keep_poems: bool = True) -> None:
+        self.keep_poems = keep_poems
+        self._payloads: Dict[int, dict] = {}
+        self._groups: Dict[Key, List[int]] = {}
+        self._keys: Dict[int, Key] = {}
+        self._lock = RLock()
+        for poem in poems:
+            self.add_poem(poem)
+
+    @classmethod
+    def from_mirror(cls, mirror) -> SimilarIndex:
+        return cls(mirror.iter_poems())
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, poem_id: int) -> bool:
+        return poem_id in self._keys
+
+    def poem(self, poem_id: int) -> Optional[Poem]:
+        """The indexed version of the poem, None when it is not indexed or
+        its payload is not kept."""
+        payload = self._payloads.get(poem_id)
+        return Poem(dict(payload)) if payload is not None else None
+
+    @staticmethod
+    def _group_keys(key: Key) -> List[Key]:
+        metre, rhyme, poet_id = key
+        return [(m, r, p) for m in {metre, None} for r in {rhyme, None}
+                for p in {poet_id, 0}]
+
+    def add_poem(self, poem: Poem) -> None:
+        """Indexes the poem, replacing any earlier version of it.
+        Poems without a metre are skipped."""
+        payload = poem.to_dict()
+        metre = _normalize((payload.get('ganjoorMetre') or {}).get('rhythm'))
+        if metre is None:
+            return
+        poet = ((payload.get('category') or {}).get('poet')) or {}
+        key = (metre, _normalize(payload.get('rhymeLetters')),
+               poet.get('id') or 0)
+        poem_id = payload.get('id')
+        with self._lock:
+            self.remove_poem(poem_id)
+            self._keys[poem_id] = key
+            if self.keep_poems:
+                self._payloads[poem_id] = payload
+            for group_key in self._group_keys(key):
+                group = self._groups.setdefault(group_key, [])
+                if not group or group[-1] < poem_id:
+                    group.append(poem_id)
+                else:
+                    insort(group, poem_id)
+
+    def remove_poem(self, poem_id: int) -> None:
+        with self._lock:
+            key = self._keys.pop(poem_id, None)
+            if key is None:
+                return
+            self._payloads.pop(poem_id, None)
+            for group_key in self._group_keys(key):
+                group = self._groups[group_key]
+                del group[bisect_left(group, poem_id)]
+                if not group:
+                    del self._groups[group_key]
+
+    def similar(self, page_number=1, page_size=5, metre: str = None,
+                rhyme: str = None, poet_id=0) -> List[int]:
+        """Ids of the poems on the requested page, see Poem.similar.
+        Leaving metre or rhyme as None matches any, poet_id=0 any poet."""
+        start = (page_number-1)*page_size
+        key = (_normalize(metre), _normalize(rhyme), poet_id or 0)
+        with self._lock:
+            return self._groups.get(key, [])[start:start+page_size]
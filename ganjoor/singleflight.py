@@ -0,0 +1,79 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from threading import Event, Lock
+from typing import (TYPE_CHECKING, Any, Awaitable, Callable, Dict,
+                    Hashable)
+
+if TYPE_CHECKING:
+    import asyncio
+
+
+class _Call:
+    __slots__ = ('done', 'result', 'error')
+
+    def __init__(self) -> None:
+        self.done = Event()
+        self.result = None
+        self.error = None
+
+
+class SingleFlight:
+    """Runs at most one call per key at a time; threads asking for a key
+    that is already in flight wait for that call and share its result or
+    exception instead of making their own. ``shared`` counts the calls that
+    were saved this way."""
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, _Call] = {}
+        self._lock = Lock()
+        self.shared = 0
+
+    def do(self, key: Hashable, function: Callable[[], Any]) -> Any:
+        with self._lock:
+            call = self._calls.get(key)
+            leader = call is None
+            if leader:
+                call = self._calls[key] = _Call()
+            else:
+                self.shared += 1
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.result
+        try:
+            call.result = function()
+        except BaseException as error:
+            call.error = error
+            raise
+        finally:
+            with self._lock:
+                del self._calls[key]
+            call.done.set()
+        return call.result
+
+
+class AsyncSingleFlight:
+    """asyncio counterpart of :class:`SingleFlight`, for coroutines running
+    on one event loop. The shared call is shielded, so cancelling one
+    waiter does not cancel it for the others."""
+
+    def __init__(self) -> None:
+        self._calls: Dict[Hashable, asyncio.Future] = {}
+        self.shared = 0
+
+    async def do(self, key: Hashable,
+                 function: Callable[[], Awaitable[Any]]) -> Any:
+        import asyncio
+        future = self._calls.get(key)
+        if future is not None:
+            self.shared += 1
+        else:
+            future = self._calls[key] = asyncio.ensure_future(function())
+
+            def forget(_):
+                if self._calls.get(key) is future:
+                    del self._calls[key]
+            future.add_done_callback(forget)
+        return await asyncio.shield(future)
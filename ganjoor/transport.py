@@ -0,0 +1,315 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from threading import Lock
+from typing import TYPE_CHECKING, Any, Callable, Dict, Optional, Union
+from urllib.parse import urlsplit
+import time
+from .cache import (BaseCache, CacheEntry, CacheStats, DO_NOT_CACHE,
+                    ExpireAfter, NEVER_EXPIRE, cache_key, expire_seconds)
+from .config import GANJGAH_BASE_URL
+from .exceptions import RateLimitedError, ResponseError, TransportError
+from .instrumentation import (CACHE_HIT, CACHE_MISS, CACHE_STALE,
+                              Instrumentation)
+from .ratelimit import RateLimiter
+from .retry import NO_RETRY, CircuitBreaker, RetryPolicy, parse_retry_after
+from .singleflight import SingleFlight
+from .utils import default_json_loads
+
+if TYPE_CHECKING:
+    import requests
+
+DEFAULT_POOL_SIZE = 10
+DEFAULT_TIMEOUT = 30
+DEFAULT_HEADERS = {
+    'Accept': 'application/json',
+    'User-Agent': 'ganjoor-api-wrapper'
+}
+
+# Poem._urls['random'] and Poem._urls['hafez_faal'], spelled out since the
+# models import this module. Concurrent calls to these must each get their
+# own answer.
+RANDOM_ENDPOINTS = frozenset({'/api/ganjoor/poem/random',
+                              '/api/ganjoor/hafez/faal'})
+
+
+class Transport:
+    """Keep-alive HTTP transport shared by every model call of a client.
+
+    Endpoints are passed as the templates found in the models' ``_urls``
+    tables (e.g. ``Poem._urls['find']``) and formatted with ``path_params``,
+    so a single transport always talks to its own ``base_url``.
+
+    When a ``cache`` is given, successful ``get_json`` responses are stored
+    in it. ``expire_after`` maps endpoint templates to a lifetime in seconds
+    (or a timedelta), with ``'*'`` as the fallback; ``NEVER_EXPIRE`` keeps
+    an entry forever and ``DO_NOT_CACHE`` bypasses the cache. Random poems
+    and faals are not cached unless ``expire_after`` names them.
+
+    GET requests are retried according to ``retry`` (a RetryPolicy, the
+    default one when None, no retries when False). ``rate_limit`` caps the
+    requests per second sent to each host, either as a number or as a
+    RateLimiter shared with other transports, and ``circuit_breaker``
+    makes calls fail fast with CircuitOpenError while the API is down.
+
+    With ``coalesce``, concurrent ``get_json`` calls for the same URL and
+    params share a single request; each caller still decodes its own copy
+    of the body. Random poems and faals are never shared.
+
+    Expired entries carrying an ETag or Last-Modified header are kept and
+    revalidated with a conditional request; a 304 answer renews them
+    without downloading the body again. ``cache_stats`` counts hits,
+    misses and revalidations.
+
+    Bodies are decoded with ``json_loads``, orjson's when it is installed
+    and the standard library's otherwise.
+
+    ``instrumentation`` receives the latency, status and size of every
+    attempt, retries, cache outcomes and decode and model construction
+    times, see ganjoor.instrumentation.MetricsCollector."""
+
+    def __init__(self, base_url: str = GANJGAH_BASE_URL,
+                 pool_size: int = DEFAULT_POOL_SIZE,
+                 timeout: float = DEFAULT_TIMEOUT,
+                 headers: Optional[Dict[str, str]] = None,
+                 session: requests.Session = None,
+                 cache: BaseCache = None,
+                 expire_after: Dict[str, ExpireAfter] = None,
+                 retry: RetryPolicy = None,
+                 rate_limit: Union[float, RateLimiter] = None,
+                 circuit_breaker: CircuitBreaker = None,
+                 coalesce: bool = True,
+                 json_loads: Callable[[bytes], Any] = None,
+                 instrumentation: Instrumentation = None) -> None:
+        self.base_url = base_url.rstrip('/')
+        self.pool_size = pool_size
+        self.timeout = timeout
+        self.headers = dict(DEFAULT_HEADERS)
+        if headers:
+            self.headers.update(headers)
+        self._session = session
+        self._session_lock = Lock()
+        self.cache = cache
+        self.cache_stats = CacheStats()
+        self.expire_after = {'*': NEVER_EXPIRE,
+                             **dict.fromkeys(RANDOM_ENDPOINTS, DO_NOT_CACHE)}
+        if expire_after:
+            self.expire_after.update(expire_after)
+        if retry is None:
+            retry = RetryPolicy()
+        elif retry is False:
+            retry = NO_RETRY
+        self.retry = retry
+        if rate_limit is not None and not isinstance(rate_limit,
+                                                     RateLimiter):
+            rate_limit = RateLimiter(rate_limit)
+        self.rate_limiter = rate_limit
+        self.circuit_breaker = circuit_breaker
+        self.coalesce = coalesce
+        self._json_loads = json_loads
+        if instrumentation is None:
+            instrumentation = Instrumentation()
+        self.instrumentation = instrumentation
+        self._in_flight = SingleFlight()
+
+    @property
+    def session(self) -> requests.Session:
+        if self._session is None:
+            with self._session_lock:
+                if self._session is None:
+                    self._session = self._new_session()
+        return self._session
+
+    def _new_session(self) -> requests.Session:
+        import requests
+        from requests.adapters import HTTPAdapter
+        session = requests.Session()
+        adapter = HTTPAdapter(pool_connections=self.pool_size,
+                              pool_maxsize=self.pool_size)
+        session.mount('https://', adapter)
+        session.mount('http://', adapter)
+        session.headers.update(self.headers)
+        return session
+
+    @property
+    def json_loads(self) -> Callable[[bytes], Any]:
+        if self._json_loads is None:
+            self._json_loads = default_json_loads()
+        return self._json_loads
+
+    @json_loads.setter
+    def json_loads(self, json_loads: Callable[[bytes], Any]) -> None:
+        self._json_loads = json_loads
+
+    def url(self, endpoint: str, **path_params) -> str:
+        return self.base_url+endpoint.format(**path_params)
+
+    def _send(self, send, url: str) -> requests.Response:
+        if self.circuit_breaker is not None:
+            self.circuit_breaker.before_call()
+        if self.rate_limiter is not None:
+            self.rate_limiter.acquire(urlsplit(url).netloc)
+        try:
+            response = send()
+        except BaseException:
+            # Anything else would leave a half-open circuit waiting for
+            # its trial call forever.
+            if self.circuit_breaker is not None:
+                self.circuit_breaker.record_failure()
+            raise
+        if self.circuit_breaker is not None:
+            if response.status_code >= 500:
+                self.circuit_breaker.record_failure()
+            else:
+                self.circuit_breaker.record_success()
+        return response
+
+    def get(self, endpoint: str, params=None, headers=None,
+            **path_params) -> requests.Response:
+        """Sends a GET request, retrying it as the retry policy allows.
+        Once retries are exhausted the last response is returned, or
+        TransportError raised if the request never got one."""
+        url = self.url(endpoint, **path_params)
+        instrumentation = self.instrumentation
+        attempt = 0
+        while True:
+            attempt += 1
+            started = time.perf_counter()
+            try:
+                response = self._send(lambda: self.session.get(
+                    url, params=params, timeout=self.timeout,
+                    headers=headers), url)
+            except _request_errors() as error:
+                instrumentation.on_request(
+                    endpoint, None, time.perf_counter()-started, 0)
+                wait = self.retry.wait(attempt)
+                if wait is None:
+                    raise TransportError(
+                        f"Request to {url} failed: {error}") from error
+            else:
+                instrumentation.on_request(
+                    endpoint, response.status_code,
+                    time.perf_counter()-started, len(response.content))
+                if response.status_code not in self.retry.statuses:
+                    return response
+                wait = self.retry.wait(attempt, response.headers)
+                if wait is None:
+                    return response
+            instrumentation.on_retry(endpoint, attempt, wait)
+            time.sleep(wait)
+
+    def post(self, endpoint: str, json=None,
+             **path_params) -> requests.Response:
+        url = self.url(endpoint, **path_params)
+        return self._send(lambda: self.session.post(
+            url, json=json, timeout=self.timeout), url)
+
+    def expire_after_for(self, endpoint: str) -> float:
+        return expire_seconds(self.expire_after.get(
+            endpoint, self.expire_after['*']))
+
+    def get_json(self, endpoint: str, params=None, **path_params):
+        expire_after = self.expire_after_for(endpoint)
+        use_cache = self.cache is not None and expire_after != DO_NOT_CACHE
+        key = cache_key(self.url(endpoint, **path_params), params)
+        entry = None
+        if use_cache:
+            entry = self.cache.get(key)
+            if entry is None:
+                self.instrumentation.on_cache(endpoint, CACHE_MISS)
+            elif not entry.is_expired():
+                self.cache_stats.hits += 1
+                self.instrumentation.on_cache(endpoint, CACHE_HIT)
+                return self.decode(endpoint, entry.content)
+            else:
+                self.instrumentation.on_cache(endpoint, CACHE_STALE)
+                if not entry.validators:
+                    self.cache.delete(key)
+                    entry = None
+
+        def fetch() -> CacheEntry:
+            headers = entry.validators if entry is not None else None
+            if use_cache:
+                if headers:
+                    self.cache_stats.revalidations += 1
+                else:
+                    self.cache_stats.misses += 1
+            response = self.get(endpoint, params=params, headers=headers,
+                                **path_params)
+            if response.status_code == 304 and entry is not None:
+                self.cache_stats.not_modified += 1
+                fresh = entry.refreshed(response, expire_after)
+            elif response.status_code == 200:
+                fresh = CacheEntry.from_response(response, expire_after)
+            else:
+                raise response_error(response.status_code, response.reason,
+                                     response.headers.get('Retry-After'))
+            if use_cache:
+                self.cache.set(key, fresh)
+            return fresh
+
+        # Random poems and faals must not share answers.
+        if self.coalesce and endpoint not in RANDOM_ENDPOINTS:
+            fresh = self._in_flight.do(key, fetch)
+        else:
+            fresh = fetch()
+        return self.decode(endpoint, fresh.content)
+
+    def decode(self, endpoint: str, content: bytes):
+        started = time.perf_counter()
+        body = self.json_loads(content)
+        self.instrumentation.on_decode(endpoint, time.perf_counter()-started)
+        return body
+
+    def build(self, endpoint: str, factory: Callable[[Any, Transport], Any],
+              body):
+        """Returns ``factory(body, self)``, reporting the time it took as
+        model construction for ``endpoint``."""
+        started = time.perf_counter()
+        result = factory(body, self)
+        self.instrumentation.on_construct(endpoint,
+                                          time.perf_counter()-started)
+        return result
+
+    def close(self) -> None:
+        with self._session_lock:
+            if self._session is not None:
+                self._session.close()
+                self._session = None
+        if self.cache is not None:
+            self.cache.close()
+
+    def __enter__(self) -> Transport:
+        return self
+
+    def __exit__(self, *exc_info) -> None:
+        self.close()
+
+
+def _request_errors() -> type:
+    """Errors meaning the request got no usable response, such as
+    connection errors, timeouts or bodies cut short. Only evaluated when
+    something was raised, so requests is imported with the first session
+    rather than with this module."""
+    import requests
+    return requests.RequestException
+
+
+def response_error(status_code: int, reason: str,
+                   retry_after: str = None) -> ResponseError:
+    error_class = RateLimitedError if status_code == 429 else ResponseError
+    return error_class(status_code, reason, parse_retry_after(retry_after))
+
+
+_default_transport = None
+_default_transport_lock = Lock()
+
+
+def get_default_transport() -> Transport:
+    """Transport used by model calls made without an explicit client."""
+    global _default_transport
+    if _default_transport is None:
+        with _default_transport_lock:
+            if _default_transport is None:
+                _default_transport = Transport()
+    return _default_transport
@@ -0,0 +1,98 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from typing import Any, Callable, Dict, List, Tuple
+import json
+
+_attribute_names: Dict[str, str] = {}
+
+
+def attribute_name(key: str) -> str:
+    """Maps an API key to its model attribute, 'coupletIndex' to
+    '_couplet_index'. Each distinct key goes through inflection's regexes
+    once, after that it is a dict lookup."""
+    name = _attribute_names.get(key)
+    if name is None:
+        from inflection import underscore
+        name = _attribute_names[key] = "_"+underscore(key)
+    return name
+
+
+def default_json_loads() -> Callable[[bytes], Any]:
+    """orjson.loads when orjson is installed, json.loads otherwise. Both
+    accept the raw response bytes and return the same values for the
+    API's payloads."""
+    try:
+        import orjson
+    except ImportError:
+        return json.loads
+    return orjson.loads
+
+
+class memoized_property:
+    """Read-only property computed on first access and stored on the
+    instance, later accesses are plain attribute lookups.
+    Use :meth:`Memoized.invalidate` to drop the stored value. A property
+    built from other memoized ones names them in ``depends_on``, e.g.
+    ``@memoized_property(depends_on=('verses',))``, and is dropped with
+    them."""
+
+    def __init__(self, function=None, *,
+                 depends_on: Tuple[str, ...] = ()) -> None:
+        self.depends_on = tuple(depends_on)
+        if function is not None:
+            self(function)
+
+    def __call__(self, function) -> memoized_property:
+        self.function = function
+        self.name = function.__name__
+        self.__doc__ = function.__doc__
+        return self
+
+    def __set_name__(self, owner, name) -> None:
+        self.name = name
+
+    def __get__(self, instance, owner=None):
+        if instance is None:
+            return self
+        value = self.function(instance)
+        instance.__dict__[self.name] = value
+        return value
+
+
+class Memoized:
+    """Mixin for models with memoized_property collections."""
+
+    @classmethod
+    def _memoized_names(cls) -> Tuple[str, ...]:
+        names = cls.__dict__.get('_memoized_names_cache')
+        if names is None:
+            names = tuple(name for klass in cls.__mro__
+                          for name, value in vars(klass).items()
+                          if isinstance(value, memoized_property))
+            cls._memoized_names_cache = names
+        return names
+
+    @classmethod
+    def _dependents(cls) -> Dict[str, Tuple[str, ...]]:
+        dependents = cls.__dict__.get('_dependents_cache')
+        if dependents is None:
+            found: Dict[str, List[str]] = {}
+            for name in cls._memoized_names():
+                for dependency in getattr(cls, name).depends_on:
+                    found.setdefault(dependency, []).append(name)
+            dependents = {name: tuple(names)
+                          for name, names in found.items()}
+            cls._dependents_cache = dependents
+        return dependents
+
+    def invalidate(self, *names: str) -> None:
+        """Drops memoized collections, and those depending on them, so
+        they are rebuilt from the raw data on next access, all of them
+        when no names are given."""
+        pending = list(names or self._memoized_names())
+        dependents = self._dependents()
+        while pending:
+            name = pending.pop()
+            self.__dict__.pop(name, None)
+            pending.extend(dependents.get(name, ()))
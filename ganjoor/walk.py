@@ -0,0 +1,136 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from __future__ import annotations
+from collections import deque
+from dataclasses import dataclass
+from typing import (TYPE_CHECKING, Callable, Dict, Iterable, Iterator, List,
+                    Optional, Tuple)
+
+if TYPE_CHECKING:
+    from .models import Category
+    from .poem_utils import IncompletePoem
+
+
+@dataclass
+class CategoryVisit:
+    """A category reached by a walk, ``depth`` levels below the root.
+    ``path`` holds the ids of its ancestors, from the root down to its
+    parent."""
+    category: Category
+    depth: int
+    path: Tuple[int, ...]
+
+    @property
+    def parent_id(self) -> Optional[int]:
+        return self.path[-1] if self.path else None
+
+
+def walk_categories(fetch: Callable[[int], Category], root_id: int,
+                    max_workers: int = 8) -> Iterator[CategoryVisit]:
+    """Breadth-first walk of the category tree under ``root_id``.
+
+    ``fetch(id)`` is called on a pool of ``max_workers`` threads; a
+    category's children are queued as soon as it arrives, so siblings and
+    cousins are fetched concurrently, and visits are yielded in arrival
+    order. The first failed fetch is raised and stops the walk."""
+    from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+    frontier = deque([(root_id, 0, ())])
+    seen = {root_id}
+    in_flight = {}
+    executor = ThreadPoolExecutor(max_workers=max_workers)
+    try:
+        while frontier or in_flight:
+            while frontier and len(in_flight) < max_workers:
+                id, depth, path = frontier.popleft()
+                in_flight[executor.submit(fetch, id)] = (depth, path)
+            finished, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+            for future in finished:
+                depth, path = in_flight.pop(future)
+                category = future.result()
+                child_path = path+(category.id,)
+                for child in category.children:
+                    if child.id not in seen:
+                        seen.add(child.id)
+                        frontier.append((child.id, depth+1, child_path))
+                yield CategoryVisit(category, depth, path)
+    finally:
+        for future in in_flight:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+class CategoryTree:
+    """A fully walked category tree kept in memory, answering structure
+    queries without further requests."""
+
+    def __init__(self, visits: Iterable[CategoryVisit]) -> None:
+        self._visits: Dict[int, CategoryVisit] = {}
+        self._children: Dict[int, List[int]] = {}
+        self.root_id = None
+        for visit in visits:
+            id = visit.category.id
+            self._visits[id] = visit
+            self._children.setdefault(id, [])
+            if visit.parent_id is None:
+                self.root_id = id
+        for id, visit in self._visits.items():
+            if visit.parent_id is not None:
+                self._children[visit.parent_id].append(id)
+        # Children in the order the API lists them, not arrival order.
+        for id, children in self._children.items():
+            order = {child.id: index for index, child
+                     in enumerate(self._visits[id].category.children)}
+            children.sort(key=order.get)
+
+    def __len__(self) -> int:
+        return len(self._visits)
+
+    def __contains__(self, id: int) -> bool:
+        return id in self._visits
+
+    def __getitem__(self, id: int) -> Category:
+        return self._visits[id].category
+
+    def __iter__(self) -> Iterator[Category]:
+        """Categories in breadth-first order."""
+        return (self[id] for id in self.ids())
+
+    @property
+    def root(self) -> Category:
+        return self[self.root_id]
+
+    def ids(self, id: int = None) -> List[int]:
+        """Ids of the subtree under ``id`` (the whole tree by default) in
+        breadth-first order, starting with ``id`` itself."""
+        ids = [self.root_id if id is None else id]
+        for current in ids:
+            ids.extend(self._children[current])
+        return ids
+
+    def depth(self, id: int) -> int:
+        return self._visits[id].depth
+
+    def path(self, id: int) -> Tuple[int, ...]:
+        return self._visits[id].path
+
+    def parent(self, id: int) -> Optional[Category]:
+        parent_id = self._visits[id].parent_id
+        return self[parent_id] if parent_id is not None else None
+
+    def children(self, id: int) -> List[Category]:
+        return [self[child] for child in self._children[id]]
+
+    def descendants(self, id: int) -> List[Category]:
+        return [self[descendant] for descendant in self.ids(id)[1:]]
+
+    def find_by_url(self, url: str) -> Optional[Category]:
+        for visit in self._visits.values():
+            if visit.category.full_url == url:
+                return visit.category
+        return None
+
+    def poems(self, id: int = None) -> List[IncompletePoem]:
+        """Poems listed in the subtree under ``id``, breadth-first. Empty
+        unless the tree was walked with_poems."""
+        return [poem for category in map(self.__getitem__, self.ids(id))
+                for poem in category.poems]
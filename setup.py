@@ -1,6 +1,6 @@
 # Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
 # SPDX-License-Identifier: MIT
-from distutils.core import setup
+from setuptools import setup
 setup(
     name='ganjoor-api-wrapper',
     packages=['ganjoor'],
@@ -14,9 +14,13 @@ setup(
     keywords=['Ganjoor', 'API', 'API-wrapper', 'Poetry', 'Persian', 'Farsi'],
     install_requires=[
         'inflection',
-        'requests',
-        'requests-cache'
+        'requests'
     ],
+    extras_require={
+        'async': ['aiohttp'],
+        'export': ['pyarrow'],
+        'fast': ['orjson'],
+    },
     classifiers=[
         'Development Status :: 3 - Alpha',
         'Intended Audience :: Developers',
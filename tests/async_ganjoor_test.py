@@ -0,0 +1,200 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+import asyncio
+import time
+
+import pytest
+from ganjoor import (AsyncGanjoor, CircuitBreaker, GanjoorException,
+                     MetricsCollector, Poem)
+from ganjoor.async_ganjoor import AsyncTransport
+from ganjoor.exceptions import ResponseError, TransportError
+from ganjoor.poem_utils import Comment
+
+from tests.fakes import poem_body
+
+aiohttp = pytest.importorskip('aiohttp')
+web = pytest.importorskip('aiohttp.web')
+
+
+async def serve(test):
+    """Runs ``test(client)`` against a local aiohttp app."""
+    seen = []
+
+    async def poem(request):
+        seen.append(dict(request.query))
+        poem_id = int(request.match_info['id'])
+        if poem_id == 500:
+            return web.Response(status=500)
+        if poem_id == 503 and seen.count(dict(request.query)) == 1:
+            return web.Response(status=503, headers={'Retry-After': "0"})
+        return web.json_response(poem_body(poem_id))
+
+    async def comments(request):
+        return web.json_response([{'id': 1, 'authorName': "test"}])
+
+    async def empty(request):
+        return web.json_response([])
+
+    async def search(request):
+        seen.append(dict(request.query))
+        return web.json_response([poem_body(1), poem_body(2)])
+
+    async def login(request):
+        return web.Response(status=401, reason="Unauthorized")
+
+    async def echo(request):
+        return web.json_response(await request.json())
+
+    app = web.Application()
+    app.router.add_post('/api/users/login', login)
+    app.router.add_post('/api/echo', echo)
+    app.router.add_get('/api/ganjoor/poem/{id}', poem)
+    app.router.add_get('/api/ganjoor/poem/{id}/comments', comments)
+    for related in ('recitations', 'images', 'songs'):
+        app.router.add_get('/api/ganjoor/poem/{id}/'+related, empty)
+    app.router.add_get('/api/ganjoor/poems/search', search)
+    runner = web.AppRunner(app)
+    await runner.setup()
+    site = web.TCPSite(runner, '127.0.0.1', 0)
+    await site.start()
+    port = site._server.sockets[0].getsockname()[1]
+    try:
+        async with AsyncGanjoor(base_url=f"http://127.0.0.1:{port}") as client:
+            return await test(client), seen
+    finally:
+        await runner.cleanup()
+
+
+class FailingSession:
+    """Stands in for an aiohttp session whose responses raise ``error``
+    while being read."""
+
+    def __init__(self, error):
+        self.error = error
+        self.calls = 0
+
+    def get(self, url, params=None):
+        session = self
+
+        class Response:
+            async def __aenter__(self):
+                session.calls += 1
+                raise session.error
+
+            async def __aexit__(self, *exc_info):
+                pass
+        return Response()
+
+
+class TestAsyncGanjoor:
+
+    def test_find_poem_by_id(self):
+        poem, seen = asyncio.run(serve(
+            lambda client: client.find_poem_by_id(2131, rhymes=True)))
+        assert isinstance(poem, Poem)
+        assert poem.id == 2131
+        assert seen[0]['rhymes'] == 'True'
+
+    def test_concurrent_requests(self):
+        async def fetch_many(client):
+            return await asyncio.gather(
+                *[client.find_poem_by_id(id) for id in range(1, 51)])
+        poems, _ = asyncio.run(serve(fetch_many))
+        assert [poem.id for poem in poems] == list(range(1, 51))
+
+    def test_search_poems(self):
+        poems, seen = asyncio.run(serve(
+            lambda client: client.search_poems("شیراز")))
+        assert len(poems) == 2
+        assert seen[0]['term'] == "شیراز"
+
+    def test_request_comments(self):
+        async def comments(client):
+            poem = await client.find_poem_by_id(2131)
+            return await client.request_comments(poem)
+        comments, _ = asyncio.run(serve(comments))
+        assert isinstance(comments[0], Comment)
+
+    def test_fetch_related(self):
+        async def fetch_related(client):
+            poem = await client.find_poem_by_id(2131)
+            return await client.fetch_related(poem)
+        poem, _ = asyncio.run(serve(fetch_related))
+        assert isinstance(poem.comments[0], Comment)
+        assert poem.songs == []
+
+    def test_invalid_response_raises(self):
+        with pytest.raises(GanjoorException):
+            asyncio.run(serve(lambda client: client.find_poem_by_id(500)))
+
+    def test_post_json(self):
+        async def post(client):
+            body = await client.transport.post_json('/api/echo', json={1: 2})
+            with pytest.raises(ResponseError) as raised:
+                await client.transport.post_json('/api/missing')
+            return body, raised.value
+        (body, error), _ = asyncio.run(serve(post))
+        assert body == {'1': 2}
+        assert error.status_code == 404
+        assert "Authentication" not in str(error)
+
+    def test_log_in_failure(self):
+        with pytest.raises(GanjoorException, match="Authentication Failed"):
+            asyncio.run(serve(lambda client: client.log_in("user", "pass")))
+
+    def test_retries_transient_errors(self):
+        poem, seen = asyncio.run(serve(
+            lambda client: client.find_poem_by_id(503)))
+        assert poem.id == 503
+        assert len(seen) == 2
+
+    def test_coalesces_identical_requests(self):
+        async def fetch_same(client):
+            return await asyncio.gather(
+                *[client.find_poem_by_id(2131) for _ in range(10)])
+        poems, seen = asyncio.run(serve(fetch_same))
+        assert [poem.id for poem in poems] == [2131]*10
+        assert len(seen) == 1
+
+    def test_instrumentation(self):
+        metrics = MetricsCollector()
+
+        async def instrumented(client):
+            client.transport.instrumentation = metrics
+            return await client.find_poem_by_id(503)
+        asyncio.run(serve(instrumented))
+        find = metrics.snapshot()[Poem._urls['find']]
+        assert find['statuses'] == {'503': 1, '200': 1}
+        assert find['retries'] == 1
+        assert find['decode']['count'] == 1
+        assert find['construct']['count'] == 1
+
+    @pytest.mark.parametrize('error, raised', [
+        (aiohttp.ClientPayloadError("cut short"), TransportError),
+        (ValueError("bug"), ValueError)])
+    def test_errors_end_the_trial_call(self, error, raised, monkeypatch):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        breaker.record_failure()
+        now = time.monotonic()
+        monkeypatch.setattr('ganjoor.retry.time.monotonic', lambda: now+11)
+        session = FailingSession(error)
+        transport = AsyncTransport(session=session, retry=False,
+                                   circuit_breaker=breaker)
+        with pytest.raises(raised):
+            asyncio.run(transport.get_json(Poem._urls['find'], id=1))
+        assert breaker.state == CircuitBreaker.OPEN
+        assert session.calls == 1
+
+    def test_cancellation_releases_the_trial_call(self, monkeypatch):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        breaker.record_failure()
+        now = time.monotonic()
+        monkeypatch.setattr('ganjoor.retry.time.monotonic', lambda: now+11)
+        transport = AsyncTransport(
+            session=FailingSession(asyncio.CancelledError()),
+            circuit_breaker=breaker)
+        with pytest.raises(asyncio.CancelledError):
+            asyncio.run(transport.get_json(Poem._urls['find'], id=1))
+        assert breaker.failures == 1
+        breaker.before_call()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
@@ -0,0 +1,61 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+import time
+
+import pytest
+from pytest import fixture
+from ganjoor import BulkResult, Ganjoor, GanjoorException, Poem
+from ganjoor.bulk import fetch_concurrently
+
+from tests.fakes import FakeSession, make_response, poem_body
+
+
+def by_url(url, params, headers):
+    return make_response(poem_body(int(params['url'].split('sh')[-1])))
+
+
+class TestBulk:
+
+    @fixture
+    def ganjoor(self):
+        routes = {f"/api/ganjoor/poem/{id}": poem_body(id)
+                  for id in range(1, 21)}
+        routes['/api/ganjoor/poem'] = by_url
+        ganjoor = Ganjoor(base_url="http://localhost:8080", pool_size=4,
+                          cache=False)
+        ganjoor.transport._session = FakeSession(routes)
+        return ganjoor
+
+    def test_find_poems_by_ids_ordered(self, ganjoor):
+        results = list(ganjoor.find_poems_by_ids(range(1, 21)))
+        assert [result.key for result in results] == list(range(1, 21))
+        assert all(isinstance(result.value, Poem) for result in results)
+
+    def test_failures_are_reported(self, ganjoor):
+        results = list(ganjoor.find_poems_by_ids([1, 404, 2]))
+        assert [result.ok for result in results] == [True, False, True]
+        assert isinstance(results[1].error, GanjoorException)
+
+    def test_find_flags_are_forwarded(self, ganjoor):
+        list(ganjoor.find_poems_by_ids([1], rhymes=True))
+        assert ganjoor.transport.session.calls[0][1]['rhymes'] is True
+
+    def test_unknown_flag_raises_early(self, ganjoor):
+        with pytest.raises(TypeError):
+            ganjoor.find_poems_by_ids([1], rhyme=True)
+
+    def test_find_poems_by_urls(self, ganjoor):
+        urls = ["/hafez/ghazal/sh1", "/hafez/ghazal/sh2"]
+        results = list(ganjoor.find_poems_by_urls(urls, complete=True))
+        assert [result.value.id for result in results] == [1, 2]
+
+    def test_completion_order_and_concurrency(self):
+        def fetch(delay):
+            time.sleep(delay)
+            return delay
+        started = time.monotonic()
+        results = list(fetch_concurrently(fetch, [0.2, 0.01, 0.1],
+                                          max_workers=3, ordered=False))
+        assert time.monotonic() - started < 0.3
+        assert [result.value for result in results] == [0.01, 0.1, 0.2]
+        assert all(isinstance(result, BulkResult) for result in results)
@@ -0,0 +1,177 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+import time
+
+from pytest import fixture, mark
+from ganjoor import (DO_NOT_CACHE, FileCache, Ganjoor, MemoryCache, Poem,
+                     SQLiteCache, Transport)
+from ganjoor.cache import CacheEntry, cache_key
+
+from tests.fakes import FakeSession, make_response, poem_body
+
+
+def validated_route(body, **validators):
+    """Route answering 304 to requests carrying matching validators."""
+    headers = {'ETag': validators.get('etag'),
+               'Last-Modified': validators.get('last_modified')}
+    headers = {name: value for name, value in headers.items() if value}
+
+    def route(url, params, request_headers):
+        request_headers = request_headers or {}
+        etag = request_headers.get('If-None-Match')
+        since = request_headers.get('If-Modified-Since')
+        if ((etag and etag == headers.get('ETag')) or
+                (since and since == headers.get('Last-Modified'))):
+            return make_response({}, status_code=304,
+                                 reason="Not Modified", headers=headers)
+        return make_response(body, headers=headers)
+    return route
+
+
+class TestCache:
+
+    @fixture(params=['memory', 'sqlite', 'file'])
+    def cache(self, request, tmp_path):
+        if request.param == 'memory':
+            return MemoryCache()
+        if request.param == 'sqlite':
+            return SQLiteCache(str(tmp_path / 'cache.sqlite'))
+        return FileCache(str(tmp_path / 'cache'))
+
+    @fixture
+    def session(self):
+        return FakeSession({'/api/ganjoor/poem/1': poem_body(1),
+                            '/api/ganjoor/poem/random': poem_body(2)})
+
+    def test_backend_round_trip(self, cache):
+        cache.set('key', CacheEntry(200, b'{}', {'ETag': 'x'}))
+        entry = cache.get('key')
+        assert entry.content == b'{}'
+        assert entry.headers == {'ETag': 'x'}
+        cache.delete('key')
+        assert cache.get('key') is None
+
+    def test_transport_serves_from_cache(self, cache, session):
+        transport = Transport(session=session, cache=cache)
+        assert Poem.find(1, transport=transport).id == 1
+        assert Poem.find(1, transport=transport).id == 1
+        assert len(session.calls) == 1
+
+    def test_per_endpoint_expire_after(self, cache, session):
+        transport = Transport(session=session, cache=cache, expire_after={
+            Poem._urls['random']: DO_NOT_CACHE,
+            Poem._urls['find']: 0.05})
+        Poem.random(transport=transport)
+        Poem.random(transport=transport)
+        assert len(session.calls) == 2
+        Poem.find(1, transport=transport)
+        time.sleep(0.06)
+        Poem.find(1, transport=transport)
+        assert len(session.calls) == 4
+
+    def test_random_poems_are_not_cached_by_default(self, cache, session):
+        transport = Transport(session=session, cache=cache)
+        Poem.random(transport=transport)
+        Poem.random(transport=transport)
+        assert len(session.calls) == 2
+        transport = Transport(session=session, cache=cache, expire_after={
+            Poem._urls['random']: 60})
+        Poem.random(transport=transport)
+        Poem.random(transport=transport)
+        assert len(session.calls) == 3
+
+    def test_file_cache_clear_keeps_other_files(self, tmp_path):
+        cache = FileCache(str(tmp_path))
+        (tmp_path / 'notes.txt').write_text("mine")
+        cache.set('key', CacheEntry(200, b'{}', {}))
+        assert cache.get('key').content == b'{}'
+        cache.clear()
+        assert cache.get('key') is None
+        assert [path.name for path in tmp_path.iterdir()] == ['notes.txt']
+
+    def test_memory_cache_budgets(self):
+        cache = MemoryCache(max_entries=2, max_bytes=10)
+        cache.set('a', CacheEntry(200, b'1234'))
+        cache.set('b', CacheEntry(200, b'1234'))
+        cache.get('a')
+        cache.set('c', CacheEntry(200, b'1234'))
+        assert cache.get('b') is None
+        assert cache.total_bytes == 8
+        cache.set('d', CacheEntry(200, b'12345678901'))
+        assert cache.get('d') is None
+        cache.set('a', CacheEntry(200, b'12345678901'))
+        assert cache.get('a') is None
+        assert cache.total_bytes == 4
+
+    def test_ganjoor_default_cache_is_in_memory(self, tmp_path,
+                                                monkeypatch):
+        monkeypatch.chdir(tmp_path)
+        ganjoor = Ganjoor()
+        assert isinstance(ganjoor.transport.cache, MemoryCache)
+        assert list(tmp_path.iterdir()) == []
+
+    def test_cache_key_ignores_param_order(self):
+        assert cache_key('u', {'a': 1, 'b': 2}) == \
+            cache_key('u', {'b': 2, 'a': 1})
+
+    @mark.parametrize("base_url", ["https://ganjgah.ir",
+                                   "http://localhost:8080"])
+    def test_ganjoor_cache_is_client_scoped(self, base_url):
+        cache = MemoryCache()
+        ganjoor = Ganjoor(base_url=base_url, cache=cache)
+        ganjoor.transport._session = FakeSession(
+            {'/api/ganjoor/poem/random': poem_body(2)})
+        ganjoor.random_poem()
+        assert len(cache) == 0
+        assert ganjoor.transport.cache is cache
+        assert Ganjoor(cache=False).transport.cache is None
+
+    @mark.parametrize("validators", [
+        {'etag': '"v1"'},
+        {'last_modified': "Wed, 21 Oct 2015 07:28:00 GMT"}])
+    def test_revalidates_stale_entries(self, cache, validators):
+        session = FakeSession({'/api/ganjoor/poem/1':
+                               validated_route(poem_body(1), **validators)})
+        transport = Transport(session=session, cache=cache,
+                              expire_after={'*': 0.05})
+        Poem.find(1, transport=transport)
+        time.sleep(0.06)
+        assert Poem.find(1, transport=transport).id == 1
+        assert len(session.calls) == 2
+        stats = transport.cache_stats
+        assert (stats.misses, stats.revalidations, stats.not_modified) == \
+            (1, 1, 1)
+        assert Poem.find(1, transport=transport).id == 1
+        assert stats.hits == 1
+        assert len(session.calls) == 2
+
+    def test_changed_resource_is_replaced(self, cache):
+        session = FakeSession({'/api/ganjoor/poem/1':
+                               validated_route(poem_body(1), etag='"v1"')})
+        transport = Transport(session=session, cache=cache,
+                              expire_after={'*': 0.05})
+        Poem.find(1, transport=transport)
+        session.routes['/api/ganjoor/poem/1'] = validated_route(
+            poem_body(1, title="changed"), etag='"v2"')
+        time.sleep(0.06)
+        assert Poem.find(1, transport=transport).title == "changed"
+        assert transport.cache_stats.not_modified == 0
+        entry = cache.get(cache_key(*session.calls[-1]))
+        assert entry.validators == {'If-None-Match': '"v2"'}
+
+    def test_entries_without_validators_are_refetched(self, cache, session):
+        transport = Transport(session=session, cache=cache,
+                              expire_after={'*': 0.05})
+        Poem.find(1, transport=transport)
+        time.sleep(0.06)
+        Poem.find(1, transport=transport)
+        assert session.calls[1] == session.calls[0]
+        assert transport.cache_stats.revalidations == 0
+        assert transport.cache_stats.misses == 2
+
+    def test_validators_ignore_header_case(self):
+        entry = CacheEntry(200, b'{}', {'etag': '"x"',
+                                        'last-modified': "yesterday"})
+        assert entry.validators == {'If-None-Match': '"x"',
+                                    'If-Modified-Since': "yesterday"}
+        assert CacheEntry(200, b'{}').validators == {}
@@ -29,3 +29,12 @@ class TestCategory:
         assert category_instance.full_url == "/hafez", "The Id should be correct"
         assert set(category_keys).issubset(
             category_instance.__dict__.keys()), "All keys should be in response"
+
+    def test_collections_are_memoized(self):
+        category_instance = Category({
+            'id': 24, 'children': [{'id': 25}], 'poems': [{'id': 2131}],
+            'ancestors': [{'id': 2}]})
+        assert category_instance.children is category_instance.children
+        assert category_instance.poems[0].id == 2131
+        category_instance.from_dict({'children': [{'id': 26}]})
+        assert category_instance.children[0].id == 26
@@ -0,0 +1,123 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+import pickle
+import struct
+
+import pytest
+from pytest import fixture
+from ganjoor import CorpusFile, GanjoorException, Poem
+from ganjoor import corpus as corpus_module
+from ganjoor.corpus import HEADER, CorpusWriter, write_corpus
+from ganjoor.poem_utils import Verse
+
+from tests.fakes import poem_body, verse
+
+
+class TestCorpus:
+
+    @fixture
+    def poems(self):
+        poems = [Poem(poem_body(id, verse_count=id)) for id in (7, 3, 5)]
+        poems.append(Poem(poem_body(
+            9, verses=[verse(1, 0, 0, "بشنو این نی"), verse(2, 0, 1, "چون"),
+                       verse(3, 2, 0, "از جدایی‌ها")])))
+        return poems
+
+    @fixture
+    def corpus(self, tmp_path, poems):
+        path = str(tmp_path / 'corpus.bin')
+        write_corpus(poems, path)
+        corpus = CorpusFile(path)
+        yield corpus
+        corpus.close()
+
+    def test_index(self, corpus):
+        assert len(corpus) == 4
+        assert list(corpus.ids()) == [3, 5, 7, 9]
+        assert 5 in corpus
+        assert 4 not in corpus
+        assert corpus.verse_count == 18
+        with pytest.raises(GanjoorException):
+            corpus.poem(4)
+
+    def test_poem_view(self, corpus, poems):
+        poem = corpus.poem(7)
+        assert isinstance(poem, Poem)
+        assert poem.title == "poem 7"
+        assert poem.poet.id == 2
+        assert poem.category.id == 24
+        assert 'verses' not in poem.__dict__
+        assert poem.verse_count == 7
+        assert poem.verse_text(6) == "verse 6"
+        with pytest.raises(IndexError):
+            poem.verse_text(7)
+        assert [verse.text for verse in poem.verses] == \
+            [verse.text for verse in poems[0].verses]
+        assert isinstance(poem.verses[0], Verse)
+        assert poem.to_dict()['verses'] == poems[0].to_dict()['verses']
+
+    def test_couplets(self, corpus):
+        poem = corpus.poem(9)
+        assert poem.verse_text(2) == "از جدایی‌ها"
+        assert [str(couplet) for couplet in poem.iter_couplets()] == \
+            ["بشنو این نی\nچون", "از جدایی‌ها"]
+        assert [str(couplet) for couplet in poem.get_all_couplets()] == \
+            ["بشنو این نی\nچون", "", "از جدایی‌ها"]
+        assert poem.plain_text == "بشنو این نی\nچون\nاز جدایی‌ها"
+
+    def test_interleaved_couplets(self, tmp_path):
+        path = str(tmp_path / 'corpus.bin')
+        write_corpus([Poem(poem_body(1, verses=[
+            verse(1, 0, 0, "a"), verse(2, 1, 0, "b"),
+            verse(3, 0, 1, "c"), verse(4, 1, 1, "d")]))], path)
+        with CorpusFile(path) as corpus:
+            poem = corpus.poem(1)
+            assert [str(couplet) for couplet in poem.iter_couplets()] == \
+                ["a\nc", "b\nd"]
+            assert [str(couplet) for couplet in poem.get_all_couplets()] == \
+                ["a\nc", "b\nd"]
+
+    def test_iter_poems(self, corpus):
+        assert [poem.id for poem in corpus.iter_poems()] == [3, 5, 7, 9]
+
+    def test_pickle(self, corpus):
+        copy = pickle.loads(pickle.dumps(corpus))
+        try:
+            assert copy.poem(5).verse_text(0) == "verse 0"
+        finally:
+            copy.close()
+
+    def test_byte_order(self, tmp_path, poems, monkeypatch):
+        path = str(tmp_path / 'corpus.bin')
+        write_corpus(poems, path)
+        with open(path, 'rb') as corpus_file:
+            data = corpus_file.read()
+        ids = HEADER.unpack_from(data)[4]
+        assert struct.unpack_from('<4q', data, ids) == (3, 5, 7, 9)
+
+        # Takes the big-endian path, swapping on write and on load.
+        monkeypatch.setattr(corpus_module, '_SWAP', True)
+        write_corpus(poems, path)
+        with CorpusFile(path) as corpus:
+            assert list(corpus.ids()) == [3, 5, 7, 9]
+            assert corpus.poem(9).verse_text(2) == "از جدایی‌ها"
+            assert [verse.v_order for verse in corpus.poem(5).verses] == \
+                [verse.v_order for verse in poems[2].verses]
+
+    def test_duplicate_and_invalid(self, tmp_path, poems):
+        path = str(tmp_path / 'corpus.bin')
+        with pytest.raises(GanjoorException):
+            with CorpusWriter(path) as writer:
+                writer.add_poem(poems[0])
+                writer.add_poem(poems[0])
+        with open(path, 'wb') as corpus_file:
+            corpus_file.write(b'\0'*128)
+        with pytest.raises(GanjoorException):
+            CorpusFile(path)
+
+    def test_empty(self, tmp_path):
+        path = str(tmp_path / 'corpus.bin')
+        write_corpus([], path)
+        with CorpusFile(path) as corpus:
+            assert len(corpus) == 0
+            assert list(corpus.iter_poems()) == []
@@ -0,0 +1,162 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+import time
+
+from pytest import fixture, raises
+from ganjoor import Ganjoor
+from ganjoor.crawler import CATEGORY, POEM, Checkpoint, Crawler, Sink
+from ganjoor.ratelimit import TokenBucket
+from ganjoor.retry import NO_RETRY
+
+from tests.fakes import FakeSession, make_response, poem_body
+
+
+def corpus_routes():
+    """Two poets, poet 1 has a sub-category, poem 13 always fails."""
+    def category(id, children=(), poems=()):
+        return {'poet': {'id': 1}, 'cat': {
+            'id': id, 'children': [{'id': child} for child in children],
+            'poems': [{'id': poem} for poem in poems]}}
+    routes = {
+        '/api/ganjoor/poets': [{'id': 1, 'rootCatId': 10},
+                               {'id': 2, 'rootCatId': 20}],
+        '/api/ganjoor/cat/10': category(10, children=[11], poems=[1, 2]),
+        '/api/ganjoor/cat/11': category(11, poems=[3, 4, 5, 13]),
+        '/api/ganjoor/cat/20': category(20, poems=[6, 7]),
+        '/api/ganjoor/poem/13': make_response({}, 503, "Unavailable")}
+    routes.update({f"/api/ganjoor/poem/{id}": poem_body(id)
+                   for id in range(1, 8)})
+    return routes
+
+
+class RecordingSink(Sink):
+    def __init__(self, stop_after=None):
+        self.poems, self.categories, self.failures = [], [], []
+        self.stop_after = stop_after
+        self.crawler = None
+
+    def on_category(self, category):
+        self.categories.append(category.id)
+
+    def on_poem(self, poem):
+        self.poems.append(poem.id)
+        if self.stop_after and len(self.poems) >= self.stop_after:
+            self.crawler.stop()
+
+    def on_failure(self, task, error):
+        self.failures.append(task)
+
+
+class TestCrawler:
+
+    @fixture
+    def ganjoor(self):
+        ganjoor = Ganjoor(cache=False, retry=False)
+        ganjoor.transport._session = FakeSession(corpus_routes())
+        return ganjoor
+
+    def test_full_crawl(self, ganjoor):
+        sink = RecordingSink()
+        stats = Crawler(ganjoor, sink, max_workers=3).run()
+        assert sorted(sink.poems) == list(range(1, 8))
+        assert sorted(sink.categories) == [10, 11, 20]
+        assert sink.failures == [(POEM, 13)]
+        assert (stats.poets, stats.categories, stats.poems,
+                stats.failures) == (2, 3, 7, 1)
+
+    def test_default_client_leaves_retries_to_the_crawler(self):
+        crawler = Crawler()
+        assert crawler.ganjoor.transport.retry is NO_RETRY
+        assert crawler.max_attempts == 3
+
+    def test_callback_sink_and_poet_filter(self, ganjoor):
+        poems = []
+        Crawler(ganjoor, poems.append, poet_ids=[2]).run()
+        assert sorted(poem.id for poem in poems) == [6, 7]
+
+    def test_resume_from_checkpoint(self, ganjoor, tmp_path):
+        path = str(tmp_path / 'crawl.json')
+        first = RecordingSink(stop_after=2)
+        first.crawler = Crawler(ganjoor, first, checkpoint_path=path,
+                                max_workers=1, checkpoint_every=1)
+        first.crawler.run()
+        checkpoint = Checkpoint.load(path)
+        assert checkpoint.pending
+        assert (CATEGORY, 10) in [(CATEGORY, id)
+                                  for id in checkpoint.done[CATEGORY]]
+
+        second = RecordingSink()
+        Crawler(ganjoor, second, checkpoint_path=path, max_workers=2).run()
+        assert sorted(first.poems+second.poems) == list(range(1, 8))
+        assert Checkpoint.load(path).pending == []
+        assert Checkpoint.load(path).failed == {POEM: [13]}
+
+    def test_journal(self, tmp_path):
+        path = str(tmp_path / 'crawl.json')
+        checkpoint = Checkpoint(path, [(CATEGORY, 1)], {}, {})
+        checkpoint.save()
+        checkpoint.record('pending', (POEM, 2))
+        checkpoint.record('pending', (POEM, 3))
+        checkpoint.record('done', (CATEGORY, 1))
+        checkpoint.record('failed', (POEM, 3))
+        checkpoint.flush()
+        with open(checkpoint.journal_path, 'a') as journal:
+            journal.write('["done", "po')
+        loaded = Checkpoint.load(path)
+        assert loaded.pending == [(POEM, 2)]
+        assert loaded.done == {CATEGORY: [1]}
+        assert loaded.failed == {POEM: [3]}
+        loaded.save()
+        assert not (tmp_path / 'crawl.json.journal').exists()
+        assert Checkpoint.load(path) == loaded
+
+    def test_resume_from_journal(self, ganjoor, tmp_path, monkeypatch):
+        path = str(tmp_path / 'crawl.json')
+        first = RecordingSink(stop_after=2)
+        first.crawler = Crawler(ganjoor, first, checkpoint_path=path,
+                                max_workers=1, checkpoint_every=1)
+        # A killed crawl never gets to compact its journal.
+        monkeypatch.setattr(first.crawler.checkpoint, 'save', lambda: None)
+        first.crawler.run()
+        assert (tmp_path / 'crawl.json.journal').exists()
+
+        second = RecordingSink()
+        Crawler(ganjoor, second, checkpoint_path=path, max_workers=2).run()
+        assert sorted(first.poems+second.poems) == list(range(1, 8))
+        assert not (tmp_path / 'crawl.json.journal').exists()
+
+    def test_sink_failure_keeps_task(self, ganjoor, tmp_path):
+        path = str(tmp_path / 'crawl.json')
+
+        class FailingSink(RecordingSink):
+            def on_category(self, category):
+                if category.id == 11:
+                    raise OSError("disk full")
+                super().on_category(category)
+
+        with raises(OSError):
+            Crawler(ganjoor, FailingSink(), checkpoint_path=path,
+                    max_workers=1).run()
+        assert (CATEGORY, 11) in Checkpoint.load(path).pending
+
+        sink = RecordingSink()
+        Crawler(ganjoor, sink, checkpoint_path=path, max_workers=1).run()
+        assert 11 in sink.categories
+        assert {3, 4, 5} <= set(sink.poems)
+
+    def test_rate_limit(self, ganjoor):
+        crawler = Crawler(ganjoor, rate=2, poet_ids=[2])
+        started = time.monotonic()
+        crawler.run()
+        # 4 requests with a burst of 2 at 2 per second
+        assert time.monotonic() - started > 0.9
+        assert crawler.rate_limiter.bucket('ganjgah.ir').rate == 2
+
+    def test_token_bucket(self):
+        bucket = TokenBucket(rate=100, capacity=2)
+        assert bucket.try_acquire() == 0
+        assert bucket.try_acquire() == 0
+        assert bucket.try_acquire() > 0
+        started = time.monotonic()
+        bucket.acquire()
+        assert 0.001 < time.monotonic() - started < 0.1
@@ -0,0 +1,115 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from concurrent.futures import ThreadPoolExecutor
+import time
+
+from pytest import fixture
+from ganjoor import Ganjoor, Poet, PoetDirectory
+
+from tests.fakes import FakeSession
+
+POETS = [
+    {'id': 2, 'name': "حافظ", 'nickname': "حافظ", 'fullUrl': "/hafez",
+     'rootCatId': 24},
+    {'id': 3, 'name': "خیام", 'nickname': "خيام", 'fullUrl': "/khayyam",
+     'rootCatId': 60},
+    {'id': 4, 'name': "فردوسی", 'nickname': "حکیم ابوالقاسم فردوسی",
+     'fullUrl': "/ferdousi", 'rootCatId': 61},
+    {'id': 5, 'name': "حافظ شیرازی دوم", 'nickname': "حافظ دوم",
+     'fullUrl': "/hafez2", 'rootCatId': 62},
+]
+
+
+class TestPoetDirectory:
+
+    @fixture
+    def loads(self):
+        return []
+
+    @fixture
+    def directory(self, loads):
+        def load():
+            loads.append(1)
+            return [Poet(poet) for poet in POETS]
+        return PoetDirectory(load)
+
+    def test_indexes(self, directory, loads):
+        assert directory.by_id(3).name == "خیام"
+        assert directory.by_url("/ferdousi").id == 4
+        assert directory.by_nickname("حافظ دوم").id == 5
+        assert directory.by_root_cat_id(24).id == 2
+        assert directory.by_id(99) is None
+        assert 4 in directory
+        assert len(directory) == 4
+        assert len(loads) == 1
+
+    def test_complete(self, directory):
+        assert [poet.id for poet in directory.complete("حاف")] == [2, 5]
+        assert [poet.id for poet in directory.complete("حافظ شیر")] == [5]
+        # Arabic yeh in the query and in the nickname.
+        assert [poet.id for poet in directory.complete("خي")] == [3]
+        assert [poet.id for poet in directory.complete("فردو")] == [4]
+        assert [poet.id for poet in directory.complete("حاف", limit=1)] == \
+            [2]
+        assert directory.complete("  ") == []
+
+    def test_refresh_interval(self, loads):
+        directory = PoetDirectory(
+            lambda: loads.append(1) or [Poet(poet) for poet in POETS],
+            refresh_interval=0.05)
+        directory.by_id(2)
+        directory.by_id(2)
+        assert len(loads) == 1
+        time.sleep(0.06)
+        directory.by_id(2)
+        assert len(loads) == 2
+        directory.refresh()
+        assert len(loads) == 3
+
+    def test_failed_refresh_keeps_snapshot(self, loads):
+        def load():
+            loads.append(1)
+            if len(loads) > 1:
+                raise OSError("down")
+            return [Poet(poet) for poet in POETS]
+        directory = PoetDirectory(load, refresh_interval=0.05)
+        directory.by_id(2)
+        time.sleep(0.06)
+        assert directory.by_id(2).name == "حافظ"
+        assert len(loads) == 2
+        assert directory.by_id(3).name == "خیام"
+        assert len(loads) == 2
+        time.sleep(0.06)
+        directory.by_id(2)
+        assert len(loads) == 3
+
+    def test_concurrent_first_load(self, loads):
+        def load():
+            loads.append(1)
+            time.sleep(0.05)
+            return [Poet(poet) for poet in POETS]
+        directory = PoetDirectory(load)
+        with ThreadPoolExecutor(max_workers=8) as executor:
+            poets = list(executor.map(directory.by_id, [2]*8))
+        assert [poet.id for poet in poets] == [2]*8
+        assert len(loads) == 1
+
+    def test_ganjoor_uses_directory(self):
+        session = FakeSession({
+            '/api/ganjoor/poets': POETS,
+            '/api/ganjoor/poet/3': {'poet': POETS[1], 'cat': {'id': 60}},
+            '/api/ganjoor/poet/9': {'poet': {'id': 9}, 'cat': {'id': 90}}})
+        ganjoor = Ganjoor(cache=False, poet_directory=True)
+        ganjoor.transport._session = session
+        assert ganjoor.find_poet_by_id(2).name == "حافظ"
+        assert ganjoor.find_poet_by_url("/khayyam").id == 3
+        assert len(ganjoor.get_all_poets()) == 4
+        assert len(session.calls) == 1
+        assert ganjoor.find_poet_by_id(9).category.id == 90
+        # Directory poets only fetch their category when asked to.
+        poet = ganjoor.find_poet_by_id(3)
+        assert poet.category is None
+        assert len(session.calls) == 2
+        assert poet.fetch_category().id == 60
+        assert poet.category.id == 60
+        assert len(session.calls) == 3
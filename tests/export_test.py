@@ -0,0 +1,66 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+import pytest
+from pytest import fixture
+from ganjoor import ColumnarExporter, Ganjoor, GanjoorException, Poem
+from ganjoor.crawler import Crawler
+from ganjoor.export import export_poems
+
+from tests.crawler_test import corpus_routes
+from tests.fakes import FakeSession, poem_body
+
+pyarrow = pytest.importorskip('pyarrow')
+parquet = pytest.importorskip('pyarrow.parquet')
+ipc = pytest.importorskip('pyarrow.ipc')
+
+METRE = 'مفعول مفاعلن فعولن (هزج مسدس اخرب مقبوض محذوف)'
+
+
+class TestExport:
+
+    @fixture
+    def poems(self):
+        return [Poem(poem_body(id, verse_count=id,
+                               ganjoorMetre={'rhythm': METRE}))
+                for id in range(1, 6)]
+
+    def test_parquet(self, tmp_path, poems):
+        path = str(tmp_path / 'verses.parquet')
+        assert export_poems(poems, path, row_group_size=4) == 15
+        metadata = parquet.ParquetFile(path).metadata
+        assert metadata.num_rows == 15
+        assert [metadata.row_group(i).num_rows
+                for i in range(metadata.num_row_groups)] == [4, 4, 4, 3]
+        table = parquet.read_table(path)
+        assert table.column('poem_id').to_pylist()[:3] == [1, 2, 2]
+        row = table.slice(1, 1).to_pylist()[0]
+        assert row == {'poem_id': 2, 'poet_id': 2, 'cat_id': 24,
+                       'v_order': 1, 'couplet_index': 0,
+                       'verse_position': 0, 'text': "verse 0",
+                       'metre': METRE, 'rhyme_letters': "ست"}
+
+    def test_arrow(self, tmp_path, poems):
+        path = str(tmp_path / 'verses.arrow')
+        export_poems(poems, path, format='arrow', row_group_size=4)
+        reader = ipc.open_file(path)
+        assert reader.num_record_batches == 4
+        table = reader.read_all()
+        assert table.column('v_order').to_pylist()[-5:] == [1, 2, 3, 4, 5]
+
+    def test_empty(self, tmp_path):
+        path = str(tmp_path / 'verses.parquet')
+        assert export_poems([], path) == 0
+        assert parquet.read_table(path).num_rows == 0
+
+    def test_unknown_format(self, tmp_path):
+        with pytest.raises(GanjoorException):
+            ColumnarExporter(str(tmp_path / 'verses.csv'), format='csv')
+
+    def test_crawler_sink(self, tmp_path):
+        path = str(tmp_path / 'verses.parquet')
+        ganjoor = Ganjoor(cache=False, retry=False)
+        ganjoor.transport._session = FakeSession(corpus_routes())
+        Crawler(ganjoor, ColumnarExporter(path), max_workers=2).run()
+        table = parquet.read_table(path)
+        assert sorted(set(table.column('poem_id').to_pylist())) == \
+            list(range(1, 8))
@@ -0,0 +1,61 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+import json
+from urllib.parse import urlsplit
+
+import requests
+
+
+def make_response(body, status_code=200, reason="OK", headers=None):
+    response = requests.Response()
+    response.status_code = status_code
+    response.reason = reason
+    response._content = json.dumps(body).encode('utf-8')
+    response.headers.update(headers or {})
+    return response
+
+
+class FakeSession:
+    """Stands in for requests.Session, answering from a {path: body} map."""
+
+    def __init__(self, routes=None):
+        self.routes = routes or {}
+        self.calls = []
+        self.headers = {}
+
+    def get(self, url, params=None, timeout=None, headers=None):
+        self.calls.append((url, params))
+        route = self.routes.get(urlsplit(url).path)
+        if route is None:
+            return make_response({}, status_code=404, reason="Not Found")
+        if callable(route):
+            return route(url, params, headers)
+        if isinstance(route, requests.Response):
+            return route
+        return make_response(route)
+
+    def close(self):
+        pass
+
+
+def verse(v_order, couplet_index, verse_position, text):
+    return {'id': v_order, 'vOrder': v_order, 'coupletIndex': couplet_index,
+            'versePosition': verse_position, 'text': text}
+
+
+def poem_body(id, verse_count=4, poet_id=2, cat_id=24, **extra):
+    body = {'id': id, 'title': f"poem {id}", 'fullTitle': f"poem {id}",
+            'urlSlug': f"sh{id}", 'fullUrl': f"/hafez/ghazal/sh{id}",
+            'ganjoorMetre': None, 'rhymeLetters': "ست",
+            'plainText': "", 'htmlText': "", 'sourceName': None,
+            'sourceUrlSlug': None, 'oldTag': None, 'oldTagPageUrl': None,
+            'category': {'poet': {'id': poet_id, 'name': "حافظ",
+                                  'fullUrl': "/hafez"},
+                         'cat': {'id': cat_id, 'title': "غزلیات",
+                                 'fullUrl': "/hafez/ghazal"}},
+            'next': None, 'previous': None,
+            'verses': [verse(i+1, i // 2, i % 2, f"verse {i}")
+                       for i in range(verse_count)],
+            'recitations': [], 'images': [], 'songs': [], 'comments': []}
+    body.update(extra)
+    return body
@@ -0,0 +1,124 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+import pytest
+import requests
+from pytest import fixture
+from ganjoor import (Category, Ganjoor, GanjoorException, MemoryCache,
+                     MetricsCollector, Poem, Poet, RetryPolicy, Transport)
+from ganjoor.instrumentation import Histogram
+
+from tests.fakes import FakeSession, make_response, poem_body
+
+FIND = Poem._urls['find']
+
+
+def failing_then(*responses):
+    responses = list(responses)
+
+    def route(url, params, headers):
+        response = responses.pop(0)
+        if isinstance(response, Exception):
+            raise response
+        return response
+    return route
+
+
+class TestInstrumentation:
+
+    @fixture
+    def metrics(self):
+        return MetricsCollector(buckets=(0.1, 1))
+
+    @fixture
+    def sleeps(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr('ganjoor.transport.time.sleep', sleeps.append)
+        return sleeps
+
+    def transport(self, routes, metrics, **kwargs):
+        return Transport(base_url="http://localhost:8080",
+                         session=FakeSession(routes),
+                         instrumentation=metrics, **kwargs)
+
+    def test_histogram(self):
+        histogram = Histogram((0.1, 1))
+        for value in (0.05, 0.1, 0.5, 3):
+            histogram.observe(value)
+        assert histogram.to_dict() == {
+            'count': 4, 'sum': 3.65,
+            'buckets': {'0.1': 2, '1.0': 3, '+Inf': 4}}
+
+    def test_records_per_endpoint_template(self, metrics):
+        transport = self.transport({'/api/ganjoor/poem/1': poem_body(1),
+                                    '/api/ganjoor/poem/2': poem_body(2)},
+                                   metrics)
+        Poem.find(1, transport=transport)
+        Poem.find(2, transport=transport)
+        snapshot = metrics.snapshot()
+        assert list(snapshot) == [FIND]
+        find = snapshot[FIND]
+        assert find['latency']['count'] == 2
+        assert find['statuses'] == {'200': 2}
+        assert find['bytes_received'] == \
+            2*len(make_response(poem_body(1)).content)
+        assert find['decode']['count'] == 2
+        assert find['construct']['count'] == 2
+        assert find['retries'] == 0
+
+    def test_lists_and_other_models(self, metrics):
+        transport = self.transport({
+            '/api/ganjoor/poets': [{'id': 2, 'name': "حافظ"}],
+            '/api/ganjoor/cat/24': {'cat': {'id': 24}, 'poet': {'id': 2}}},
+            metrics)
+        assert Poet.all(transport=transport)[0].id == 2
+        assert Category.find(24, transport=transport).id == 24
+        snapshot = metrics.snapshot()
+        assert snapshot[Poet._urls['all']]['construct']['count'] == 1
+        assert snapshot[Category._urls['find']]['construct']['count'] == 1
+
+    def test_errors_and_retries(self, metrics, sleeps):
+        transport = self.transport({'/api/ganjoor/poem/1': failing_then(
+            requests.ConnectionError("reset"),
+            make_response({}, status_code=503, reason="Unavailable"),
+            make_response({}, status_code=404, reason="Not Found"))},
+            metrics, retry=RetryPolicy(jitter=False))
+        with pytest.raises(GanjoorException):
+            Poem.find(1, transport=transport)
+        find = metrics.snapshot()[FIND]
+        assert find['statuses'] == {'error': 1, '503': 1, '404': 1}
+        assert find['retries'] == 2
+        assert find['latency']['count'] == 3
+        assert find['decode']['count'] == 0
+
+    def test_cache_outcomes(self, metrics):
+        transport = self.transport({'/api/ganjoor/poem/1': poem_body(1)},
+                                   metrics, cache=MemoryCache(),
+                                   expire_after={FIND: 1e-9})
+        Poem.find(1, transport=transport)
+        Poem.find(1, transport=transport)
+        transport.expire_after[FIND] = 60
+        Poem.find(1, transport=transport)
+        Poem.find(1, transport=transport)
+        assert metrics.snapshot()[FIND]['cache'] == \
+            {'hit': 1, 'miss': 1, 'stale': 2}
+        assert metrics.snapshot()[FIND]['latency']['count'] == 3
+
+    def test_prometheus(self, metrics):
+        transport = self.transport({'/api/ganjoor/poem/1': poem_body(1)},
+                                   metrics)
+        Poem.find(1, transport=transport)
+        text = metrics.to_prometheus()
+        labels = 'endpoint="/api/ganjoor/poem/{id}"'
+        assert '# TYPE ganjoor_request_duration_seconds histogram' in text
+        assert f'ganjoor_request_duration_seconds_bucket{{{labels},' \
+            f'le="+Inf"}} 1' in text
+        assert f'ganjoor_responses_total{{{labels},status="200"}} 1' in text
+        assert f'ganjoor_retries_total{{{labels}}} 0' in text
+        assert f'ganjoor_model_construction_seconds_count{{{labels}}} 1' \
+            in text
+        metrics.reset()
+        assert metrics.snapshot() == {}
+
+    def test_ganjoor_passes_instrumentation(self, metrics):
+        ganjoor = Ganjoor(cache=False, instrumentation=metrics)
+        assert ganjoor.transport.instrumentation is metrics
@@ -0,0 +1,98 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+import sqlite3
+
+import pytest
+from pytest import fixture
+from ganjoor import (Category, Ganjoor, GanjoorException, MirrorSink, Poem,
+                     Poet, SQLiteMirror)
+from ganjoor.crawler import Crawler
+
+from tests.crawler_test import corpus_routes
+from tests.fakes import FakeSession
+from tests.startup_test import loaded_modules
+
+
+class TestMirror:
+
+    @fixture
+    def mirror_path(self, tmp_path):
+        path = str(tmp_path / 'mirror.sqlite')
+        online = Ganjoor(cache=False, retry=False)
+        session = FakeSession(corpus_routes())
+        session.routes['/api/ganjoor/poet/1'] = {
+            'poet': {'id': 1, 'fullUrl': "/hafez", 'rootCatId': 10},
+            'cat': {'id': 10, 'fullUrl': "/hafez", 'children': []}}
+        online.transport._session = session
+        with SQLiteMirror(path) as mirror:
+            Crawler(online, MirrorSink(mirror), max_workers=2).run()
+            mirror.add_poet(online.find_poet_by_id(1))
+        return path
+
+    @fixture
+    def ganjoor(self, mirror_path):
+        return Ganjoor(offline=mirror_path)
+
+    def test_poets(self, ganjoor):
+        poets = ganjoor.get_all_poets()
+        assert [poet.id for poet in poets] == [1, 2]
+        poet = ganjoor.find_poet_by_url("/hafez")
+        assert isinstance(poet, Poet)
+        assert poet.category.id == 10
+        assert ganjoor.find_poet_by_id(2).category.id == 20
+
+    def test_close(self, mirror_path):
+        with Ganjoor(offline=mirror_path) as ganjoor:
+            assert ganjoor.find_poet_by_id(2).id == 2
+        assert ganjoor.mirror._connection is None
+
+    def test_categories(self, ganjoor):
+        category = ganjoor.find_category_by_id(11)
+        assert isinstance(category, Category)
+        assert [poem.id for poem in category.poems] == [3, 4, 5, 13]
+        assert category.poet.id == 1
+        assert ganjoor.find_category_by_id(11, with_poems=False).poems == []
+
+    def test_poems(self, ganjoor):
+        poem = ganjoor.find_poem_by_id(3)
+        assert isinstance(poem, Poem)
+        assert poem.poet.id == 2
+        assert [str(couplet) for couplet in poem.get_all_couplets()] == \
+            ["verse 0\nverse 1", "verse 2\nverse 3"]
+        assert ganjoor.find_poem_by_url("/hafez/ghazal/sh4").id == 4
+        assert ganjoor.random_poem().id in range(1, 8)
+        results = list(ganjoor.find_poems_by_ids([1, 13]))
+        assert [result.ok for result in results] == [True, False]
+
+    def test_no_network(self, ganjoor):
+        ganjoor.find_poem_by_id(1)
+        assert ganjoor.transport._session is None
+        assert ganjoor.transport.cache is None
+        with pytest.raises(GanjoorException):
+            ganjoor.find_poem_by_id(13)
+        with pytest.raises(GanjoorException):
+            ganjoor.hafez_faal()
+
+    def test_missing_offline_mirror(self, tmp_path):
+        path = tmp_path / 'wrong.sqlite'
+        ganjoor = Ganjoor(offline=str(path))
+        with pytest.raises(GanjoorException, match="does not exist"):
+            ganjoor.find_poem_by_id(3)
+        assert not path.exists()
+
+    def test_offline_mirror_is_read_only(self, ganjoor):
+        with pytest.raises(sqlite3.OperationalError):
+            ganjoor.mirror.add_poem(ganjoor.find_poem_by_id(3))
+
+    def test_verses_round_trip(self, mirror_path):
+        with SQLiteMirror(mirror_path) as mirror:
+            verses = mirror.poem(1).verses
+        assert [(verse.couplet_index, verse.text)
+                for verse in verses[:2]] == [(0, "verse 0"), (0, "verse 1")]
+
+    def test_offline_lookup_skips_requests(self, mirror_path, tmp_path):
+        modules = loaded_modules(
+            "from ganjoor import Ganjoor\n"
+            f"assert Ganjoor(offline={mirror_path!r}).find_poem_by_id(3).id "
+            "== 3", tmp_path)
+        assert 'requests' not in modules
@@ -0,0 +1,80 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+import threading
+import time
+
+import pytest
+from pytest import fixture, mark
+from ganjoor import Ganjoor
+from ganjoor.pagination import iter_pages
+
+from tests.fakes import make_response, poem_body, FakeSession
+
+TOTAL = 12
+
+
+def search(url, params, headers):
+    size, number = params['pageSize'], params['pageNumber']
+    ids = range((number-1)*size+1, min(number*size, TOTAL)+1)
+    return make_response([poem_body(id) for id in ids])
+
+
+class TestPagination:
+
+    @fixture
+    def ganjoor(self):
+        ganjoor = Ganjoor(cache=False)
+        ganjoor.transport._session = FakeSession({
+            '/api/ganjoor/poems/search': search,
+            '/api/ganjoor/poems/similar': search})
+        return ganjoor
+
+    @mark.parametrize("prefetch", [True, False])
+    def test_iter_search(self, ganjoor, prefetch):
+        poems = list(ganjoor.iter_search("شیراز", page_size=5,
+                                         prefetch=prefetch))
+        assert [poem.id for poem in poems] == list(range(1, TOTAL+1))
+        calls = ganjoor.transport.session.calls
+        assert [params['pageNumber'] for _, params in calls] == [1, 2, 3]
+        assert calls[0][1]['term'] == "شیراز"
+
+    def test_iter_similar_stops_on_exact_last_page(self, ganjoor):
+        poems = list(ganjoor.iter_similar(metre="فعولن", page_size=4))
+        assert len(poems) == TOTAL
+        assert len(ganjoor.transport.session.calls) == 4
+
+    @mark.parametrize("prefetch", [True, False])
+    @mark.parametrize("page_size", [0, -1])
+    def test_invalid_page_size(self, ganjoor, prefetch, page_size):
+        with pytest.raises(ValueError):
+            ganjoor.iter_search("شیراز", page_size=page_size,
+                                prefetch=prefetch)
+        with pytest.raises(ValueError):
+            iter_pages(lambda number: [], page_size, prefetch=prefetch)
+        assert ganjoor.transport.session.calls == []
+
+    def test_next_page_is_prefetched(self):
+        requested = []
+        second_page_requested = threading.Event()
+
+        def fetch_page(page_number):
+            requested.append(page_number)
+            if page_number == 2:
+                second_page_requested.set()
+            return [page_number] * 2 if page_number < 3 else []
+
+        pages = iter_pages(fetch_page, 2)
+        assert next(pages) == 1
+        assert second_page_requested.wait(1)
+        assert list(pages) == [1, 2, 2]
+        assert requested == [1, 2, 3]
+
+    def test_prefetch_overlaps_consumption(self):
+        def fetch_page(page_number):
+            time.sleep(0.05)
+            return [page_number] if page_number <= 4 else []
+
+        started = time.monotonic()
+        for _ in iter_pages(fetch_page, 1):
+            time.sleep(0.05)
+        assert time.monotonic() - started < 0.4
@@ -6,6 +6,8 @@ import vcr
 
 from ganjoor.poem_utils import Comment, IncompletePoem, Metre, PoemImage, Recitation, Song, Verse
 
+from tests.fakes import poem_body, verse as verse_body
+
 TEST_POEM_ID = 2131
 
 
@@ -202,3 +204,61 @@ class TestPoem:
 
     def test_old_tag_page_url(self, poem: Poem):
         assert isinstance(poem.old_tag_page_url, type(None))
+
+    def test_collections_are_memoized(self):
+        poem_instance = Poem(poem_body(1, images=[
+            {'thumbnailImageUrl': "https://example.com/thumb/1.jpg"}]))
+        assert poem_instance.verses is poem_instance.verses
+        assert poem_instance.images is poem_instance.images
+        assert poem_instance.normal_image_urls == [
+            "https://example.com/normal/1.jpg"]
+
+    def test_invalidate(self):
+        poem_instance = Poem(poem_body(1, verse_count=2))
+        verses = poem_instance.verses
+        poem_instance._verses = poem_body(1, verse_count=4)['verses']
+        assert poem_instance.verses is verses
+        poem_instance.invalidate('verses')
+        assert len(poem_instance.verses) == 4
+        comments = poem_instance.comments
+        poem_instance.invalidate()
+        assert poem_instance.comments is not comments
+
+    def test_invalidate_drops_dependents(self):
+        poem_instance = Poem(poem_body(1, verse_count=2))
+        assert len(poem_instance.get_all_couplets()) == 1
+        poem_instance._verses = poem_body(1, verse_count=6)['verses']
+        poem_instance.invalidate('verses')
+        assert len(poem_instance.get_all_couplets()) == 3
+        assert poem_instance.get_couplet(2).verses[0] in poem_instance.verses
+
+    def test_couplet_index(self):
+        poem_instance = Poem(poem_body(1, verse_count=2001))
+        couplets = poem_instance.get_all_couplets()
+        assert len(couplets) == 1001
+        assert [verse.text for verse in couplets[3].verses] == [
+            "verse 6", "verse 7"]
+        assert poem_instance.get_couplet(3).verses == couplets[3].verses
+        poem_instance.get_couplet(3).verses.clear()
+        assert len(poem_instance.get_couplet(3).verses) == 2
+        assert len(poem_instance.get_couplet(1000).verses) == 1
+        assert poem_instance.get_couplet(5000).verses == []
+
+    def test_iter_couplets(self):
+        poem_instance = Poem(poem_body(1, verse_count=5))
+        couplets = poem_instance.iter_couplets()
+        assert 'verses' not in poem_instance.__dict__
+        assert [str(couplet) for couplet in couplets] == [
+            str(couplet) for couplet in poem_instance.get_all_couplets()]
+
+    def test_iter_couplets_non_contiguous(self):
+        body = poem_body(1, verses=[
+            verse_body(1, 0, 0, "a"), verse_body(2, 1, 0, "b"),
+            verse_body(3, 0, 1, "c"), verse_body(4, 1, 1, "d")])
+        couplets = [str(couplet) for couplet in Poem(body).iter_couplets()]
+        assert couplets == ["a\nc", "b\nd"]
+        poem_instance = Poem(body)
+        assert couplets == [str(couplet)
+                            for couplet in poem_instance.get_all_couplets()]
+        assert couplets == [str(couplet)
+                            for couplet in poem_instance.iter_couplets()]
@@ -0,0 +1,78 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+import pickle
+import tracemalloc
+
+import pytest
+from pytest import fixture
+from ganjoor import GanjoorException
+from ganjoor.poem_utils import (KEEP, RAISE, Comment, IncompletePoem,
+                                Metre, PoemImage, Verse)
+from ganjoor.utils import attribute_name
+
+from tests.fakes import verse
+
+
+class TestSlottedModels:
+
+    @fixture
+    def verse_args(self):
+        """A verse as the API sends it."""
+        args = verse(1, 0, 0, "صلاح کار کجا و من خراب کجا")
+        args.update({'sectionIndex1': 0, 'sectionIndex2': None,
+                     'sectionIndex3': None, 'sectionIndex4': None,
+                     'languageId': 1, 'coupletSummary': None})
+        return args
+
+    @pytest.mark.parametrize("model", [Verse, IncompletePoem, Metre,
+                                       PoemImage, Comment])
+    def test_no_instance_dict(self, model):
+        instance = model({'id': 1})
+        assert not hasattr(instance, '__dict__')
+        with pytest.raises(AttributeError):
+            instance.anything = 1
+
+    def test_fields(self, verse_args):
+        verse_instance = Verse(verse_args)
+        assert verse_instance.couplet_index == 0
+        assert verse_instance.text == verse_args['text']
+        assert verse_instance.section_index1 == 0
+        assert verse_instance.language_id == 1
+        assert verse_instance.extra == {}
+        assert Verse({'id': 1}).text is None
+
+    def test_unknown_keys_are_kept(self):
+        metre = Metre({'id': 1, 'newKey': 0})
+        assert metre.extra == {'_new_key': 0}
+        assert metre._new_key == 0
+        with pytest.raises(AttributeError):
+            metre._missing
+
+    def test_unknown_keys_policy(self, verse_args, monkeypatch):
+        verse_args['newKey'] = 0
+        assert Verse(verse_args).extra == {}
+        assert IncompletePoem({'id': 1, 'newKey': 0}).extra == {}
+        monkeypatch.setattr(Verse, 'unknown_keys', KEEP)
+        assert Verse(verse_args).extra == {'_new_key': 0}
+        monkeypatch.setattr(Verse, 'unknown_keys', RAISE)
+        with pytest.raises(GanjoorException):
+            Verse(verse_args)
+
+    def test_verse_memory(self, verse_args):
+        payloads = [dict(verse_args, id=id, vOrder=id)
+                    for id in range(10000)]
+        tracemalloc.start()
+        verses = [Verse(payload) for payload in payloads]
+        held, _ = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        # The slots alone, no dict per verse.
+        assert held/len(verses) < 160
+
+    def test_pickle_and_equality(self, verse_args):
+        verse_instance = Verse(verse_args)
+        assert pickle.loads(pickle.dumps(verse_instance)) == verse_instance
+
+    def test_attribute_name(self):
+        assert attribute_name('coupletIndex') == '_couplet_index'
+        assert attribute_name('mp3FileCheckSum') == '_mp3_file_check_sum'
+        assert attribute_name('coupletIndex') is attribute_name('coupletIndex')
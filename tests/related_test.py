@@ -0,0 +1,99 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+import time
+
+import pytest
+from pytest import fixture
+from ganjoor import Ganjoor, GanjoorException, Poem
+from ganjoor.poem_utils import Comment, Recitation
+
+from tests.fakes import FakeSession, make_response, poem_body
+
+DELAY = 0.1
+
+
+def slow(body):
+    def route(url, params, headers):
+        time.sleep(DELAY)
+        return make_response(body)
+    return route
+
+
+def related_routes(ids):
+    routes = {}
+    for id in ids:
+        base = f"/api/ganjoor/poem/{id}"
+        routes[base] = poem_body(id)
+        routes[base+"/recitations"] = slow([{'id': id, 'audioTitle': "a"}])
+        routes[base+"/images"] = slow([])
+        routes[base+"/songs"] = slow([{'id': id, 'trackName': "t"}])
+        routes[base+"/comments"] = slow([{'id': id, 'authorName': "c"}])
+    return routes
+
+
+class TestFetchRelated:
+
+    @fixture
+    def ganjoor(self):
+        ganjoor = Ganjoor(cache=False)
+        ganjoor.transport._session = FakeSession(related_routes(range(1, 5)))
+        return ganjoor
+
+    def test_fetch_related_in_parallel(self, ganjoor):
+        poem = ganjoor.find_poem_by_id(1)
+        assert poem.recitations == []
+        started = time.monotonic()
+        assert poem.fetch_related() is poem
+        assert time.monotonic()-started < 3*DELAY
+        assert isinstance(poem.recitations[0], Recitation)
+        assert isinstance(poem.comments[0], Comment)
+        assert poem.songs[0].id == 1
+        assert poem.images == []
+        assert poem.to_dict()['comments'] == [{'id': 1, 'authorName': "c"}]
+
+    def test_selected_resources(self, ganjoor):
+        poem = ganjoor.find_poem_by_id(1)
+        poem.fetch_related(recitations=False, images=False, songs=False)
+        paths = [call[0].rsplit('/', 1)[-1]
+                 for call in ganjoor.transport.session.calls]
+        assert paths == ['1', 'comments']
+        assert poem.comments[0].id == 1
+
+    def test_songs_params(self, ganjoor):
+        poem = ganjoor.find_poem_by_id(1)
+        poem.fetch_related(recitations=False, images=False, comments=False)
+        Poem.fetch_related_many([poem], recitations=False, images=False,
+                                comments=False)
+        poem.request_songs()
+        songs = [params for url, params in ganjoor.transport.session.calls
+                 if url.endswith('/songs')]
+        assert songs == [{'track_type': -1, 'approved': True}]*3
+
+    def test_partial_failure(self, ganjoor):
+        del ganjoor.transport.session.routes['/api/ganjoor/poem/1/songs']
+        poem = ganjoor.find_poem_by_id(1)
+        with pytest.raises(GanjoorException):
+            poem.fetch_related()
+        assert poem.comments[0].id == 1
+
+    def test_many_poems_share_one_pool(self, ganjoor):
+        poems = [ganjoor.find_poem_by_id(id) for id in range(1, 5)]
+        del ganjoor.transport.session.routes['/api/ganjoor/poem/3/images']
+        started = time.monotonic()
+        results = ganjoor.fetch_related(poems, max_workers=16)
+        assert time.monotonic()-started < 3*DELAY
+        assert [result.key for result in results] == [1, 2, 3, 4]
+        assert [result.ok for result in results] == [True, True, False, True]
+        assert [result.value.comments[0].id for result in results] == \
+            [1, 2, 3, 4]
+
+    def test_adopts_client_transport(self, ganjoor):
+        poem = Poem(poem_body(2))
+        ganjoor.fetch_related([poem], comments=False)
+        assert poem.songs[0].id == 2
+        assert poem.transport is ganjoor.transport
+
+    def test_offline(self, tmp_path):
+        ganjoor = Ganjoor(offline=str(tmp_path / 'mirror.sqlite'))
+        with pytest.raises(GanjoorException):
+            ganjoor.fetch_related([Poem(poem_body(1))])
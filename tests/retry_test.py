@@ -0,0 +1,203 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from email.utils import formatdate
+import time
+
+import pytest
+import requests
+from pytest import fixture
+from ganjoor import (CircuitBreaker, Ganjoor, GanjoorException, Poem,
+                     RetryPolicy, Transport)
+from ganjoor.exceptions import (CircuitOpenError, RateLimitedError,
+                                ResponseError, TransportError)
+from ganjoor.retry import parse_retry_after
+
+from tests.fakes import FakeSession, make_response, poem_body
+
+
+def flaky(*outcomes):
+    """Route answering with each outcome in turn, the last one forever.
+    Exceptions are raised, status codes become empty error responses."""
+    outcomes = list(outcomes)
+
+    def route(url, params, headers):
+        outcome = outcomes.pop(0) if len(outcomes) > 1 else outcomes[0]
+        if isinstance(outcome, Exception):
+            raise outcome
+        if isinstance(outcome, int):
+            return make_response({}, status_code=outcome, reason="Error")
+        return outcome
+    return route
+
+
+class TestRetry:
+
+    @fixture
+    def sleeps(self, monkeypatch):
+        sleeps = []
+        monkeypatch.setattr('ganjoor.transport.time.sleep', sleeps.append)
+        return sleeps
+
+    def transport(self, route, **kwargs):
+        session = FakeSession({'/api/ganjoor/poem/1': route})
+        return Transport(base_url="http://localhost:8080", session=session,
+                         **kwargs), session
+
+    def test_backoff(self):
+        policy = RetryPolicy(backoff_factor=1, max_backoff=5, jitter=False)
+        assert [policy.backoff(attempt) for attempt in range(1, 6)] == \
+            [1, 2, 4, 5, 5]
+        policy.jitter = True
+        assert all(0 <= policy.backoff(3) <= 4 for _ in range(20))
+        assert policy.wait(4) is None
+
+    def test_parse_retry_after(self):
+        assert parse_retry_after("3") == 3
+        assert parse_retry_after(None) is None
+        assert parse_retry_after("soon") is None
+        in_a_minute = parse_retry_after(formatdate(time.time()+60,
+                                                   usegmt=True))
+        assert 55 < in_a_minute <= 60
+
+    def test_retries_transient_statuses(self, sleeps):
+        transport, session = self.transport(
+            flaky(503, 502, make_response(poem_body(1))),
+            retry=RetryPolicy(jitter=False))
+        assert Poem.find(1, transport=transport).id == 1
+        assert len(session.calls) == 3
+        assert sleeps == [0.5, 1]
+
+    def test_retries_connection_errors(self, sleeps):
+        transport, session = self.transport(
+            flaky(requests.ConnectionError("reset"),
+                  make_response(poem_body(1))))
+        assert Poem.find(1, transport=transport).id == 1
+        assert len(session.calls) == 2
+
+    def test_gives_up(self, sleeps):
+        transport, session = self.transport(
+            flaky(requests.ConnectionError("reset")))
+        with pytest.raises(TransportError):
+            Poem.find(1, transport=transport)
+        assert len(session.calls) == 4
+        transport, session = self.transport(flaky(504))
+        with pytest.raises(ResponseError) as error:
+            Poem.find(1, transport=transport)
+        assert error.value.status_code == 504
+        assert len(session.calls) == 4
+
+    def test_other_errors_are_not_retried(self, sleeps):
+        transport, session = self.transport(flaky(500))
+        with pytest.raises(GanjoorException):
+            Poem.find(1, transport=transport)
+        assert len(session.calls) == 1
+
+    def test_retry_after(self, sleeps):
+        transport, _ = self.transport(flaky(
+            make_response({}, 429, headers={'Retry-After': "7"}),
+            make_response(poem_body(1))))
+        Poem.find(1, transport=transport)
+        assert sleeps == [7]
+        transport, session = self.transport(flaky(
+            make_response({}, 429, headers={'Retry-After': "3600"})))
+        with pytest.raises(RateLimitedError) as error:
+            Poem.find(1, transport=transport)
+        assert error.value.retry_after == 3600
+        assert len(session.calls) == 1
+
+    def test_disabled(self, sleeps):
+        transport, session = self.transport(flaky(503), retry=False)
+        with pytest.raises(ResponseError):
+            Poem.find(1, transport=transport)
+        assert len(session.calls) == 1
+
+    def test_rate_limit(self, sleeps):
+        transport, session = self.transport(
+            flaky(make_response(poem_body(1))), rate_limit=1000)
+        for _ in range(3):
+            Poem.find(1, transport=transport)
+        assert len(session.calls) == 3
+        assert transport.rate_limiter.bucket("localhost:8080").rate == 1000
+
+    def test_circuit_breaker(self, sleeps, monkeypatch):
+        breaker = CircuitBreaker(failure_threshold=2, reset_timeout=10)
+        transport, session = self.transport(
+            flaky(503, 503, make_response(poem_body(1))),
+            retry=False, circuit_breaker=breaker)
+        for _ in range(2):
+            with pytest.raises(ResponseError):
+                Poem.find(1, transport=transport)
+        with pytest.raises(CircuitOpenError):
+            Poem.find(1, transport=transport)
+        assert len(session.calls) == 2
+        now = time.monotonic()
+        monkeypatch.setattr('ganjoor.retry.time.monotonic', lambda: now+11)
+        assert Poem.find(1, transport=transport).id == 1
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_half_open_failure_reopens(self, monkeypatch):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        breaker.record_failure()
+        now = time.monotonic()
+        monkeypatch.setattr('ganjoor.retry.time.monotonic', lambda: now+11)
+        breaker.before_call()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+        with pytest.raises(CircuitOpenError):
+            breaker.before_call()
+        breaker.record_failure()
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_retries_other_request_errors(self, sleeps):
+        transport, session = self.transport(flaky(
+            requests.exceptions.ChunkedEncodingError("cut short"),
+            make_response(poem_body(1))))
+        assert Poem.find(1, transport=transport).id == 1
+        assert len(session.calls) == 2
+
+    def test_request_errors_end_the_trial_call(self, monkeypatch):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        transport, _ = self.transport(
+            flaky(requests.exceptions.ChunkedEncodingError("cut short"),
+                  make_response(poem_body(1))),
+            retry=False, circuit_breaker=breaker)
+        breaker.record_failure()
+        now = time.monotonic()
+        monkeypatch.setattr('ganjoor.retry.time.monotonic', lambda: now+11)
+        with pytest.raises(TransportError):
+            Poem.find(1, transport=transport)
+        assert breaker.state == CircuitBreaker.OPEN
+        monkeypatch.setattr('ganjoor.retry.time.monotonic', lambda: now+22)
+        assert Poem.find(1, transport=transport).id == 1
+        assert breaker.state == CircuitBreaker.CLOSED
+
+    def test_any_error_ends_the_trial_call(self, monkeypatch):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        transport, _ = self.transport(flaky(ValueError("bug")),
+                                      circuit_breaker=breaker)
+        breaker.record_failure()
+        now = time.monotonic()
+        monkeypatch.setattr('ganjoor.retry.time.monotonic', lambda: now+11)
+        with pytest.raises(ValueError):
+            Poem.find(1, transport=transport)
+        assert breaker.state == CircuitBreaker.OPEN
+
+    def test_release_keeps_counts(self, monkeypatch):
+        breaker = CircuitBreaker(failure_threshold=1, reset_timeout=10)
+        breaker.release()
+        assert breaker.state == CircuitBreaker.CLOSED
+        breaker.record_failure()
+        now = time.monotonic()
+        monkeypatch.setattr('ganjoor.retry.time.monotonic', lambda: now+11)
+        breaker.before_call()
+        breaker.release()
+        assert (breaker.state, breaker.failures) == (CircuitBreaker.OPEN, 1)
+        breaker.before_call()
+        assert breaker.state == CircuitBreaker.HALF_OPEN
+
+    def test_ganjoor_passes_options(self):
+        breaker = CircuitBreaker()
+        ganjoor = Ganjoor(cache=False, retry=RetryPolicy(total=5),
+                          rate_limit=2, circuit_breaker=breaker)
+        assert ganjoor.transport.retry.total == 5
+        assert ganjoor.transport.rate_limiter.rate == 2
+        assert ganjoor.transport.circuit_breaker is breaker
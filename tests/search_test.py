@@ -0,0 +1,134 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+import time
+
+import pytest
+from pytest import fixture
+from ganjoor import Ganjoor, GanjoorException, Poem, SearchIndex
+from ganjoor.search import normalize_persian
+
+from tests.fakes import FakeSession, make_response, poem_body, verse
+
+DELAY = 0.1
+
+
+def slow_poem(id):
+    def route(url, params, headers):
+        time.sleep(DELAY)
+        return make_response(poem_body(id))
+    return route
+
+
+def poem(id, texts, poet_id=2, cat_id=24, ancestors=()):
+    body = poem_body(id, verse_count=0, poet_id=poet_id, cat_id=cat_id)
+    body['verses'] = [verse(i+1, i // 2, i % 2, text)
+                      for i, text in enumerate(texts)]
+    body['category']['cat']['ancestors'] = [{'id': id} for id in ancestors]
+    return Poem(body)
+
+
+class TestSearch:
+
+    @fixture
+    def index(self):
+        return SearchIndex([
+            poem(1, ["خوشا شیراز و وضع بی‌مثالش", "خداوندا نگه دار از زوالش"],
+                 cat_id=24, ancestors=[2]),
+            poem(2, ["به شيراز آی و فیض روح قدسی", "بجوی از مردم صاحب کمالش"],
+                 cat_id=25, ancestors=[2]),
+            poem(3, ["شیراز معدن لب لعل است و کان حسن"], poet_id=7, cat_id=30),
+            poem(4, ["ما را بس است"], poet_id=7, cat_id=30)])
+
+    def test_normalize_persian(self):
+        assert normalize_persian("شيراز") == "شیراز"
+        assert normalize_persian("كتاب") == "کتاب"
+        assert normalize_persian("بی‌مثال") == "بیمثال"
+        assert normalize_persian("شـــیراز") == "شیراز"
+        assert normalize_persian("عِشْقْ") == "عشق"
+
+    def test_search(self, index):
+        assert index.search("شیراز") == [1, 2, 3]
+        assert index.search("شيراز", page_size=2, page_number=2) == [3]
+        assert index.search("شیراز کمالش") == [2]
+        assert index.search("بیمثالش") == [1]
+        assert index.search("تهران") == []
+
+    def test_empty_term(self, index):
+        assert index.search("") == []
+        assert index.search("   ") == []
+
+    def test_filters(self, index):
+        assert index.search("شیراز", poet_id=7) == [3]
+        assert index.search("شیراز", cat_id=25) == [2]
+        assert index.search("شیراز", cat_id=2) == [1, 2]
+        assert index.search("شیراز", cat_id=2, page_size=1,
+                            page_number=2) == [2]
+        assert index.search("شیراز", poet_id=7, cat_id=25) == []
+        assert index.search("شیراز", poet_id=99) == []
+
+    def test_incremental_updates(self, index):
+        assert index.search("شیراز") == [1, 2, 3]
+        index.add_poem(poem(5, ["شیراز"]))
+        index.add_poem(poem(0, ["شیراز"]))
+        assert index.search("شیراز", page_size=10) == [0, 1, 2, 3, 5]
+        index.add_poem(poem(1, ["تهران"]))
+        assert index.search("شیراز", page_size=10) == [0, 2, 3, 5]
+        assert index.search("تهران") == [1]
+        assert index.search("شیراز", page_size=2, page_number=2) == [3, 5]
+        index.add_poem(poem(4, ["شیراز"]))
+        assert index.search("شیراز", page_size=2, page_number=2) == [3, 4]
+        index.remove_poem(1)
+        assert 1 not in index
+        assert index.search("تهران") == []
+
+    def test_query_time(self):
+        index = SearchIndex(poem(id, [f"شیراز بیت {id}", f"مصرع {id % 100}"])
+                            for id in range(20000))
+        index.search("شیراز")
+        started = time.perf_counter()
+        for page_number in range(1, 101):
+            index.search("شیراز مصرع", page_number=page_number)
+        assert (time.perf_counter() - started) / 100 < 0.001
+
+    def test_filtered_query_time(self):
+        index = SearchIndex(poem(id, [f"شیراز بیت {id}"], poet_id=id % 50,
+                                 cat_id=id % 500)
+                            for id in range(20000))
+        index.search("شیراز", poet_id=7, page_number=2)
+        started = time.perf_counter()
+        for page_number in range(1, 101):
+            index.search("شیراز", poet_id=7, page_number=page_number)
+            index.search("شیراز", cat_id=7, page_number=page_number)
+            index.search("شیراز بیت", page_number=page_number*20)
+        assert (time.perf_counter() - started) / 300 < 0.001
+
+    def test_ganjoor_search_poems(self, index):
+        ganjoor = Ganjoor(cache=False, search_index=index)
+        session = ganjoor.transport._session = FakeSession()
+        poems = ganjoor.search_poems("شیراز", page_size=2)
+        assert [poem.id for poem in poems] == [1, 2]
+        assert str(poems[0].verses[0]) == "خوشا شیراز و وضع بی‌مثالش"
+        assert [poem.id for poem in ganjoor.iter_search(
+            "شیراز", page_size=2)] == [1, 2, 3]
+        assert session.calls == []
+
+    def test_poems_are_not_shared(self, index):
+        index.poem(1).verses.clear()
+        assert len(index.poem(1).verses) == 2
+        assert index.poem(5) is None
+        index.remove_poem(1)
+        assert index.poem(1) is None
+
+    def test_ganjoor_fetches_results_concurrently(self, index):
+        index = SearchIndex([index.poem(id) for id in (1, 2, 3)],
+                            keep_poems=False)
+        assert index.poem(1) is None
+        ganjoor = Ganjoor(cache=False, search_index=index)
+        ganjoor.transport._session = FakeSession(
+            {f"/api/ganjoor/poem/{id}": slow_poem(id) for id in (1, 2)})
+        started = time.monotonic()
+        poems = ganjoor.search_poems("شیراز", page_size=2)
+        assert time.monotonic()-started < 2*DELAY
+        assert [poem.id for poem in poems] == [1, 2]
+        with pytest.raises(GanjoorException):
+            ganjoor.search_poems("شیراز", page_size=3)
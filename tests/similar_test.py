@@ -0,0 +1,72 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from threading import get_ident
+
+from pytest import fixture
+from ganjoor import Ganjoor, Poem, SimilarIndex
+
+from tests.fakes import FakeSession, poem_body
+
+HAZAJ = 'مفعول مفاعلن فعولن (هزج مسدس اخرب مقبوض محذوف)'
+MOTAGHAREB = 'فعولن فعولن فعولن فعل (متقارب مثمن محذوف یا وزن شاهنامه)'
+
+
+def poem(id, metre, rhyme, poet_id=2):
+    return Poem(poem_body(id, poet_id=poet_id, rhymeLetters=rhyme,
+                          ganjoorMetre={'rhythm': metre} if metre else None))
+
+
+class TestSimilar:
+
+    @fixture
+    def index(self):
+        return SimilarIndex([
+            poem(5, HAZAJ, 'ست'), poem(1, HAZAJ, 'ست', poet_id=7),
+            poem(3, HAZAJ, 'ار'), poem(2, MOTAGHAREB, 'ست'),
+            poem(4, None, 'ست'), poem(6, HAZAJ, 'ست')])
+
+    def test_similar(self, index):
+        assert index.similar(metre=HAZAJ, rhyme='ست') == [1, 5, 6]
+        assert index.similar(metre=HAZAJ, rhyme='ست', poet_id=2) == [5, 6]
+        assert index.similar(metre=HAZAJ) == [1, 3, 5, 6]
+        assert index.similar(metre=MOTAGHAREB, rhyme='ار') == []
+        assert 4 not in index
+
+    def test_paging(self, index):
+        assert index.similar(metre=HAZAJ, page_size=3, page_number=2) == [6]
+        assert index.similar(metre=HAZAJ, page_size=3, page_number=3) == []
+
+    def test_normalized_keys(self, index):
+        assert index.similar(metre=HAZAJ, rhyme=' ست ') == [1, 5, 6]
+
+    def test_replace_and_remove(self, index):
+        index.add_poem(poem(5, MOTAGHAREB, 'ست'))
+        assert index.similar(metre=HAZAJ, rhyme='ست') == [1, 6]
+        assert index.similar(metre=MOTAGHAREB) == [2, 5]
+        index.remove_poem(2)
+        assert index.similar(metre=MOTAGHAREB, rhyme='ست') == [5]
+
+    def test_ganjoor_find_similar_poems(self, index):
+        ganjoor = Ganjoor(cache=False, similar_index=index)
+        session = ganjoor.transport._session = FakeSession()
+        poems = ganjoor.find_similar_poems(metre=HAZAJ, rhyme='ست')
+        assert [poem.id for poem in poems] == [1, 5, 6]
+        assert poems[0].rhyme_letters == 'ست'
+        assert [poem.id for poem in ganjoor.iter_similar(
+            HAZAJ, page_size=2)] == [1, 3, 5, 6]
+        assert session.calls == []
+        assert index.poem(4) is None
+
+    def test_ganjoor_fetches_results_concurrently(self, index):
+        index = SimilarIndex([index.poem(id) for id in (1, 5, 6)],
+                             keep_poems=False)
+        ganjoor = Ganjoor(cache=False, similar_index=index)
+        threads = set()
+
+        def find_poem_by_id(id):
+            threads.add(get_ident())
+            return id
+        ganjoor.find_poem_by_id = find_poem_by_id
+        assert ganjoor.find_similar_poems(metre=HAZAJ, rhyme='ست') == \
+            [1, 5, 6]
+        assert get_ident() not in threads
@@ -0,0 +1,148 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+from concurrent.futures import ThreadPoolExecutor
+from threading import Event
+import asyncio
+import time
+
+import pytest
+from ganjoor import Ganjoor, Poem, Transport
+from ganjoor.singleflight import AsyncSingleFlight, SingleFlight
+
+from tests.fakes import FakeSession, make_response, poem_body
+
+
+def blocking_route(release, body):
+    def route(url, params, headers):
+        release.wait(5)
+        return make_response(body)
+    return route
+
+
+def wait_until(condition, timeout=5):
+    deadline = time.monotonic()+timeout
+    while not condition():
+        assert time.monotonic() < deadline
+        time.sleep(0.001)
+
+
+class TestSingleFlight:
+
+    def call_concurrently(self, function, count=8):
+        with ThreadPoolExecutor(max_workers=count) as executor:
+            futures = [executor.submit(function) for _ in range(count)]
+            return [future.result() for future in futures]
+
+    def test_shares_one_call(self):
+        flight, release, calls = SingleFlight(), Event(), []
+
+        def slow():
+            calls.append(1)
+            release.wait(5)
+            return 42
+
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(flight.do, 'key', slow)
+                       for _ in range(4)]
+            wait_until(lambda: flight.shared == 3)
+            release.set()
+            assert [future.result() for future in futures] == [42]*4
+        assert len(calls) == 1
+        assert flight.do('key', lambda: 7) == 7
+
+    def test_shares_errors(self):
+        flight, release = SingleFlight(), Event()
+
+        def failing():
+            release.wait(5)
+            raise ValueError("down")
+
+        with ThreadPoolExecutor(max_workers=3) as executor:
+            futures = [executor.submit(flight.do, 'key', failing)
+                       for _ in range(3)]
+            wait_until(lambda: flight.shared == 2)
+            release.set()
+            for future in futures:
+                with pytest.raises(ValueError):
+                    future.result()
+
+    def test_transport_coalesces_identical_requests(self):
+        release = Event()
+        session = FakeSession({'/api/ganjoor/poem/1':
+                               blocking_route(release, poem_body(1))})
+        transport = Transport(base_url="http://localhost:8080",
+                              session=session)
+        with ThreadPoolExecutor(max_workers=6) as executor:
+            futures = [executor.submit(Poem.find, 1, transport=transport)
+                       for _ in range(6)]
+            wait_until(lambda: transport._in_flight.shared == 5)
+            release.set()
+            poems = [future.result() for future in futures]
+        assert len(session.calls) == 1
+        assert [poem.id for poem in poems] == [1]*6
+        assert poems[0].to_dict() is not poems[1].to_dict()
+
+    def test_uncached_requests_are_coalesced(self):
+        release = Event()
+        ganjoor = Ganjoor(cache_time=0)
+        session = ganjoor.transport._session = FakeSession(
+            {'/api/ganjoor/poem/1': blocking_route(release, poem_body(1))})
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(ganjoor.find_poem_by_id, 1)
+                       for _ in range(4)]
+            wait_until(lambda: ganjoor.transport._in_flight.shared == 3)
+            release.set()
+            assert [future.result().id for future in futures] == [1]*4
+        assert len(session.calls) == 1
+        assert len(ganjoor.transport.cache) == 0
+
+    def test_random_poems_are_not_coalesced(self):
+        session = FakeSession({'/api/ganjoor/poem/random': poem_body(1)})
+        ganjoor = Ganjoor(cache=False)
+        ganjoor.transport._session = session
+        self.call_concurrently(ganjoor.random_poem, count=4)
+        assert len(session.calls) == 4
+        assert ganjoor.transport._in_flight.shared == 0
+
+    @pytest.mark.parametrize('endpoint, fetch', [
+        ('/api/ganjoor/poem/random', Poem.random),
+        ('/api/ganjoor/hafez/faal', Poem.hafez_faal)])
+    def test_bare_transport_never_coalesces_random(self, endpoint, fetch):
+        release = Event()
+        session = FakeSession({endpoint: blocking_route(release,
+                                                        poem_body(1))})
+        transport = Transport(base_url="http://localhost:8080",
+                              session=session)
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = [executor.submit(fetch, transport=transport)
+                       for _ in range(4)]
+            wait_until(lambda: len(session.calls) == 4)
+            release.set()
+            [future.result() for future in futures]
+        assert transport._in_flight.shared == 0
+
+    def test_disabled(self):
+        session = FakeSession({'/api/ganjoor/poem/1': poem_body(1)})
+        transport = Transport(session=session, coalesce=False)
+        self.call_concurrently(lambda: Poem.find(1, transport=transport),
+                               count=4)
+        assert len(session.calls) == 4
+
+    def test_async(self):
+        calls = []
+
+        async def fetch():
+            calls.append(1)
+            await asyncio.sleep(0.01)
+            return 42
+
+        async def main():
+            flight = AsyncSingleFlight()
+            results = await asyncio.gather(
+                *[flight.do('key', fetch) for _ in range(5)])
+            return results, flight
+        results, flight = asyncio.run(main())
+        assert results == [42]*5
+        assert len(calls) == 1
+        assert flight.shared == 4
+        assert flight._calls == {}
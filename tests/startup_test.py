@@ -0,0 +1,44 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+import json
+import os
+import subprocess
+import sys
+
+import pytest
+import ganjoor
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+HEAVY_MODULES = ('requests', 'urllib3', 'inflection', 'sqlite3', 'asyncio',
+                 'orjson', 'concurrent.futures')
+
+
+def loaded_modules(code, cwd):
+    """Runs ``code`` in a fresh interpreter and returns the heavy modules
+    it ended up importing."""
+    script = (code+"\nimport json, sys\n"
+              f"print(json.dumps([name for name in {HEAVY_MODULES!r} "
+              "if name in sys.modules]))")
+    output = subprocess.run(
+        [sys.executable, '-c', script], cwd=cwd, check=True,
+        capture_output=True, text=True,
+        env={**os.environ, 'PYTHONPATH': ROOT}).stdout
+    return json.loads(output.splitlines()[-1])
+
+
+class TestStartup:
+
+    def test_import_is_light(self, tmp_path):
+        assert loaded_modules("import ganjoor", tmp_path) == []
+
+    def test_construction_has_no_side_effects(self, tmp_path):
+        assert loaded_modules("from ganjoor import Ganjoor\nGanjoor()",
+                              tmp_path) == []
+        assert os.listdir(tmp_path) == []
+
+    def test_exports_resolve(self):
+        for name in ganjoor.__all__:
+            assert getattr(ganjoor, name) is not None
+        assert set(ganjoor.__all__) <= set(dir(ganjoor))
+        with pytest.raises(AttributeError):
+            ganjoor.NotAThing
@@ -0,0 +1,111 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+import json
+import threading
+import time
+
+import pytest
+from pytest import fixture
+from ganjoor import Ganjoor, GanjoorException, Poem, Transport
+from ganjoor.cache import SQLiteCache
+
+from tests.fakes import FakeSession, make_response, poem_body
+
+
+class TestTransport:
+
+    @fixture
+    def session(self):
+        return FakeSession({
+            '/api/ganjoor/poem/2131': poem_body(2131),
+            '/api/ganjoor/poem/2131/comments': [],
+            '/api/ganjoor/poem/500': make_response(
+                {}, status_code=500, reason="Internal Server Error")})
+
+    @fixture
+    def transport(self, session):
+        return Transport(base_url="http://localhost:8080", session=session)
+
+    def test_url_uses_base_url(self, transport):
+        assert transport.url(Poem._urls['find'], id=1) == \
+            "http://localhost:8080/api/ganjoor/poem/1"
+
+    def test_model_calls_use_transport(self, transport, session):
+        poem = Poem.find(2131, transport=transport)
+        assert poem.id == 2131
+        assert session.calls[0][0] == \
+            "http://localhost:8080/api/ganjoor/poem/2131"
+        assert 'transport' not in session.calls[0][1]
+
+    def test_follow_up_requests_reuse_transport(self, transport, session):
+        poem = Poem.find(2131, transport=transport)
+        assert poem.request_comments() == []
+        assert len(session.calls) == 2
+
+    def test_invalid_response_raises(self, transport):
+        with pytest.raises(GanjoorException):
+            Poem.find(500, transport=transport)
+
+    def test_pooled_session(self):
+        transport = Transport(pool_size=32)
+        adapter = transport.session.get_adapter("https://ganjgah.ir")
+        assert adapter._pool_maxsize == 32
+        transport.close()
+
+    def test_session_created_once(self, monkeypatch):
+        transport = Transport()
+        created = []
+        new_session = transport._new_session
+
+        def counting_new_session():
+            created.append(None)
+            time.sleep(0.01)
+            return new_session()
+        monkeypatch.setattr(transport, '_new_session', counting_new_session)
+        barrier = threading.Barrier(10)
+
+        def use_session():
+            barrier.wait()
+            return transport.session
+        threads = [threading.Thread(target=use_session) for _ in range(10)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        assert len(created) == 1
+        transport.close()
+
+    def test_json_decoder(self, session):
+        bodies = []
+
+        def loads(content):
+            bodies.append(content)
+            return json.loads(content)
+        transport = Transport(session=session, json_loads=loads)
+        assert Poem.find(2131, transport=transport).id == 2131
+        assert len(bodies) == 1
+        assert isinstance(bodies[0], bytes)
+
+    def test_default_json_decoder(self, transport):
+        try:
+            import orjson
+        except ImportError:
+            assert transport.json_loads is json.loads
+        else:
+            assert transport.json_loads is orjson.loads
+
+    def test_ganjoor_owns_transport(self):
+        ganjoor = Ganjoor(base_url="http://localhost:8080", pool_size=4,
+                          cache=False)
+        assert ganjoor.transport.base_url == "http://localhost:8080"
+        assert ganjoor.transport.pool_size == 4
+
+    def test_ganjoor_close(self, tmp_path):
+        cache = SQLiteCache(str(tmp_path / 'cache.sqlite'))
+        with Ganjoor(base_url="http://localhost:8080", cache=cache) as ganjoor:
+            session = FakeSession({'/api/ganjoor/poem/2': poem_body(2)})
+            ganjoor.transport._session = session
+            ganjoor.find_poem_by_id(2)
+            assert cache._connection is not None
+        assert ganjoor.transport._session is None
+        assert cache._connection is None
@@ -0,0 +1,87 @@
+# Copyright 2021 Mohammad Kazemi <kazemi.me.222@gmail.com>.
+# SPDX-License-Identifier: MIT
+import time
+
+import pytest
+from pytest import fixture
+from ganjoor import Category, Ganjoor, GanjoorException
+
+from tests.fakes import FakeSession, make_response
+
+DELAY = 0.05
+
+# 1 -> 2, 3, 4; 2 -> 5, 6; 4 -> 7; 7 -> 8
+TREE = {1: [2, 3, 4], 2: [5, 6], 3: [], 4: [7], 5: [], 6: [], 7: [8], 8: []}
+
+
+def tree_routes():
+    def category(id):
+        def route(url, params, headers):
+            time.sleep(DELAY)
+            return make_response({'poet': {'id': 1}, 'cat': {
+                'id': id, 'fullUrl': f"/poet/cat{id}",
+                'children': [{'id': child} for child in TREE[id]],
+                'poems': [{'id': id*10}, {'id': id*10+1}]}})
+        return route
+    return {f"/api/ganjoor/cat/{id}": category(id) for id in TREE}
+
+
+class TestWalk:
+
+    @fixture
+    def ganjoor(self):
+        ganjoor = Ganjoor(cache=False)
+        ganjoor.transport._session = FakeSession(tree_routes())
+        return ganjoor
+
+    def test_walk(self, ganjoor):
+        started = time.monotonic()
+        visits = list(Category.walk(1, max_workers=4,
+                                    transport=ganjoor.transport))
+        # Four levels, each fetched concurrently.
+        assert time.monotonic()-started < 6*DELAY
+        assert sorted(visit.category.id for visit in visits) == \
+            list(range(1, 9))
+        by_id = {visit.category.id: visit for visit in visits}
+        assert visits[0].category.id == 1
+        assert by_id[1].path == () and by_id[1].parent_id is None
+        assert by_id[6].depth == 2 and by_id[6].path == (1, 2)
+        assert by_id[8].path == (1, 4, 7)
+        depths = [visit.depth for visit in visits]
+        assert depths == sorted(depths)
+
+    def test_with_poems_flag(self, ganjoor):
+        list(Category.walk(1, with_poems=False, transport=ganjoor.transport))
+        assert all(params == {'poems': False}
+                   for _, params in ganjoor.transport.session.calls)
+
+    def test_failure_stops_walk(self, ganjoor):
+        ganjoor.transport.session.routes['/api/ganjoor/cat/7'] = \
+            make_response({}, 500, "Internal Server Error")
+        with pytest.raises(GanjoorException):
+            list(ganjoor.walk_categories(1))
+
+    def test_tree(self, ganjoor):
+        tree = Category.tree(1, transport=ganjoor.transport)
+        assert len(tree) == 8
+        assert tree.root.id == 1
+        assert [category.id for category in tree] == list(range(1, 9))
+        assert [child.id for child in tree.children(1)] == [2, 3, 4]
+        assert tree.parent(5).id == 2
+        assert tree.parent(1) is None
+        assert tree.path(8) == (1, 4, 7)
+        assert tree.depth(8) == 3
+        assert [category.id for category in tree.descendants(4)] == [7, 8]
+        assert tree.find_by_url("/poet/cat6").id == 6
+        assert tree.find_by_url("/missing") is None
+        assert [poem.id for poem in tree.poems(4)] == \
+            [40, 41, 70, 71, 80, 81]
+        assert 9 not in tree
+
+    def test_ganjoor_caches_tree(self, ganjoor):
+        tree = ganjoor.category_tree(1)
+        calls = len(ganjoor.transport.session.calls)
+        assert ganjoor.category_tree(1) is tree
+        assert len(ganjoor.transport.session.calls) == calls
+        assert ganjoor.category_tree(1, refresh=True) is not tree
+        assert len(ganjoor.transport.session.calls) == 2*calls